@@ -3,12 +3,20 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager, get_jwt, get_jwt_identity, create_access_token, set_access_cookies
 from datetime import datetime, timezone, timedelta
 from .extensions import db
+from .blob_store import blob_store
+from .models.category import Category
 from .config import config
 from .services.auth_service import AuthService, init_cache
 from .services.monitoring_service import MonitoringService
 from .services.security_service import SecurityService
 from .services.logging_service import LoggingService
+from .services.search_index_service import SearchIndexService
+from .services.suggestion_index import SuggestionIndex
+from .services.recipe_catalog import RecipeCatalog
 from .background_tasks import start_background_tasks
+from .services.job_queue import JobQueue
+from .services.telegram_outbox import TelegramOutbox
+from .services.genai_clients import GenAIClients
 import logging
 import os
 
@@ -33,6 +41,7 @@ def create_app(config_name='default'):
     
     # Initialize extensions
     db.init_app(app)
+    blob_store.init_app(app)
     
     # No longer need to download session files, using session strings instead
     
@@ -71,6 +80,7 @@ def create_app(config_name='default'):
     from .routes.basic import basic_bp
     from .routes.places import places
     from .routes.menus import menus_bp
+    from .routes.jobs import jobs_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(recipes_bp, url_prefix='/api/recipes')
@@ -80,10 +90,17 @@ def create_app(config_name='default'):
     app.register_blueprint(basic_bp, url_prefix='/api')
     app.register_blueprint(places, url_prefix='/api/places')
     app.register_blueprint(menus_bp, url_prefix='/api/menus')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
     
     # Create database tables
     with app.app_context():
         db.create_all()
+        Category.backfill()
+
+    # Backfill the full-text search index and load the in-memory recipe indexes
+    SearchIndexService.init_app(app)
+    SuggestionIndex.init_app(app)
+    RecipeCatalog.init_app(app)
     
     init_cache(app)
     
@@ -102,6 +119,12 @@ def create_app(config_name='default'):
             # Not a JWT request
             return response
 
+    # Start the job workers and the Telegram outbox dispatcher, and warm up
+    # the Gemini connections (not in testing mode)
+    JobQueue.init_app(app)
+    TelegramOutbox.init_app(app)
+    GenAIClients.init_app(app)
+
     # Start background tasks if not in testing mode
     if not app.config['TESTING']:
         start_background_tasks(app)
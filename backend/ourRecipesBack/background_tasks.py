@@ -3,14 +3,15 @@ import os
 import threading
 from telethon import TelegramClient, events
 from telethon.sessions import StringSession
-from datetime import datetime, timezone
 
 from .services.telegram_service import TelegramService
 from .services.recipe_service import RecipeService
+from .services.sync_service import SyncService
+from .services.job_queue import JobQueue
 from .models.sync import SyncLog
 from .models.recipe import Recipe
 from .extensions import db
-from .routes.sync import _perform_sync, _create_sync_log
+from .routes.sync import _create_sync_log
 
 # This function is now deprecated but kept for backward compatibility
 def get_session_path(app, session_name):
@@ -20,34 +21,37 @@ def get_session_path(app, session_name):
         sessions_dir = os.path.join(os.getcwd(), 'sessions')
     return os.path.join(sessions_dir, f"{session_name}.session")
 
-async def process_new_message(send_client, message, new_channel, sync_log):
+async def process_new_message(message, sync_log):
     """Process a single new message - copy it to the new channel and sync to DB"""
     try:
-        async with send_client:
-            # Get media if exists
-            media = None
-            if message.media:
-                media = await message.download_media(bytes)
-        
-            # Send as new message (not forward)
-            sent_message = await send_client.send_message(
-                new_channel,
-                message.text,
-                file=media if media else None
-            )
-        
-            if sent_message:
-                print(f"Successfully copied message {message.id}", flush=True)
-                
-                # Sync the new message to DB
-                await RecipeService.sync_message(send_client, sent_message, sync_log)
-                print(f"Successfully synced message {message.id} to DB", flush=True)
-                
-                return True
+        # Get media if exists
+        media = None
+        if message.media:
+            media = await message.download_media(bytes)
+
+        # Send as new message (not forward), through the shared client
+        sent_message = await TelegramService.send_message(message.text, media)
+
+        if sent_message:
+            print(f"Successfully copied message {message.id}", flush=True)
+
+            # Sync the new message to DB with the media already downloaded
+            existing_recipe = Recipe.query.filter_by(telegram_id=sent_message.id).first()
+            media_key = RecipeService.get_media_key(sent_message.media)
+            if RecipeService.apply_message(sent_message, existing_recipe, media, media_key) == 'added':
+                sync_log.recipes_added += 1
+            else:
+                sync_log.recipes_updated += 1
+            sync_log.recipes_processed += 1
+            db.session.commit()
+            print(f"Successfully synced message {message.id} to DB", flush=True)
+
+            return True
     except Exception as e:
         print(f"Error processing message {message.id}: {str(e)}", flush=True)
-        with db.session.begin():
-            sync_log.recipes_failed += 1
+        db.session.rollback()
+        sync_log.recipes_failed += 1
+        db.session.commit()
     
     return False
 
@@ -56,7 +60,6 @@ async def monitor_old_channel(app):
     with app.app_context():
         try:
             old_channel = app.config["OLD_CHANNEL_URL"]
-            new_channel = app.config["CHANNEL_URL"]
             
             # Create sync log for monitoring session
             sync_log = _create_sync_log()
@@ -91,8 +94,7 @@ async def monitor_old_channel(app):
                 print("Session is not authorized", flush=True)
                 return
                 
-            # Get channel entities once
-            new_channel = await monitor_client.get_entity(app.config["CHANNEL_URL"])
+            # Get channel entity once
             old_channel = await monitor_client.get_entity(app.config["OLD_CHANNEL_URL"])
             
             print(f"Started monitoring channel: {app.config['OLD_CHANNEL_URL']}", flush=True)
@@ -102,7 +104,7 @@ async def monitor_old_channel(app):
                 """Handle new message event"""
                 if event.message.text:  # Only process messages with text
                     print(f"New message received: {event.message.id}", flush=True)
-                    await process_new_message(await TelegramService.create_client(), event.message, new_channel, sync_log)
+                    await process_new_message(event.message, sync_log)
             
             # Run the client until disconnected
             await monitor_client.run_until_disconnected()
@@ -150,24 +152,12 @@ async def check_and_sync_recipes(app):
                 # Check if there are any recipes in the database
                 recipe_count = Recipe.query.count()
                 
-                if recipe_count == 0:
+                if recipe_count == 0 and not JobQueue.has_active('sync'):
                     print("No recipes found in database, triggering full sync...", flush=True)
                     
-                    # Create sync log for the full sync
-                    sync_log = _create_sync_log()
-                    
-                    try:
-                        # Perform full sync
-                        await _perform_sync(sync_log)
-                        sync_log.status = "completed"
-                        print("Full sync completed successfully", flush=True)
-                    except Exception as e:
-                        print(f"Error during full sync: {str(e)}", flush=True)
-                        sync_log.status = "failed"
-                        sync_log.error_message = str(e)
-                    finally:
-                        sync_log.completed_at = datetime.now(timezone.utc)
-                        db.session.commit()
+                    # Queue a full sync job, the job workers run and resume it
+                    sync_log, _ = SyncService.start_job('full')
+                    print(f"Queued full sync job {sync_log.id}", flush=True)
                 
                 # Wait for 5 minutes before next check
                 await asyncio.sleep(300)
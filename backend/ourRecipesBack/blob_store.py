@@ -0,0 +1,133 @@
+"""
+Content-addressed blob storage
+
+Binary content (recipe images) is stored once per SHA-256 digest; database
+rows keep only the hex digest. The filesystem backend is the default, other
+backends can be plugged in with `register_backend`.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+
+def content_hash(data: bytes) -> str:
+    """Get the SHA-256 hex digest used as a blob key"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileSystemBackend:
+    """Store blobs as files, sharded by the first two characters of the key"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class MemoryBackend:
+    """Keep blobs in process memory (tests and ephemeral setups)"""
+
+    def __init__(self, root=None):
+        self._blobs = {}
+        self._lock = threading.Lock()
+
+    def exists(self, key):
+        return key in self._blobs
+
+    def get(self, key):
+        return self._blobs.get(key)
+
+    def put(self, key, data):
+        with self._lock:
+            self._blobs[key] = bytes(data)
+
+    def delete(self, key):
+        with self._lock:
+            self._blobs.pop(key, None)
+
+
+BACKENDS = {
+    'filesystem': FileSystemBackend,
+    'memory': MemoryBackend,
+}
+
+
+def register_backend(name, factory):
+    """Register a backend factory taking the configured BLOB_STORE_PATH"""
+    BACKENDS[name] = factory
+
+
+class BlobStore:
+    """Application-wide blob store, configured from the Flask app"""
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app):
+        name = app.config.get('BLOB_STORE_BACKEND') or 'filesystem'
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown blob store backend: {name}")
+        root = app.config.get('BLOB_STORE_PATH') or os.path.join(app.instance_path, 'blobs')
+        self.backend = BACKENDS[name](root)
+        app.extensions['blob_store'] = self
+
+    def _require_backend(self):
+        if self.backend is None:
+            raise RuntimeError("Blob store is not initialized, call init_app() first")
+        return self.backend
+
+    def put(self, data: bytes) -> str:
+        """Store content and return its key; identical content is stored once"""
+        backend = self._require_backend()
+        key = content_hash(data)
+        if not backend.exists(key):
+            backend.put(key, data)
+        return key
+
+    def get(self, key):
+        """Get content by key, None when missing"""
+        if not key:
+            return None
+        return self._require_backend().get(key)
+
+    def exists(self, key):
+        return bool(key) and self._require_backend().exists(key)
+
+    def delete(self, key):
+        self._require_backend().delete(key)
+
+
+blob_store = BlobStore()
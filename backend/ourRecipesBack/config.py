@@ -24,6 +24,13 @@ class Config:
     BOT_TOKEN = os.getenv("BOT_TOKEN")
     CHANNEL_URL = os.getenv("CHANNEL_URL")
     OLD_CHANNEL_URL = os.getenv("OLD_CHANNEL_URL")
+    SYNC_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", "4"))  # Parallel media fetches during sync
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Threads running background jobs
+    JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "600"))  # Take over jobs without heartbeat this long
+    TELEGRAM_PEER_TTL_SECONDS = int(os.getenv("TELEGRAM_PEER_TTL_SECONDS", "86400"))  # Re-resolve channel usernames after this long
+    TELEGRAM_WRITES_PER_MINUTE = int(os.getenv("TELEGRAM_WRITES_PER_MINUTE", "20"))  # Pace of queued message edits per channel
+    TELEGRAM_OUTBOX_DELAY_SECONDS = int(os.getenv("TELEGRAM_OUTBOX_DELAY_SECONDS", "2"))  # Wait for more edits of a message before sending
+    MENU_REFRESH_DELAY_SECONDS = int(os.getenv("MENU_REFRESH_DELAY_SECONDS", "10"))  # Wait for more recipe edits before refreshing its menus
     
     # Telegram Session String Settings (new)
     SESSION_STRING = os.getenv("SESSION_STRING")
@@ -77,9 +84,23 @@ class Config:
     CORS_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
     CORS_MAX_AGE = 600  # Cache preflight requests for 10 minutes
 
+    # Blob storage for recipe images ("filesystem" or "memory")
+    BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "filesystem")
+    BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH")  # Defaults to <instance>/blobs
+
     # AI Service settings
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     GOOGLE_API_KEY_NANO_BANANA = os.getenv("GOOGLE_API_KEY_NANO_BANANA")  # Paid API key for Nano Banana Pro
+    GEMINI_RPM = int(os.getenv("GEMINI_RPM", "0")) or None  # Requests per minute of every model, the free tier limits by default
+    GEMINI_RPD = int(os.getenv("GEMINI_RPD", "0")) or None  # Requests per day of every model
+    GEMINI_TIMEOUT_SECONDS = int(os.getenv("GEMINI_TIMEOUT_SECONDS", "120"))  # Longest Gemini request
+    GEMINI_KEEPALIVE_SECONDS = int(os.getenv("GEMINI_KEEPALIVE_SECONDS", "300"))  # Keep idle Gemini connections open this long
+    GEMINI_WARMUP = os.getenv("GEMINI_WARMUP", "true").lower() == "true"  # Open the Gemini connection at startup
+    AI_CACHE_MAX_ROWS = int(os.getenv("AI_CACHE_MAX_ROWS", "5000"))  # Stored AI results, least recently used evicted past this
+    AI_CACHE_MEMORY_ENTRIES = int(os.getenv("AI_CACHE_MEMORY_ENTRIES", "256"))  # AI results kept in memory in front of the table
+    AI_CACHE_EVICT_EVERY = int(os.getenv("AI_CACHE_EVICT_EVERY", "100"))  # Stored AI results between two evictions
+    GEMINI_MAX_WAIT_SECONDS = int(os.getenv("GEMINI_MAX_WAIT_SECONDS", "20"))  # Longest queue wait of an interactive AI request
+    MENU_PLANNER_AI_REFINE = os.getenv("MENU_PLANNER_AI_REFINE", "false").lower() == "true"  # Let the AI refine local menu plans
     HF_TOKEN = os.getenv("HF_TOKEN")
 
     # google drive settings
@@ -136,6 +157,7 @@ class TestingConfig(Config):
     JWT_COOKIE_SECURE = False
     WTF_CSRF_ENABLED = False
     SESSION_COOKIE_SECURE = False
+    BLOB_STORE_BACKEND = "memory"
 
 
 class ProductionConfig(Config):
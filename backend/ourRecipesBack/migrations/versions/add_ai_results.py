@@ -0,0 +1,38 @@
+"""Add table of cached AI transform results
+
+Revision ID: add_ai_results
+Revises: add_recipe_classification
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_ai_results'
+down_revision = 'add_recipe_classification'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ai_results',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=50), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('prompt_version', sa.String(length=16), nullable=False),
+        sa.Column('input_hash', sa.String(length=64), nullable=False),
+        sa.Column('result', sa.Text(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_used_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('operation', 'model', 'prompt_version', 'input_hash', name='uq_ai_results_key')
+    )
+    op.create_index('idx_ai_results_last_used', 'ai_results', ['last_used_at'])
+
+
+def downgrade():
+    op.drop_index('idx_ai_results_last_used', table_name='ai_results')
+    op.drop_table('ai_results')
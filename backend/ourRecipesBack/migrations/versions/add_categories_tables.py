@@ -0,0 +1,66 @@
+"""Add categories and recipe_categories tables
+
+Revision ID: add_categories_tables
+Revises: add_recipes_created_at_id_index
+Create Date: 2026-10-17
+
+Categories are linked to recipes through an association table, filled from
+the existing comma separated recipes._categories column.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_categories_tables'
+down_revision = 'add_recipes_created_at_id_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_categories_name', 'categories', ['name'], unique=True)
+    op.create_table(
+        'recipe_categories',
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('recipe_id', 'category_id')
+    )
+    op.create_index('idx_recipe_categories_category', 'recipe_categories', ['category_id', 'recipe_id'])
+
+    bind = op.get_bind()
+    category_ids = {}
+    rows = bind.execute(
+        sa.text("SELECT id, _categories FROM recipes WHERE _categories IS NOT NULL AND _categories != ''")
+    ).fetchall()
+    for recipe_id, value in rows:
+        names = []
+        for name in value.split(','):
+            name = name.strip()[:100]
+            if name and name not in names:
+                names.append(name)
+        for name in names:
+            if name not in category_ids:
+                bind.execute(sa.text("INSERT INTO categories (name) VALUES (:name)"), {'name': name})
+                category_ids[name] = bind.execute(
+                    sa.text("SELECT id FROM categories WHERE name = :name"), {'name': name}
+                ).scalar()
+            bind.execute(
+                sa.text("INSERT INTO recipe_categories (recipe_id, category_id) VALUES (:recipe_id, :category_id)"),
+                {'recipe_id': recipe_id, 'category_id': category_ids[name]}
+            )
+
+
+def downgrade():
+    op.drop_index('idx_recipe_categories_category', table_name='recipe_categories')
+    op.drop_table('recipe_categories')
+    op.drop_index('ix_categories_name', table_name='categories')
+    op.drop_table('categories')
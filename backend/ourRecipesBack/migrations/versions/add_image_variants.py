@@ -0,0 +1,33 @@
+"""Add image variants table
+
+Revision ID: add_image_variants
+Revises: move_images_to_blob_store
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_image_variants'
+down_revision = 'move_images_to_blob_store'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'image_variants',
+        sa.Column('source_hash', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.String(length=10), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('variant_hash', sa.String(length=64), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('source_hash', 'size', 'format')
+    )
+
+
+def downgrade():
+    op.drop_table('image_variants')
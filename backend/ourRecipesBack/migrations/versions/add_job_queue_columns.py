@@ -0,0 +1,44 @@
+"""Run background jobs from the sync_queue table
+
+Revision ID: add_job_queue_columns
+Revises: add_sync_job_checkpoints
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_job_queue_columns'
+down_revision = 'add_sync_job_checkpoints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sync_queue', sa.Column('job_type', sa.String(length=50), nullable=True))
+    op.add_column('sync_queue', sa.Column('attempts', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('sync_queue', sa.Column('max_attempts', sa.Integer(), nullable=True, server_default='1'))
+    op.add_column('sync_queue', sa.Column('run_after', sa.DateTime(), nullable=True))
+    op.add_column('sync_queue', sa.Column('started_at', sa.DateTime(), nullable=True))
+    op.add_column('sync_queue', sa.Column('finished_at', sa.DateTime(), nullable=True))
+    op.add_column('sync_queue', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.add_column('sync_queue', sa.Column('cancel_requested', sa.Boolean(), nullable=True, server_default=sa.false()))
+    op.add_column('sync_queue', sa.Column('result', sa.JSON(), nullable=True))
+    op.add_column('sync_queue', sa.Column('error', sa.Text(), nullable=True))
+    op.create_index('idx_sync_queue_job_pickup', 'sync_queue', ['status', 'run_after'])
+
+
+def downgrade():
+    op.drop_index('idx_sync_queue_job_pickup', table_name='sync_queue')
+    with op.batch_alter_table('sync_queue') as batch_op:
+        batch_op.drop_column('error')
+        batch_op.drop_column('result')
+        batch_op.drop_column('cancel_requested')
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('finished_at')
+        batch_op.drop_column('started_at')
+        batch_op.drop_column('run_after')
+        batch_op.drop_column('max_attempts')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('job_type')
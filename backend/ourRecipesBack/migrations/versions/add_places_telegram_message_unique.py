@@ -0,0 +1,35 @@
+"""Make places.telegram_message_id unique
+
+Revision ID: add_places_telegram_message_unique
+Revises: add_recipe_telegram_media
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_places_telegram_message_unique'
+down_revision = 'add_recipe_telegram_media'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the oldest place of messages that were synced more than once
+    op.execute(sa.text("""
+        DELETE FROM places
+        WHERE telegram_message_id IS NOT NULL
+          AND id NOT IN (
+              SELECT min_id FROM (
+                  SELECT MIN(id) AS min_id FROM places
+                  WHERE telegram_message_id IS NOT NULL
+                  GROUP BY telegram_message_id
+              ) AS keep
+          )
+    """))
+    op.create_index('uq_places_telegram_message_id', 'places', ['telegram_message_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_places_telegram_message_id', table_name='places')
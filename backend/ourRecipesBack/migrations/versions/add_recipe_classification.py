@@ -0,0 +1,63 @@
+"""Add dietary and course type columns to recipes
+
+Revision ID: add_recipe_classification
+Revises: add_telegram_outbox
+Create Date: 2026-10-17
+
+The columns are derived from the recipe categories; existing recipes are
+classified here, new and edited ones whenever their categories are set.
+"""
+from alembic import op
+import sqlalchemy as sa
+from ourRecipesBack.utils.recipe_classification import course_mask_of, course_types_of, dietary_type_of
+
+# revision identifiers
+revision = 'add_recipe_classification'
+down_revision = 'add_telegram_outbox'
+branch_labels = None
+depends_on = None
+
+# dietarytype already exists, created with the menus table
+dietary_type_enum = sa.Enum('MEAT', 'DAIRY', 'PAREVE', name='dietarytype')
+course_type_enum = sa.Enum('APPETIZER', 'MAIN', 'SIDE', 'DESSERT', 'SALAD', 'SOUP', name='coursetype')
+
+
+def upgrade():
+    bind = op.get_bind()
+    course_type_enum.create(bind, checkfirst=True)
+
+    op.add_column('recipes', sa.Column('dietary_type', dietary_type_enum, nullable=True))
+    op.add_column('recipes', sa.Column('course_type', course_type_enum, nullable=True))
+    op.add_column('recipes', sa.Column('course_mask', sa.Integer(), nullable=False, server_default='0'))
+
+    rows = bind.execute(sa.text("SELECT id, _categories FROM recipes")).fetchall()
+    for row_id, categories in rows:
+        names = [name.strip() for name in (categories or '').split(',') if name.strip()]
+        courses = course_types_of(names)
+        bind.execute(
+            sa.text(
+                "UPDATE recipes SET dietary_type = :dietary, course_type = :course, course_mask = :mask "
+                "WHERE id = :id"
+            ),
+            {
+                'dietary': dietary_type_of(names).name,
+                'course': courses[0].name if courses else None,
+                'mask': course_mask_of(courses),
+                'id': row_id,
+            }
+        )
+
+    op.create_index('ix_recipes_dietary_type', 'recipes', ['dietary_type'])
+    op.create_index('ix_recipes_course_type', 'recipes', ['course_type'])
+    op.create_index('idx_recipes_planner', 'recipes', ['status', 'is_parsed', 'dietary_type'])
+
+
+def downgrade():
+    op.drop_index('idx_recipes_planner', table_name='recipes')
+    op.drop_index('ix_recipes_course_type', table_name='recipes')
+    op.drop_index('ix_recipes_dietary_type', table_name='recipes')
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.drop_column('course_mask')
+        batch_op.drop_column('course_type')
+        batch_op.drop_column('dietary_type')
+    course_type_enum.drop(op.get_bind(), checkfirst=True)
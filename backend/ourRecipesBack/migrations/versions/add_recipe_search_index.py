@@ -0,0 +1,44 @@
+"""Add full-text search index for recipes
+
+Revision ID: add_recipe_search_index
+Revises: add_menu_stats_to_sync_log
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'add_recipe_search_index'
+down_revision = 'add_menu_stats_to_sync_log'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS recipe_search ("
+            "recipe_id INTEGER PRIMARY KEY REFERENCES recipes(id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS idx_recipe_search_document ON recipe_search USING GIN (document)")
+        op.execute(
+            "INSERT INTO recipe_search (recipe_id, document) "
+            "SELECT id, setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(raw_content, '')), 'B') FROM recipes "
+            "ON CONFLICT (recipe_id) DO NOTHING"
+        )
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS recipe_search "
+            "USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO recipe_search (rowid, title, body) "
+            "SELECT id, coalesce(title, ''), coalesce(raw_content, '') FROM recipes"
+        )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS recipe_search")
@@ -0,0 +1,26 @@
+"""Add Telegram media identity to recipes
+
+Revision ID: add_recipe_telegram_media
+Revises: add_sync_progress_to_sync_log
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_recipe_telegram_media'
+down_revision = 'add_sync_progress_to_sync_log'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('recipes', sa.Column('telegram_media_id', sa.BigInteger(), nullable=True))
+    op.add_column('recipes', sa.Column('telegram_media_access_hash', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.drop_column('telegram_media_access_hash')
+        batch_op.drop_column('telegram_media_id')
@@ -0,0 +1,36 @@
+"""Add normalized recipe search tokens
+
+Revision ID: add_recipe_tokens
+Revises: add_recipe_search_index
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_recipe_tokens'
+down_revision = 'add_recipe_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'recipe_tokens',
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('field', sa.String(length=20), nullable=False),
+        sa.Column('token', sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('recipe_id', 'field', 'token')
+    )
+    op.create_index('idx_recipe_token_lookup', 'recipe_tokens', ['token', 'field'])
+
+    # The full-text index now stores normalized terms. Empty it so the app
+    # tokenizes all recipes and rebuilds the index on its next start.
+    op.execute("DELETE FROM recipe_search")
+
+
+def downgrade():
+    op.drop_index('idx_recipe_token_lookup', table_name='recipe_tokens')
+    op.drop_table('recipe_tokens')
@@ -0,0 +1,22 @@
+"""Add (created_at, id) index for keyset pagination of recipes
+
+Revision ID: add_recipes_created_at_id_index
+Revises: add_image_variants
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'add_recipes_created_at_id_index'
+down_revision = 'add_image_variants'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_recipes_created_at_id', 'recipes', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('idx_recipes_created_at_id', table_name='recipes')
@@ -0,0 +1,32 @@
+"""Add resumable job checkpoints to SyncLog
+
+Revision ID: add_sync_job_checkpoints
+Revises: add_places_telegram_message_unique
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_sync_job_checkpoints'
+down_revision = 'add_places_telegram_message_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sync_log', sa.Column('checkpoint_message_id', sa.Integer(), nullable=True))
+    op.add_column('sync_log', sa.Column('high_water_message_id', sa.Integer(), nullable=True))
+    op.add_column('sync_log', sa.Column('channel_pts', sa.Integer(), nullable=True))
+    op.add_column('sync_log', sa.Column('pending_menu_ids', sa.JSON(), nullable=True))
+    op.add_column('sync_log', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('sync_log') as batch_op:
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('pending_menu_ids')
+        batch_op.drop_column('channel_pts')
+        batch_op.drop_column('high_water_message_id')
+        batch_op.drop_column('checkpoint_message_id')
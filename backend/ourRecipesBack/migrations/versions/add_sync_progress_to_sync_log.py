@@ -0,0 +1,23 @@
+"""Add sync progress to SyncLog
+
+Revision ID: add_sync_progress_to_sync_log
+Revises: add_sync_state
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_sync_progress_to_sync_log'
+down_revision = 'add_sync_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sync_log', sa.Column('messages_scanned', sa.Integer(), nullable=True, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('sync_log', 'messages_scanned')
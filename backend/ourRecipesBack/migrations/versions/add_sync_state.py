@@ -0,0 +1,30 @@
+"""Add sync state table
+
+Revision ID: add_sync_state
+Revises: add_categories_tables
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_sync_state'
+down_revision = 'add_categories_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sync_state',
+        sa.Column('channel', sa.String(length=255), nullable=False),
+        sa.Column('last_message_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('pts', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('channel')
+    )
+
+
+def downgrade():
+    op.drop_table('sync_state')
@@ -0,0 +1,45 @@
+"""Add outbox of Telegram message edits
+
+Revision ID: add_telegram_outbox
+Revises: add_telegram_peers
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_telegram_outbox'
+down_revision = 'add_telegram_peers'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'telegram_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chat', sa.String(length=255), nullable=False),
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('target_type', sa.String(length=20), nullable=True),
+        sa.Column('target_id', sa.Integer(), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('image_hash', sa.String(length=64), nullable=True),
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('run_after', sa.DateTime(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('delivered_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('chat', 'message_id', name='uq_telegram_outbox_message')
+    )
+    op.create_index('idx_telegram_outbox_pickup', 'telegram_outbox', ['status', 'run_after'])
+
+
+def downgrade():
+    op.drop_index('idx_telegram_outbox_pickup', table_name='telegram_outbox')
+    op.drop_table('telegram_outbox')
@@ -0,0 +1,31 @@
+"""Add table of resolved Telegram channel peers
+
+Revision ID: add_telegram_peers
+Revises: add_job_queue_columns
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_telegram_peers'
+down_revision = 'add_job_queue_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'telegram_peers',
+        sa.Column('channel_url', sa.String(length=255), nullable=False),
+        sa.Column('peer_type', sa.String(length=10), nullable=False),
+        sa.Column('peer_id', sa.BigInteger(), nullable=False),
+        sa.Column('access_hash', sa.BigInteger(), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('channel_url')
+    )
+
+
+def downgrade():
+    op.drop_table('telegram_peers')
@@ -0,0 +1,75 @@
+"""Move recipe images into the content-addressed blob store
+
+Revision ID: move_images_to_blob_store
+Revises: add_recipe_tokens
+Create Date: 2026-10-17
+
+Image bytes are written to the filesystem blob store (BLOB_STORE_PATH, or
+backend/instance/blobs by default) and rows keep only the SHA-256 hash.
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+from ourRecipesBack.blob_store import FileSystemBackend, content_hash
+
+# revision identifiers
+revision = 'move_images_to_blob_store'
+down_revision = 'add_recipe_tokens'
+branch_labels = None
+depends_on = None
+
+TABLES = ('recipes', 'recipe_versions')
+
+
+def _blob_root():
+    default = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'instance', 'blobs')
+    return os.getenv('BLOB_STORE_PATH') or os.path.abspath(default)
+
+
+def upgrade():
+    bind = op.get_bind()
+    backend = FileSystemBackend(_blob_root())
+
+    for table in TABLES:
+        op.add_column(table, sa.Column('image_hash', sa.String(length=64), nullable=True))
+
+        rows = bind.execute(
+            sa.text(f"SELECT id, image_data FROM {table} WHERE image_data IS NOT NULL")
+        ).fetchall()
+        for row_id, data in rows:
+            data = bytes(data)
+            if not data:
+                continue
+            key = content_hash(data)
+            if not backend.exists(key):
+                backend.put(key, data)
+            bind.execute(
+                sa.text(f"UPDATE {table} SET image_hash = :key WHERE id = :id"),
+                {'key': key, 'id': row_id}
+            )
+
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('image_data')
+
+    op.create_index('ix_recipes_image_hash', 'recipes', ['image_hash'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    backend = FileSystemBackend(_blob_root())
+
+    op.drop_index('ix_recipes_image_hash', table_name='recipes')
+    for table in TABLES:
+        op.add_column(table, sa.Column('image_data', sa.LargeBinary(), nullable=True))
+
+        rows = bind.execute(
+            sa.text(f"SELECT id, image_hash FROM {table} WHERE image_hash IS NOT NULL")
+        ).fetchall()
+        for row_id, key in rows:
+            bind.execute(
+                sa.text(f"UPDATE {table} SET image_data = :data WHERE id = :id"),
+                {'data': backend.get(key), 'id': row_id}
+            )
+
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('image_hash')
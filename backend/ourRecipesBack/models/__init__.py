@@ -1,15 +1,24 @@
 from .recipe import Recipe
 from .user_recipe import UserRecipe
 from .version import RecipeVersion
+from .recipe_token import RecipeToken
+from .image_variant import ImageVariant
+from .category import Category
 from .enums import RecipeStatus, RecipeDifficulty, DietaryType, CourseType
 from .place import Place
 from .menu import Menu, MenuMeal, MealRecipe
 from .shopping_list import ShoppingListItem
+from .telegram_peer import TelegramPeer
+from .telegram_outbox import OutboxMessage
+from .ai_result import AIResult
 
 __all__ = [
     'Recipe',
     'UserRecipe',
     'RecipeVersion',
+    'RecipeToken',
+    'ImageVariant',
+    'Category',
     'RecipeStatus',
     'RecipeDifficulty',
     'DietaryType',
@@ -18,5 +27,8 @@ __all__ = [
     'Menu',
     'MenuMeal',
     'MealRecipe',
-    'ShoppingListItem'
+    'ShoppingListItem',
+    'TelegramPeer',
+    'OutboxMessage',
+    'AIResult'
 ]
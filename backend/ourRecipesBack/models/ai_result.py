@@ -0,0 +1,29 @@
+from sqlalchemy.sql import func
+from ..extensions import db
+
+
+class AIResult(db.Model):
+    """
+    Stored result of a deterministic AI transform.
+
+    One row per operation, model, prompt version and hash of the normalized
+    input. last_used_at orders rows for least recently used eviction.
+    """
+    __tablename__ = 'ai_results'
+    __table_args__ = (
+        db.UniqueConstraint('operation', 'model', 'prompt_version', 'input_hash', name='uq_ai_results_key'),
+        db.Index('idx_ai_results_last_used', 'last_used_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    operation = db.Column(db.String(50), nullable=False)  # reformat/refine/optimize
+    model = db.Column(db.String(100), nullable=False)
+    prompt_version = db.Column(db.String(16), nullable=False)
+    input_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the normalized input
+    result = db.Column(db.Text, nullable=False)  # JSON encoded
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+    last_used_at = db.Column(db.DateTime, nullable=False, default=func.now())
+
+    def __repr__(self):
+        return f'<AIResult {self.operation} {self.input_hash[:12]}>'
@@ -0,0 +1,81 @@
+from sqlalchemy import func, select
+from ..extensions import db
+
+recipe_categories = db.Table(
+    'recipe_categories',
+    db.Column('recipe_id', db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('category_id', db.Integer, db.ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('idx_recipe_categories_category', 'category_id', 'recipe_id')
+)
+
+
+class Category(db.Model):
+    """
+    Recipe category, linked to recipes through recipe_categories.
+
+    Kept in sync with Recipe._categories by the Recipe.categories setter so
+    listings and filters can use indexed joins instead of string scans.
+    """
+    __tablename__ = 'categories'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+
+    recipes = db.relationship('Recipe', secondary=recipe_categories, back_populates='category_links')
+
+    @classmethod
+    def get_or_create_all(cls, names):
+        """
+        Get the categories of the names in one query, adding the new ones to the session
+
+        Returns:
+            list: Categories in the order of the names
+        """
+        names = list(dict.fromkeys(name.strip()[:100] for name in names))
+        if not names:
+            return []
+        # Categories added earlier in this session are not flushed yet
+        categories = {
+            obj.name: obj for obj in db.session.new
+            if isinstance(obj, cls) and obj.name in names
+        }
+        missing = [name for name in names if name not in categories]
+        if missing:
+            with db.session.no_autoflush:
+                categories.update((category.name, category) for category in cls.query.filter(cls.name.in_(missing)))
+        for name in names:
+            if name not in categories:
+                categories[name] = cls(name=name)
+                db.session.add(categories[name])
+        return [categories[name] for name in names]
+
+    @classmethod
+    def with_counts(cls):
+        """Get (name, recipe count) for every category that has recipes"""
+        return db.session.query(cls.name, func.count(recipe_categories.c.recipe_id))\
+            .join(recipe_categories, recipe_categories.c.category_id == cls.id)\
+            .group_by(cls.id, cls.name)\
+            .all()
+
+    @classmethod
+    def recipe_ids_named(cls, name):
+        """Select ids of recipes in the category with this exact name"""
+        return select(recipe_categories.c.recipe_id)\
+            .join(cls, cls.id == recipe_categories.c.category_id)\
+            .where(cls.name == name.strip())
+
+    @classmethod
+    def backfill(cls):
+        """Link recipes to categories from their category strings, when never done"""
+        from .recipe import Recipe
+        if db.session.query(recipe_categories.c.recipe_id).first() is not None:
+            return 0
+        recipes = Recipe.query.filter(Recipe._categories.isnot(None), Recipe._categories != '').all()
+        for recipe in recipes:
+            recipe.categories = recipe.categories
+        db.session.commit()
+        return len(recipes)
+
+    def __repr__(self):
+        return f'<Category {self.name}>'
@@ -31,14 +31,17 @@ class SyncStatus(Enum):
 class QueueStatus(Enum):
     """Queue item status"""
     PENDING = 'pending'
+    RUNNING = 'running'
     COMPLETED = 'completed'
     FAILED = 'failed'
+    CANCELLED = 'cancelled'
 
 class QueueActionType(Enum):
     """Queue action types"""
     CREATE = 'create'
     UPDATE = 'update'
     DELETE = 'delete'
+    JOB = 'job'  # Background job run by the job queue
 
 class DietaryType(Enum):
     """Dietary type for kosher meals"""
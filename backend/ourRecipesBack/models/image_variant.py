@@ -0,0 +1,18 @@
+from sqlalchemy.sql import func
+from ..extensions import db
+
+
+class ImageVariant(db.Model):
+    """Resized/re-encoded copy of a stored image, itself kept in the blob store"""
+    __tablename__ = 'image_variants'
+
+    source_hash = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.String(10), primary_key=True)
+    format = db.Column(db.String(10), primary_key=True)
+    variant_hash = db.Column(db.String(64), nullable=False)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+
+    def __repr__(self):
+        return f'<ImageVariant {self.source_hash[:8]} {self.size}.{self.format}>'
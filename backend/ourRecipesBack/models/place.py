@@ -1,5 +1,6 @@
 from datetime import datetime
 from ..extensions import db
+from sqlalchemy import insert
 from sqlalchemy.sql import func
 
 class Place(db.Model):
@@ -20,6 +21,11 @@ class Place(db.Model):
     last_sync = db.Column(db.DateTime)
     is_deleted = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (
+        # One place per Telegram message, lets sync insert with ON CONFLICT
+        db.Index('uq_places_telegram_message_id', 'telegram_message_id', unique=True),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -57,6 +63,33 @@ class Place(db.Model):
         self.is_synced = False
         db.session.commit()
 
+    @classmethod
+    def insert_synced(cls, rows):
+        """
+        Insert places read from Telegram in one statement, skipping messages
+        that already have a place
+
+        Returns:
+            int: Number of places inserted
+        """
+        if not rows:
+            return 0
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            dialect_insert = None
+
+        values = [dict(row, is_synced=True, last_sync=func.now()) for row in rows]
+        if dialect_insert is None:
+            stmt = insert(cls).values(values)
+        else:
+            stmt = dialect_insert(cls).values(values)\
+                .on_conflict_do_nothing(index_elements=['telegram_message_id'])
+        return db.session.execute(stmt).rowcount
+
     @classmethod
     def get_by_telegram_message_id(cls, telegram_message_id):
         """Get a place by its Telegram message ID"""
@@ -1,9 +1,13 @@
 from datetime import datetime, timezone
 from sqlalchemy.sql import func
-import base64
 from ..extensions import db
-from .enums import RecipeStatus, RecipeDifficulty
+from ..blob_store import blob_store
+from ..utils.images import versioned_image_url
+from ..utils.recipe_classification import COURSE_BITS, course_mask_of, course_types_of, courses_in_mask, dietary_type_of
+from .enums import RecipeStatus, RecipeDifficulty, DietaryType, CourseType
 from .version import RecipeVersion
+from .recipe_token import RecipeToken
+from .category import Category, recipe_categories
 
 class Recipe(db.Model):
     """
@@ -23,10 +27,13 @@ class Recipe(db.Model):
     _categories = db.Column('_categories', db.Text)  # Store categories as comma-separated string
     recipe_metadata = db.Column(db.JSON)
     
-    # Media
-    image_data = db.Column(db.LargeBinary)
+    # Media (image bytes live in the blob store, keyed by content hash)
+    image_hash = db.Column(db.String(64), index=True)
     image_url = db.Column(db.String(500))
     media_type = db.Column(db.String(50))
+    # Telegram photo/document the image was downloaded from, to skip unchanged downloads
+    telegram_media_id = db.Column(db.BigInteger)
+    telegram_media_access_hash = db.Column(db.BigInteger)
     
     # Timestamps
     created_at = db.Column(db.DateTime, nullable=False, default=func.now())
@@ -44,12 +51,24 @@ class Recipe(db.Model):
     difficulty = db.Column(db.Enum(RecipeDifficulty), nullable=True)
     servings = db.Column(db.Integer)
     preparation_time = db.Column(db.Integer, nullable=True)
+
+    # Derived from the categories whenever they are set
+    dietary_type = db.Column(db.Enum(DietaryType), index=True, default=DietaryType.PAREVE)
+    course_type = db.Column(db.Enum(CourseType), index=True)  # Main course type, by precedence
+    course_mask = db.Column(db.Integer, nullable=False, default=0)  # Bits of every fitting course type
     
     # Sync status
     formatted_content = db.Column(db.JSON)
     is_verified = db.Column(db.Boolean, default=False)
     sync_status = db.Column(db.String(20), default='synced')
     sync_error = db.Column(db.Text)
+
+    __table_args__ = (
+        # Keyset pagination of the management listing (newest first)
+        db.Index('idx_recipes_created_at_id', 'created_at', 'id'),
+        # Menu planner candidates of a dietary type
+        db.Index('idx_recipes_planner', 'status', 'is_parsed', 'dietary_type'),
+    )
     
     # Relationships
     user_recipes = db.relationship('UserRecipe',
@@ -64,6 +83,20 @@ class Recipe(db.Model):
         primaryjoin="Recipe.id == RecipeVersion.recipe_id"
     )
 
+    category_links = db.relationship(
+        'Category',
+        secondary=recipe_categories,
+        back_populates='recipes',
+        passive_deletes=True
+    )
+
+    search_tokens = db.relationship(
+        'RecipeToken',
+        back_populates='recipe',
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
+
     def __init__(self, telegram_id, raw_content, **kwargs):
         """Initialize a new recipe"""
         self.telegram_id = telegram_id
@@ -72,6 +105,16 @@ class Recipe(db.Model):
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+    @property
+    def image_data(self):
+        """Get image bytes from the blob store"""
+        return blob_store.get(self.image_hash) if self.image_hash else None
+
+    @image_data.setter
+    def image_data(self, value):
+        """Store image bytes in the blob store and keep their hash"""
+        self.image_hash = blob_store.put(value) if value else None
+
     @property
     def ingredients(self):
         """Get ingredients as a list"""
@@ -107,12 +150,32 @@ class Recipe(db.Model):
     
     @categories.setter
     def categories(self, value):
-        """Store categories as comma-separated string"""
+        """Store categories as comma-separated string and link the category rows"""
         if isinstance(value, list):
             self._categories = ','.join(str(v).strip() for v in value if v)
         else:
             self._categories = str(value) if value else None
 
+        self.category_links = Category.get_or_create_all(self.categories)
+        self.refresh_classification()
+
+    def refresh_classification(self):
+        """Recompute dietary type and course types from the categories"""
+        courses = course_types_of(self.categories)
+        self.dietary_type = dietary_type_of(self.categories)
+        self.course_type = courses[0] if courses else None
+        self.course_mask = course_mask_of(courses)
+
+    @property
+    def course_types(self):
+        """Course types the recipe fits, by precedence"""
+        return courses_in_mask(self.course_mask)
+
+    @classmethod
+    def fits_course(cls, course_type):
+        """Filter for recipes fitting a course type"""
+        return cls.course_mask.op('&')(COURSE_BITS[CourseType(course_type)]) != 0
+
     def update_content(self, title, raw_content, image_data=None, created_by=None, change_description=None):
         """Update recipe content and create new version"""
         try:
@@ -154,7 +217,7 @@ class Recipe(db.Model):
                 content=version_content,
                 created_by=created_by,
                 change_description=change_description,
-                image_data=self.image_data,
+                image_hash=self.image_hash,
                 is_current=True
             )
             db.session.add(new_version)
@@ -216,6 +279,7 @@ class Recipe(db.Model):
             self.is_parsed = False
             self.parse_errors = "תוכן המתכון ריק"
             self.sync_status = 'parsed_with_errors'
+            self.refresh_search_tokens()
             return
         
         # Parse title
@@ -311,10 +375,24 @@ class Recipe(db.Model):
         self.is_parsed = len(parse_errors) == 0
         self.parse_errors = '||'.join(parse_errors) if parse_errors else ''
         self.sync_status = 'parsed_with_errors' if parse_errors else 'synced'
+        self.refresh_search_tokens()
+
+    def refresh_search_tokens(self):
+        """Recompute normalized search tokens, touching only rows that changed"""
+        wanted = RecipeToken.tokens_for(self)
+        current = {(t.field, t.token): t for t in self.search_tokens}
+        for key, token in current.items():
+            if key not in wanted:
+                self.search_tokens.remove(token)
+        for field, value in wanted - set(current):
+            self.search_tokens.append(RecipeToken(field=field, token=value))
 
     # Image handling methods
     def set_image(self, image_data=None, image_url=None):
         """Set recipe image from data or URL"""
+        # The image no longer comes from a known Telegram media
+        self.telegram_media_id = None
+        self.telegram_media_access_hash = None
         if image_url:
             self.image_url = image_url
             self.image_data = None
@@ -328,10 +406,14 @@ class Recipe(db.Model):
             self.image_url = None
             self.media_type = None
 
-    def get_image_url(self):
-        """Get image URL (base64 or direct URL)"""
-        if self.image_data:
-            return f"data:image/jpeg;base64,{base64.b64encode(self.image_data).decode('utf-8')}"
+    def set_telegram_media(self, media_key):
+        """Record the Telegram (id, access_hash) of the current image"""
+        self.telegram_media_id, self.telegram_media_access_hash = media_key or (None, None)
+
+    def get_image_url(self, size=None):
+        """Get image URL (cacheable image endpoint or direct URL), optionally of a size variant"""
+        if self.image_hash:
+            return versioned_image_url('recipes.get_recipe_image', self.image_hash, size=size, recipe_id=self.id)
         return self.image_url
 
     # Version management methods
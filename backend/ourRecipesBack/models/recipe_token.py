@@ -0,0 +1,53 @@
+from ..extensions import db
+from ..utils.hebrew_text import index_terms
+
+
+class RecipeToken(db.Model):
+    """
+    Normalized search token of a recipe field.
+
+    Tokens are computed once when a recipe is written so searches and
+    suggestions can use indexed equality/range lookups instead of substring
+    scans over the raw text.
+    """
+    __tablename__ = 'recipe_tokens'
+
+    FIELD_TITLE = 'title'
+    FIELD_CATEGORY = 'category'
+    FIELD_INGREDIENT = 'ingredient'
+
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True)
+    field = db.Column(db.String(20), primary_key=True)
+    token = db.Column(db.String(100), primary_key=True)
+
+    recipe = db.relationship('Recipe', back_populates='search_tokens')
+
+    __table_args__ = (
+        db.Index('idx_recipe_token_lookup', 'token', 'field'),
+    )
+
+    @classmethod
+    def tokens_for(cls, recipe):
+        """Get the set of (field, token) pairs for a recipe's current content"""
+        pairs = set()
+        for field, values in (
+            (cls.FIELD_TITLE, [recipe.title or '']),
+            (cls.FIELD_CATEGORY, recipe.categories),
+            (cls.FIELD_INGREDIENT, recipe.ingredients),
+        ):
+            for value in values:
+                pairs.update((field, token[:100]) for token in index_terms(value))
+        return pairs
+
+    @classmethod
+    def recipe_ids_with_any(cls, tokens, fields=(FIELD_TITLE, FIELD_INGREDIENT)):
+        """Get the ids of recipes having any of the tokens in one of the fields"""
+        if not tokens:
+            return set()
+        rows = db.session.query(cls.recipe_id)\
+            .filter(cls.token.in_(tokens), cls.field.in_(fields))\
+            .distinct()
+        return {row.recipe_id for row in rows}
+
+    def __repr__(self):
+        return f'<RecipeToken {self.recipe_id} {self.field}:{self.token}>'
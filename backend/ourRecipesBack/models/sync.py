@@ -3,6 +3,11 @@ from sqlalchemy.sql import func
 from ..extensions import db
 from .enums import QueueStatus, QueueActionType, SyncStatus
 
+def _utcnow():
+    # Naive UTC, comparable with values read back from DateTime columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class SyncLog(db.Model):
     """Track synchronization operations between database and Telegram"""
     id = db.Column(db.Integer, primary_key=True)
@@ -31,13 +36,99 @@ class SyncLog(db.Model):
     menus_added = db.Column(db.Integer, default=0)
     menus_updated = db.Column(db.Integer, default=0)
 
+    # Progress of a running sync
+    messages_scanned = db.Column(db.Integer, default=0)
+
+    # Checkpoint for resuming an interrupted sync
+    checkpoint_message_id = db.Column(db.Integer)  # Messages below this id are left
+    high_water_message_id = db.Column(db.Integer)  # Newest message seen
+    channel_pts = db.Column(db.Integer)  # Channel pts when the sync started
+    pending_menu_ids = db.Column(db.JSON)  # Menu messages still to sync
+    heartbeat_at = db.Column(db.DateTime)  # Last progress of the job running it, None if not a job
+
     def __init__(self, sync_type='full'):
         self.started_at = datetime.now(timezone.utc)
         self.status = SyncStatus.IN_PROGRESS.value
         self.sync_type = sync_type
 
+    @property
+    def is_full(self):
+        """Whether the sync reads the whole channel rather than only changes"""
+        return self.sync_type != 'partial'
+
+    @property
+    def is_resuming(self):
+        return self.checkpoint_message_id is not None
+
+    def touch(self):
+        """Record that the running process is still making progress"""
+        self.heartbeat_at = _utcnow()
+
+    def complete(self):
+        """Mark sync as completed"""
+        self.status = "completed"
+        self.completed_at = datetime.now(timezone.utc)
+
+    def fail(self, error):
+        """Mark sync as failed"""
+        self.status = "failed"
+        self.completed_at = datetime.now(timezone.utc)
+        self.error_message = str(error)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.sync_type,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'messages_scanned': self.messages_scanned or 0,
+            'error': self.error_message,
+            'stats': {
+                'recipes': {
+                    'processed': self.recipes_processed,
+                    'added': self.recipes_added,
+                    'updated': self.recipes_updated,
+                    'failed': self.recipes_failed,
+                },
+                'places': {
+                    'processed': self.places_processed,
+                    'failed': self.places_failed,
+                },
+                'menus': {
+                    'processed': self.menus_processed,
+                    'added': self.menus_added,
+                    'updated': self.menus_updated,
+                    'failed': self.menus_failed,
+                },
+            },
+        }
+
+class SyncState(db.Model):
+    """High-water mark of what has been synced from a Telegram channel"""
+    __tablename__ = 'sync_state'
+
+    channel = db.Column(db.String(255), primary_key=True)
+    last_message_id = db.Column(db.Integer, nullable=False, default=0)
+    pts = db.Column(db.Integer)  # Channel update sequence, used to fetch edits
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+    @classmethod
+    def for_channel(cls, channel):
+        """Get the state row of a channel, creating an empty one when missing"""
+        state = db.session.get(cls, channel)
+        if state is None:
+            state = cls(channel=channel, last_message_id=0)
+            db.session.add(state)
+        return state
+
+    def advance(self, message_id):
+        """Move the mark past a processed message id"""
+        if message_id > (self.last_message_id or 0):
+            self.last_message_id = message_id
+
 class SyncQueue(db.Model):
-    """Queue for managing offline changes"""
+    """Queue for managing offline changes and background jobs"""
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String, nullable=False)
     action_type = db.Column(
@@ -54,10 +145,29 @@ class SyncQueue(db.Model):
         default=QueueStatus.PENDING.value
     )
 
+    # Background jobs (action_type 'job')
+    job_type = db.Column(db.String(50))  # Handler registered with JobQueue
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=1)
+    run_after = db.Column(db.DateTime)  # Not picked up before this, for retry backoff
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # Last sign of life of the worker running it
+    cancel_requested = db.Column(db.Boolean, default=False)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+
     __table_args__ = (
         db.Index('idx_sync_queue_status', 'status'),
         db.Index('idx_sync_queue_user', 'user_id'),
         db.Index('idx_sync_queue_recipe', 'recipe_id'),
+        db.Index('idx_sync_queue_job_pickup', 'status', 'run_after'),
+    )
+
+    FINISHED_STATUSES = (
+        QueueStatus.COMPLETED.value,
+        QueueStatus.FAILED.value,
+        QueueStatus.CANCELLED.value,
     )
 
     def validate(self):
@@ -66,7 +176,49 @@ class SyncQueue(db.Model):
             raise ValueError(f"Invalid action type: {self.action_type}")
         if self.status not in [s.value for s in QueueStatus]:
             raise ValueError(f"Invalid status: {self.status}")
-    
+
     def mark_completed(self, success=True):
         """Mark queue entry as completed"""
-        self.status = QueueStatus.COMPLETED.value if success else QueueStatus.FAILED.value 
\ No newline at end of file
+        self.status = QueueStatus.COMPLETED.value if success else QueueStatus.FAILED.value
+        self.finished_at = _utcnow()
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @classmethod
+    def claim(cls, job_id, seen_status, seen_heartbeat):
+        """
+        Take a job for running, if no other worker changed it since it was read
+
+        Returns:
+            bool: False when another worker claimed it first
+        """
+        now = _utcnow()
+        claimed = cls.query.filter(
+            cls.id == job_id,
+            cls.status == seen_status,
+            cls.heartbeat_at.is_(None) if seen_heartbeat is None else cls.heartbeat_at == seen_heartbeat
+        ).update({
+            cls.status: QueueStatus.RUNNING.value,
+            cls.attempts: cls.attempts + 1,
+            cls.started_at: now,
+            cls.heartbeat_at: now,
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.job_type,
+            'status': self.status,
+            'attempts': self.attempts or 0,
+            'max_attempts': self.max_attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'cancel_requested': bool(self.cancel_requested),
+            'result': self.result if self.status == QueueStatus.COMPLETED.value else None,
+            'error': self.error,
+        }
@@ -0,0 +1,51 @@
+from sqlalchemy.sql import func
+from ..extensions import db
+from .enums import QueueStatus
+
+
+class OutboxMessage(db.Model):
+    """
+    Edit of a Telegram message waiting to be delivered.
+
+    There is one row per message. A newer edit replaces the text of one not
+    delivered yet (last write wins) and bumps revision, so a dispatcher
+    still delivering the older text leaves the row pending.
+    """
+    __tablename__ = 'telegram_outbox'
+    __table_args__ = (
+        db.UniqueConstraint('chat', 'message_id', name='uq_telegram_outbox_message'),
+        db.Index('idx_telegram_outbox_pickup', 'status', 'run_after'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    chat = db.Column(db.String(255), nullable=False)  # Channel URL
+    message_id = db.Column(db.Integer, nullable=False)
+    target_type = db.Column(db.String(20))  # recipe/menu, whose delivery state is recorded
+    target_id = db.Column(db.Integer)
+    text = db.Column(db.Text, nullable=False)
+    image_hash = db.Column(db.String(64))  # Blob store key of a new image, None keeps the media
+    revision = db.Column(db.Integer, nullable=False, default=1)
+    status = db.Column(db.String(20), nullable=False, default=QueueStatus.PENDING.value)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
+    delivered_at = db.Column(db.DateTime)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'message_id': self.message_id,
+            'target_type': self.target_type,
+            'target_id': self.target_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None,
+            'error': self.error,
+        }
+
+    def __repr__(self):
+        return f'<OutboxMessage {self.message_id} {self.status}>'
@@ -0,0 +1,40 @@
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
+from ..extensions import db
+
+
+class TelegramPeer(db.Model):
+    """
+    Resolved input peer of a Telegram channel URL.
+
+    Kept so a restarted process does not have to resolve the channel
+    username again before its first operation.
+    """
+    __tablename__ = 'telegram_peers'
+
+    channel_url = db.Column(db.String(255), primary_key=True)
+    peer_type = db.Column(db.String(10), nullable=False)  # channel/chat/user
+    peer_id = db.Column(db.BigInteger, nullable=False)
+    access_hash = db.Column(db.BigInteger)
+    resolved_at = db.Column(db.DateTime, nullable=False)
+
+    def to_input_peer(self):
+        if self.peer_type == 'channel':
+            return InputPeerChannel(self.peer_id, self.access_hash)
+        if self.peer_type == 'user':
+            return InputPeerUser(self.peer_id, self.access_hash)
+        return InputPeerChat(self.peer_id)
+
+    def set_input_peer(self, peer):
+        """Store an input peer, returns False for peer types that cannot be stored"""
+        if isinstance(peer, InputPeerChannel):
+            self.peer_type, self.peer_id, self.access_hash = 'channel', peer.channel_id, peer.access_hash
+        elif isinstance(peer, InputPeerUser):
+            self.peer_type, self.peer_id, self.access_hash = 'user', peer.user_id, peer.access_hash
+        elif isinstance(peer, InputPeerChat):
+            self.peer_type, self.peer_id, self.access_hash = 'chat', peer.chat_id, None
+        else:
+            return False
+        return True
+
+    def __repr__(self):
+        return f'<TelegramPeer {self.channel_url} {self.peer_type}:{self.peer_id}>'
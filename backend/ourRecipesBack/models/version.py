@@ -1,7 +1,8 @@
 from datetime import datetime
 from sqlalchemy.sql import func
-import base64
 from ..extensions import db
+from ..blob_store import blob_store
+from ..utils.images import versioned_image_url
 
 class RecipeVersion(db.Model):
     """Track recipe changes"""
@@ -15,10 +16,20 @@ class RecipeVersion(db.Model):
     created_by = db.Column(db.String(100))
     change_description = db.Column(db.Text)
     is_current = db.Column(db.Boolean, default=False)
-    image_data = db.Column(db.LargeBinary)
+    image_hash = db.Column(db.String(64))
     
     recipe = db.relationship('Recipe', back_populates='versions')
 
+    @property
+    def image_data(self):
+        """Get image bytes from the blob store"""
+        return blob_store.get(self.image_hash) if self.image_hash else None
+
+    @image_data.setter
+    def image_data(self, value):
+        """Store image bytes in the blob store and keep their hash"""
+        self.image_hash = blob_store.put(value) if value else None
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.version_num:
@@ -30,8 +41,8 @@ class RecipeVersion(db.Model):
         """Convert version to dictionary format"""
         # Get image URL if exists
         image_url = None
-        if self.image_data:
-            image_url = f"data:image/jpeg;base64,{base64.b64encode(self.image_data).decode('utf-8')}"
+        if self.image_hash:
+            image_url = versioned_image_url('versions.get_version_image', self.image_hash, version_id=self.id)
             
         # Get parsed data from content
         parsed_data = self.content.get('parsed_data', {})
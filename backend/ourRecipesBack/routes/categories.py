@@ -1,6 +1,6 @@
 from flask import jsonify
 from flask_jwt_extended import jwt_required
-from ..models.recipe import Recipe
+from ..models.category import Category
 from flask import Blueprint
 
 categories_bp = Blueprint('categories', __name__)
@@ -8,17 +8,14 @@ categories_bp = Blueprint('categories', __name__)
 @categories_bp.route('', methods=['GET'])
 @jwt_required()
 def get_categories():
-    """Get all unique categories from recipes"""
+    """Get all categories with the number of recipes in each"""
     try:
-        categories_set = set()
-        recipes = Recipe.query.all()
-        
-        for recipe in recipes:
-            if recipe._categories:
-                categories_set.update(recipe.categories)
-        
-        return jsonify({"data": sorted(list(categories_set))}), 200
+        counts = sorted(Category.with_counts())
+        return jsonify({
+            "data": [name for name, _ in counts],
+            "categories": [{"name": name, "count": count} for name, count in counts]
+        }), 200
 
     except Exception as e:
         print(f"Error fetching categories: {str(e)}", flush=True)
-        return jsonify({"error": "Failed to fetch categories"}), 500 
\ No newline at end of file
+        return jsonify({"error": "Failed to fetch categories"}), 500
@@ -0,0 +1,50 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from ..services.ai_result_cache import AIResultCache
+from ..services.gemini_gateway import GeminiGateway
+from ..services.job_queue import JobQueue
+import logging
+
+jobs_bp = Blueprint("jobs", __name__)
+logger = logging.getLogger(__name__)
+
+
+def _get_own_job(job_id):
+    """Get a background job of the current user, None if missing or someone else's"""
+    job = JobQueue.get(job_id)
+    if job is None or job.user_id != str(get_jwt_identity()):
+        return None
+    return job
+
+
+@jobs_bp.route("/gemini-metrics", methods=["GET"])
+@jwt_required()
+def get_gemini_metrics():
+    """Get queue wait times, retries and rejections of Gemini calls in this process, and AI cache hits"""
+    return jsonify({**GeminiGateway.metrics(), 'cache': AIResultCache.metrics()}), 200
+
+
+@jobs_bp.route("/<int:job_id>", methods=["GET"])
+@jwt_required()
+def get_job(job_id):
+    """Get status of a background job, with its result once completed"""
+    job = _get_own_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@jobs_bp.route("/<int:job_id>/cancel", methods=["POST"])
+@jwt_required()
+def cancel_job(job_id):
+    """Cancel a waiting job, or stop a running one"""
+    job = _get_own_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    try:
+        if not JobQueue.cancel(job):
+            return jsonify({"error": "Job already finished", "job": job.to_dict()}), 409
+        return jsonify(job.to_dict()), 202
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {str(e)}")
+        return jsonify({"error": "Failed to cancel job"}), 500
@@ -4,6 +4,7 @@ from sqlalchemy import or_
 from ..services.menu_planner_service import MenuPlannerService
 from ..services.shopping_list_service import ShoppingListService
 from ..services.menu_service import MenuService
+from ..services.job_queue import JobQueue
 from ..models import Menu, MenuMeal, MealRecipe
 from ..extensions import db
 import asyncio
@@ -15,8 +16,9 @@ menus_bp = Blueprint("menus", __name__)
 @jwt_required()
 def generate_menu_preview():
     """
-    Generate menu PREVIEW using AI (WITHOUT saving to database).
-    Returns JSON plan for user to review before confirming.
+    Generate menu PREVIEW (WITHOUT saving to database).
+    Queues the generation and returns a job id; the job result is the JSON
+    plan for user to review before confirming.
 
     Request body:
     {
@@ -25,10 +27,20 @@ def generate_menu_preview():
         "servings": 8,
         "dietary_type": "meat",
         "meal_types": ["ארוחת ערב שבת", "בוקר", "סעודה שלישית"],
-        "special_requests": "ללא אורז"
+        "special_requests": "ללא אורז",
+        "max_cooking_time": 90,  # optional, minutes per recipe
+        "meal_time_budget": 180,  # optional, minutes per meal
+        "exclude_recipe_ids": [12],  # optional
+        "refine_with_ai": false  # optional, let the AI improve the local plan
     }
 
-    Response:
+    Response (202):
+    {
+        "status": "accepted",
+        "job_id": 42
+    }
+
+    Job result (GET /api/jobs/<job_id>):
     {
         "success": true,
         "preview": {
@@ -55,12 +67,9 @@ def generate_menu_preview():
         if not data.get('meal_types') or len(data['meal_types']) == 0:
             return jsonify({"error": "At least one meal type is required"}), 400
 
-        # Pre-check: Verify we have recipes in the database
-        from ..models import Recipe, RecipeStatus
-        available_recipes = Recipe.query.filter(
-            Recipe.status == RecipeStatus.ACTIVE.value,
-            Recipe.is_parsed == True
-        ).count()
+        # Pre-check: Verify we have recipes in the catalog
+        from ..services.recipe_catalog import RecipeCatalog
+        available_recipes = RecipeCatalog.count()
 
         print(f"📚 Available recipes in DB: {available_recipes}")
 
@@ -70,27 +79,14 @@ def generate_menu_preview():
                 "message": f"Only {available_recipes} recipes available in database. Need at least 5 recipes to generate a menu."
             }), 400
 
-        # Generate menu PREVIEW (this may take 30-60 seconds)
-        print(f"🤖 Starting AI menu preview generation...")
-        menu_plan = MenuPlannerService.generate_menu_preview(data)
-        print(f"✓ Menu preview generated (NOT saved to database)")
-
-        return jsonify({
-            "success": True,
-            "preview": menu_plan,
-            "preferences": data  # Echo back for save endpoint
-        }), 200
+        # Generate menu PREVIEW in the background (AI refinement may take 30-60 seconds)
+        job = JobQueue.enqueue("menu_preview", data, user_id=user_id)
+        print(f"🤖 Queued menu preview generation as job {job.id}")
 
-    except ValueError as val_error:
-        # User-friendly errors from MenuPlannerService
-        print(f"❌ Validation error: {str(val_error)}")
-        return jsonify({
-            "error": "Menu preview failed",
-            "message": str(val_error)
-        }), 400
+        return jsonify({"status": "accepted", "job_id": job.id}), 202
 
     except Exception as e:
-        print(f"❌ Unexpected error generating preview: {str(e)}")
+        print(f"❌ Unexpected error queueing preview: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({
@@ -289,11 +285,11 @@ def update_menu(menu_id):
         if menu.telegram_message_id:
             print(f"📝 Updating menu in Telegram...")
             try:
-                success = asyncio.run(MenuService.update_in_telegram(menu))
+                success = MenuService.update_in_telegram(menu)
                 if success:
-                    print(f"✓ Menu updated in Telegram")
+                    print(f"✓ Menu update queued for Telegram")
                 else:
-                    print(f"⚠️ Failed to update menu in Telegram (but updated in DB)")
+                    print(f"⚠️ Failed to queue menu update for Telegram (but updated in DB)")
             except Exception as telegram_error:
                 print(f"⚠️ Error updating in Telegram: {telegram_error}")
                 # Continue anyway - menu is already updated in DB
@@ -407,11 +403,11 @@ def replace_recipe(menu_id, meal_id, recipe_id):
             try:
                 # Reload menu with fresh data
                 menu = Menu.query.get(menu_id)
-                success = asyncio.run(MenuService.update_in_telegram(menu))
+                success = MenuService.update_in_telegram(menu)
                 if success:
-                    print(f"✓ Menu updated in Telegram")
+                    print(f"✓ Menu update queued for Telegram")
                 else:
-                    print(f"⚠️ Failed to update menu in Telegram (but updated in DB)")
+                    print(f"⚠️ Failed to queue menu update for Telegram (but updated in DB)")
             except Exception as telegram_error:
                 print(f"⚠️ Error updating in Telegram: {telegram_error}")
                 # Continue anyway - menu is already updated in DB
@@ -600,11 +596,11 @@ def delete_recipe_from_meal(menu_id, meal_id, recipe_id):
             try:
                 # Reload menu with fresh data
                 menu = Menu.query.get(menu_id)
-                success = asyncio.run(MenuService.update_in_telegram(menu))
+                success = MenuService.update_in_telegram(menu)
                 if success:
-                    print(f"✓ Menu updated in Telegram")
+                    print(f"✓ Menu update queued for Telegram")
                 else:
-                    print(f"⚠️ Failed to update menu in Telegram (but updated in DB)")
+                    print(f"⚠️ Failed to queue menu update for Telegram (but updated in DB)")
             except Exception as telegram_error:
                 print(f"⚠️ Error updating in Telegram: {telegram_error}")
                 # Continue anyway - menu is already updated in DB
@@ -694,11 +690,11 @@ def add_recipe_to_meal(menu_id, meal_id):
             try:
                 # Reload menu with fresh data
                 menu = Menu.query.get(menu_id)
-                success = asyncio.run(MenuService.update_in_telegram(menu))
+                success = MenuService.update_in_telegram(menu)
                 if success:
-                    print(f"✓ Menu updated in Telegram")
+                    print(f"✓ Menu update queued for Telegram")
                 else:
-                    print(f"⚠️ Failed to update menu in Telegram (but updated in DB)")
+                    print(f"⚠️ Failed to queue menu update for Telegram (but updated in DB)")
             except Exception as telegram_error:
                 print(f"⚠️ Error updating in Telegram: {telegram_error}")
                 # Continue anyway - menu is already updated in DB
@@ -749,11 +745,11 @@ def delete_meal(menu_id, meal_id):
             try:
                 # Reload menu with fresh data
                 menu = Menu.query.get(menu_id)
-                success = asyncio.run(MenuService.update_in_telegram(menu))
+                success = MenuService.update_in_telegram(menu)
                 if success:
-                    print(f"✓ Menu updated in Telegram")
+                    print(f"✓ Menu update queued for Telegram")
                 else:
-                    print(f"⚠️ Failed to update menu in Telegram (but updated in DB)")
+                    print(f"⚠️ Failed to queue menu update for Telegram (but updated in DB)")
             except Exception as telegram_error:
                 print(f"⚠️ Error updating in Telegram: {telegram_error}")
                 # Continue anyway - menu is already updated in DB
@@ -828,11 +824,11 @@ def add_meal_to_menu(menu_id):
             try:
                 # Reload menu with fresh data
                 menu = Menu.query.get(menu_id)
-                success = asyncio.run(MenuService.update_in_telegram(menu))
+                success = MenuService.update_in_telegram(menu)
                 if success:
-                    print(f"✓ Menu updated in Telegram")
+                    print(f"✓ Menu update queued for Telegram")
                 else:
-                    print(f"⚠️ Failed to update menu in Telegram (but updated in DB)")
+                    print(f"⚠️ Failed to queue menu update for Telegram (but updated in DB)")
             except Exception as telegram_error:
                 print(f"⚠️ Error updating in Telegram: {telegram_error}")
                 # Continue anyway - menu is already updated in DB
@@ -2,12 +2,24 @@ from flask import jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from ..services.recipe_service import RecipeService, get_recipe_by_id
 from ..services.ai_service import AIService
+from ..services.gemini_gateway import GeminiBusyError
 from ..services.auth_service import AuthService
+from ..services.job_queue import JobQueue
+from ..utils.images import serve_image
 from flask import Blueprint
 import base64
 
 recipes_bp = Blueprint("recipes", __name__)
 
+
+def _ai_busy_response(error):
+    """429 answer to an AI request Gemini had no capacity for in time"""
+    retry_after = int(error.retry_after) + 1
+    response = jsonify({"error": "AI service is busy, please try again shortly", "retry_after": retry_after})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, 429
+
+
 @recipes_bp.route("/search", methods=["GET"])
 @jwt_required()
 def search_recipes():
@@ -83,16 +95,15 @@ async def update_recipe(telegram_id):
 
         print(f"[UPDATE_RECIPE] Recipe updated successfully. Recipe ID: {recipe.id if recipe else 'None'}", flush=True)
 
-        # Update menus that contain this recipe in Telegram
+        # Update menus that contain this recipe in Telegram, in the background
         if recipe and recipe.id:
             from ..services.menu_service import MenuService
             try:
-                print(f"[UPDATE_RECIPE] Updating menus that contain recipe {recipe.id}...", flush=True)
-                updated_menus = await MenuService.update_menus_with_recipe(recipe.id)
-                print(f"[UPDATE_RECIPE] Updated {updated_menus} menus in Telegram after recipe update", flush=True)
+                job = MenuService.schedule_menus_with_recipe(recipe.id)
+                print(f"[UPDATE_RECIPE] Menus containing recipe {recipe.id} refresh in job {job.id}", flush=True)
             except Exception as menu_error:
                 # Log error but don't fail the recipe update
-                print(f"[UPDATE_RECIPE] Warning: Failed to update menus in Telegram: {menu_error}", flush=True)
+                print(f"[UPDATE_RECIPE] Warning: Failed to schedule menu updates: {menu_error}", flush=True)
 
         print(f"[UPDATE_RECIPE] Returning success response", flush=True)
         return (
@@ -155,6 +166,9 @@ def generate_recipe_suggestion():
         )
         return jsonify({"status": "success", "message": response}), 200
 
+    except GeminiBusyError as e:
+        return _ai_busy_response(e)
+
     except Exception as e:
         print(f"AI generation error: {str(e)}", flush=True)
         return jsonify({"error": "Generation failed"}), 500
@@ -162,15 +176,19 @@ def generate_recipe_suggestion():
 
 @recipes_bp.route("/generate-image", methods=["POST"])
 @jwt_required()
-async def generate_recipe_image():
-    """Generate AI image for recipe"""
+def generate_recipe_image():
+    """Queue AI image generation for recipe, poll /api/jobs/<job_id> for the image"""
     try:
         data = request.get_json()
         if not data or not data.get("recipeContent"):
             return jsonify({"error": "No recipe content provided"}), 400
 
-        image_base64 = await AIService.generate_recipe_image(data["recipeContent"])
-        return jsonify({"image": f"data:image/jpeg;base64,{image_base64}"}), 200
+        job = JobQueue.enqueue(
+            "generate_image",
+            {"recipe_content": data["recipeContent"]},
+            user_id=get_jwt_identity()
+        )
+        return jsonify({"status": "accepted", "job_id": job.id}), 202
 
     except Exception as e:
         print(f"Image generation error in route: {str(e)}", flush=True)
@@ -179,25 +197,24 @@ async def generate_recipe_image():
 
 @recipes_bp.route("/generate-infographic", methods=["POST"])
 @jwt_required()
-async def generate_recipe_infographic():
-    """Generate infographic for recipe using Gemini 3 Pro Image (Nano Banana Pro)"""
+def generate_recipe_infographic():
+    """Queue infographic generation for recipe using Gemini 3 Pro Image (Nano Banana Pro)"""
     try:
         data = request.get_json()
         if not data or not data.get("recipeContent"):
             return jsonify({"error": "No recipe content provided"}), 400
 
-        print(f"[INFOGRAPHIC] Generating infographic for recipe content length: {len(data['recipeContent'])}", flush=True)
-
-        # Generate infographic using the new Gemini 3 Pro Image API
-        image_base64 = await AIService.generate_recipe_infographic(data["recipeContent"])
+        print(f"[INFOGRAPHIC] Queueing infographic for recipe content length: {len(data['recipeContent'])}", flush=True)
 
-        print(f"[INFOGRAPHIC] Successfully generated infographic, base64 length: {len(image_base64)}", flush=True)
-        return jsonify({"image": f"data:image/png;base64,{image_base64}"}), 200
+        job = JobQueue.enqueue(
+            "generate_infographic",
+            {"recipe_content": data["recipeContent"]},
+            user_id=get_jwt_identity()
+        )
+        return jsonify({"status": "accepted", "job_id": job.id}), 202
 
     except Exception as e:
         print(f"[INFOGRAPHIC] Error in route: {str(e)}", flush=True)
-        import traceback
-        print(f"[INFOGRAPHIC] Traceback: {traceback.format_exc()}", flush=True)
         return jsonify({"error": "Infographic generation failed", "message": str(e)}), 500
 
 
@@ -213,6 +230,9 @@ def reformat_recipe():
         reformatted_text = AIService.reformat_recipe(data["text"])
         return jsonify({"reformatted_text": reformatted_text}), 200
 
+    except GeminiBusyError as e:
+        return _ai_busy_response(e)
+
     except Exception as e:
         print(f"Recipe reformatting error in route: {str(e)}", flush=True)
         return jsonify({"error": str(e)}), 500
@@ -223,7 +243,19 @@ def reformat_recipe():
 def get_recipes_for_management():
     """Get all recipes with management metadata"""
     try:
-        
+        # Paged, projected listing when any paging parameter is given
+        if any(arg in request.args for arg in ("limit", "cursor", "fields")):
+            fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+            try:
+                page = RecipeService.get_recipes_page(
+                    limit=request.args.get("limit"),
+                    cursor=request.args.get("cursor"),
+                    fields=fields
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify(page), 200
+
         # Get all recipes with management metadata
         recipes = RecipeService.get_recipes_for_management()
         
@@ -236,8 +268,8 @@ def get_recipes_for_management():
 
 @recipes_bp.route("/bulk", methods=["POST"])
 @jwt_required()
-async def bulk_action():
-    """Handle bulk actions on recipes"""
+def bulk_action():
+    """Queue bulk actions on recipes, poll /api/jobs/<job_id> for the result"""
     try:
         data = request.get_json()
         if not data or "action" not in data or "recipeIds" not in data:
@@ -250,8 +282,12 @@ async def bulk_action():
             return jsonify({"error": "recipeIds must be a list"}), 400
             
         if action == "parse":
-            result = await RecipeService.bulk_parse_recipes(recipe_ids)
-            return jsonify(result), 200
+            job = JobQueue.enqueue(
+                "bulk_parse",
+                {"recipe_ids": recipe_ids},
+                user_id=get_jwt_identity()
+            )
+            return jsonify({"status": "accepted", "job_id": job.id}), 202
         else:
             return jsonify({"error": "Invalid action"}), 400
             
@@ -292,6 +328,21 @@ def get_recipe(telegram_id):
         return jsonify({'error': str(e)}), 500
 
 
+@recipes_bp.route('/<int:recipe_id>/image', methods=['GET'])
+@jwt_required()
+def get_recipe_image(recipe_id):
+    """Serve a recipe image by database id, cacheable by its content hash"""
+    try:
+        image_hash = RecipeService.get_image_hash(recipe_id)
+        response = serve_image(image_hash) if image_hash else None
+        if response is None:
+            return jsonify({'error': 'Image not found'}), 404
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @recipes_bp.route("/refine", methods=["POST"])
 @jwt_required()
 def refine_recipe():
@@ -307,6 +358,9 @@ def refine_recipe():
         )
         return jsonify({"status": "success", "message": refined_recipe}), 200
 
+    except GeminiBusyError as e:
+        return _ai_busy_response(e)
+
     except Exception as e:
         print(f"Recipe refinement error in route: {str(e)}", flush=True)
         return jsonify({"error": "Refinement failed"}), 500
@@ -324,6 +378,9 @@ def optimize_recipe_steps():
         optimized_steps = AIService.optimize_recipe_steps(data["recipe_text"])
         return jsonify({"status": "success", "optimized_steps": optimized_steps}), 200
 
+    except GeminiBusyError as e:
+        return _ai_busy_response(e)
+
     except Exception as e:
         print(f"Recipe step optimization error in route: {str(e)}", flush=True)
         return jsonify({"error": "Step optimization failed"}), 500
@@ -4,7 +4,9 @@ from ..extensions import db
 from ..models.recipe import Recipe
 from ..models.version import RecipeVersion
 from flask import Blueprint
-from ..services.telegram_service import telegram_service
+from ..services.telegram_outbox import TelegramOutbox
+from ..services.recipe_service import RecipeService
+from ..utils.images import serve_image
 
 versions_bp = Blueprint('versions', __name__)
 
@@ -29,6 +31,21 @@ def get_recipe_versions(recipe_id):
         print(f"Error handling versions: {str(e)}", flush=True)
         return jsonify({"error": "Failed to get versions"}), 500
 
+@versions_bp.route('/<int:version_id>/image', methods=['GET'])
+@jwt_required()
+def get_version_image(version_id):
+    """Serve the image saved with a recipe version"""
+    try:
+        image_hash = db.session.query(RecipeVersion.image_hash)\
+            .filter(RecipeVersion.id == version_id).scalar()
+        response = serve_image(image_hash) if image_hash else None
+        if response is None:
+            return jsonify({"error": "Image not found"}), 404
+        return response
+    except Exception as e:
+        print(f"Error getting version image: {str(e)}", flush=True)
+        return jsonify({"error": "Failed to get image"}), 500
+
 @versions_bp.route('/recipe/<int:recipe_id>', methods=['POST'])
 @jwt_required()
 def create_recipe_version(recipe_id):
@@ -129,7 +146,7 @@ def _get_recipe_versions(recipe):
 def _is_content_identical(recipe, version):
     """Check if version content matches current recipe"""
     return (version.content['raw_content'] == recipe.raw_content and 
-            version.image_data == recipe.image_data)
+            version.image_hash == recipe.image_hash)
 
 async def _restore_version(recipe, version):
     """Restore recipe to version state"""
@@ -138,16 +155,6 @@ async def _restore_version(recipe, version):
         print(f"Restoring version {version.version_num} for recipe {recipe.id}", flush=True)
         print(f"Content to restore: title={version.content.get('title')}", flush=True)
         
-        # Update Telegram message first
-        telegram_success = await telegram_service.edit_message(
-            recipe.telegram_id,
-            version.content['raw_content'],
-            version.image_data
-        )
-        
-        if not telegram_success:
-            raise Exception("Failed to update Telegram message")
-            
         recipe.update_content(
             title=version.content['title'],
             raw_content=version.content['raw_content'],
@@ -155,6 +162,14 @@ async def _restore_version(recipe, version):
             created_by=get_jwt_identity(),
             change_description=restore_description
         )
+        RecipeService.reindex_recipe(recipe)
+        TelegramOutbox.edit(
+            recipe.telegram_id,
+            version.content['raw_content'],
+            version.image_data,
+            target=recipe
+        )
+        db.session.commit()
         print("Content updated successfully", flush=True)
         
     except Exception as e:
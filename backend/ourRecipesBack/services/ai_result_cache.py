@@ -0,0 +1,246 @@
+"""
+Cache of deterministic AI transform results
+
+Reformatting, refining and optimizing a recipe are asked again for the same
+text all the time: users retry, bulk parsing runs over recipes it already
+formatted and the frontend asks again on remount. Each answer is kept,
+keyed by operation, model, prompt version and the hash of the normalized
+input, so a repeat request answers at once without spending Gemini quota:
+
+- The prompt version is a hash of the prompt itself, a changed prompt
+  never serves answers to the old one.
+- Inputs are compared after whitespace normalization, the same recipe
+  pasted with other line endings or spacing is the same input.
+- Results are stored in the ai_results table, up to AI_CACHE_MAX_ROWS rows,
+  evicting the least recently used ones. The rows are counted once every
+  AI_CACHE_EVICT_EVERY stores, not on each one, so the table may pass the
+  limit by that many rows in between. The most recent results are kept
+  in memory in front of it, up to AI_CACHE_MEMORY_ENTRIES.
+
+Cache failures are logged and never fail the AI call itself.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from ..extensions import db
+from ..models.ai_result import AIResult
+
+logger = logging.getLogger(__name__)
+
+_SPACES_RE = re.compile(r'[ \t\u00a0\u200e\u200f]+')  # Including no-break space and direction marks
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class AIResultCache:
+    """Two level LRU cache of AI results, in memory and in the database"""
+
+    # Rows kept in ai_results when AI_CACHE_MAX_ROWS is not configured
+    MAX_ROWS = 5000
+    # Results kept in memory when AI_CACHE_MEMORY_ENTRIES is not configured
+    MEMORY_ENTRIES = 256
+    # Stores between evictions when AI_CACHE_EVICT_EVERY is not configured
+    EVICT_EVERY = 100
+    # Seconds between last_used_at updates of a result served from memory
+    TOUCH_SECONDS = 60 * 60
+
+    _lock = threading.Lock()
+    _memory = OrderedDict()  # Key -> (JSON encoded result, last touched), per process
+    _metrics = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+    _puts = 0  # Stores of this process, evicting on every EVICT_EVERY-th
+
+    @classmethod
+    def _config(cls, key, default):
+        return current_app.config.get(key, default) if has_app_context() else default
+
+    @staticmethod
+    def normalize(text):
+        """Normalize text so formatting-only differences give the same input"""
+        text = unicodedata.normalize('NFC', text or '').replace('\r\n', '\n').replace('\r', '\n')
+        lines = [_SPACES_RE.sub(' ', line).strip() for line in text.split('\n')]
+        return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
+    @staticmethod
+    def prompt_version(*prompt_parts):
+        """Version of the prompt an answer was given to, a short hash of its text"""
+        return hashlib.sha256('\0'.join(prompt_parts).encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def key(cls, operation, model, prompt_version, *inputs):
+        """
+        Cache key of an AI call
+
+        Args:
+            operation (str): Name of the transform, e.g. 'reformat'
+            model (str): Gemini model answering
+            prompt_version (str): From prompt_version() of the system prompt
+            *inputs (str): User inputs of the call, normalized before hashing
+
+        Returns:
+            tuple: (operation, model, prompt version, input hash)
+        """
+        normalized = '\0'.join(cls.normalize(part) for part in inputs)
+        input_hash = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return (operation, model, prompt_version, input_hash)
+
+    @classmethod
+    def get(cls, key):
+        """Get the cached result of a key, None on a miss"""
+        with cls._lock:
+            cached = cls._memory.get(key)
+            if cached is not None:
+                cls._memory.move_to_end(key)
+                cls._metrics['memory_hits'] += 1
+        if cached is not None:
+            encoded, touched = cached
+            if time.monotonic() - touched > cls.TOUCH_SECONDS:
+                cls._touch(key, encoded)
+            return json.loads(encoded)
+
+        try:
+            with db.session.begin_nested():
+                row = db.session.execute(select(AIResult).where(*cls._filter(key))).scalar_one_or_none()
+        except SQLAlchemyError as e:
+            logger.warning(f"Reading AI result cache failed: {str(e)}")
+            row = None
+        if row is None:
+            with cls._lock:
+                cls._metrics['misses'] += 1
+            return None
+
+        with cls._lock:
+            cls._metrics['db_hits'] += 1
+        cls._touch(key, row.result)
+        return json.loads(row.result)
+
+    @classmethod
+    def put(cls, key, result):
+        """
+        Store the result of a key, evicting the least recently used rows past
+        the limit on every AI_CACHE_EVICT_EVERY-th store
+
+        The row is committed at once, unless the caller has unfinished work
+        in the session: its commit writes the row then, so that work is never
+        committed early.
+        """
+        encoded = json.dumps(result, ensure_ascii=False)
+        cls._remember(key, encoded)
+        owns_session = cls._session_clean()
+        now = _utcnow()
+        try:
+            with db.session.begin_nested():
+                row = db.session.execute(select(AIResult).where(*cls._filter(key))).scalar_one_or_none()
+                if row is None:
+                    operation, model, prompt_version, input_hash = key
+                    row = AIResult(
+                        operation=operation, model=model, prompt_version=prompt_version,
+                        input_hash=input_hash, hits=0, created_at=now
+                    )
+                    db.session.add(row)
+                row.result = encoded
+                row.last_used_at = now
+            if cls._evict_due():
+                with db.session.begin_nested():
+                    cls._evict()
+            if owns_session:
+                db.session.commit()
+        except SQLAlchemyError as e:
+            logger.warning(f"Storing AI result failed: {str(e)}")
+
+    @classmethod
+    def cached(cls, key, compute):
+        """Get the result of a key, computing and storing it on a miss"""
+        result = cls.get(key)
+        if result is None:
+            result = compute()
+            cls.put(key, result)
+        return result
+
+    @classmethod
+    def _filter(cls, key):
+        operation, model, prompt_version, input_hash = key
+        return (
+            AIResult.operation == operation,
+            AIResult.model == model,
+            AIResult.prompt_version == prompt_version,
+            AIResult.input_hash == input_hash,
+        )
+
+    @classmethod
+    def _session_clean(cls):
+        session = db.session
+        return not (session.new or session.dirty or session.deleted)
+
+    @classmethod
+    def _remember(cls, key, encoded):
+        """Keep a result in memory, dropping the least recently used past the limit"""
+        limit = cls._config('AI_CACHE_MEMORY_ENTRIES', cls.MEMORY_ENTRIES)
+        with cls._lock:
+            cls._memory[key] = (encoded, time.monotonic())
+            cls._memory.move_to_end(key)
+            while len(cls._memory) > limit:
+                cls._memory.popitem(last=False)
+
+    @classmethod
+    def _touch(cls, key, encoded):
+        """Mark a stored result used so eviction keeps it, committed like put"""
+        cls._remember(key, encoded)
+        owns_session = cls._session_clean()
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    update(AIResult)
+                    .where(*cls._filter(key))
+                    .values(last_used_at=_utcnow(), hits=AIResult.hits + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            if owns_session:
+                db.session.commit()
+        except SQLAlchemyError as e:
+            logger.warning(f"Updating AI result cache failed: {str(e)}")
+
+    @classmethod
+    def _evict_due(cls):
+        """Count a store, True when it is the one to evict on"""
+        every = max(1, cls._config('AI_CACHE_EVICT_EVERY', cls.EVICT_EVERY))
+        with cls._lock:
+            cls._puts += 1
+            return cls._puts % every == 0
+
+    @classmethod
+    def _evict(cls):
+        """Delete the least recently used rows past AI_CACHE_MAX_ROWS"""
+        excess = db.session.scalar(select(func.count(AIResult.id))) - cls._config('AI_CACHE_MAX_ROWS', cls.MAX_ROWS)
+        if excess <= 0:
+            return
+        oldest = db.session.scalars(
+            select(AIResult.id).order_by(AIResult.last_used_at, AIResult.id).limit(excess)
+        ).all()
+        db.session.execute(
+            AIResult.__table__.delete().where(AIResult.id.in_(oldest))
+        )
+        logger.info(f"Evicted {len(oldest)} cached AI results")
+
+    @classmethod
+    def clear_memory(cls):
+        """Forget the results kept in memory, the stored ones stay"""
+        with cls._lock:
+            cls._memory.clear()
+
+    @classmethod
+    def metrics(cls):
+        """Hits and misses of this process, and the results held in memory"""
+        with cls._lock:
+            return {**cls._metrics, 'memory_entries': len(cls._memory)}
@@ -1,9 +1,11 @@
-from google import genai
 from google.genai import types
 from flask import current_app
 import requests
 import base64
 import json
+from .ai_result_cache import AIResultCache
+from .gemini_gateway import GeminiGateway
+from .job_queue import JobQueue
 
 
 class AIService:
@@ -54,9 +56,6 @@ class AIService:
             str: Generated recipe text
         """
         try:
-            # Create AI client
-            client = genai.Client(api_key=current_app.config["GOOGLE_API_KEY"])
-
             # Build user prompt parts
             prompt_parts = []
             if ingredients:
@@ -75,10 +74,10 @@ class AIService:
             # Join all parts with periods
             user_prompt = ". ".join(prompt_parts)
 
-            # Generate response using new API
-            response = client.models.generate_content(
+            # Generate response through the shared rate limited gateway
+            response = GeminiGateway.generate_content(
+                user_prompt,
                 model="gemini-2.5-flash",
-                contents=user_prompt,
                 config=types.GenerateContentConfig(
                     system_instruction=cls._get_recipe_prompt()
                 )
@@ -101,9 +100,7 @@ class AIService:
             str: Base64 encoded image
         """
         try:
-            # First get image prompt from language model using new SDK
-            client = genai.Client(api_key=current_app.config["GOOGLE_API_KEY"])
-
+            # First get image prompt from language model
             prompt_request = f"""
             Create a detailed English prompt for generating an image of this recipe: {recipe_content}.
             The prompt should describe the perfect photo for this dish.
@@ -111,9 +108,10 @@ class AIService:
             Keep the prompt under 100 words.
             """
 
-            prompt_response = client.models.generate_content(
+            prompt_response = await GeminiGateway.generate_content_async(
+                prompt_request,
                 model="gemini-2.5-flash",
-                contents=prompt_request
+                max_wait=GeminiGateway.JOB_MAX_WAIT_SECONDS
             )
 
             # Use prompt to generate image
@@ -136,12 +134,13 @@ class AIService:
             raise
 
     @classmethod
-    def reformat_recipe(cls, recipe_text):
+    def reformat_recipe(cls, recipe_text, priority=GeminiGateway.INTERACTIVE):
         """
         Reformat recipe text to a structured format
 
         Args:
             recipe_text (str): Raw recipe text to format
+            priority (int): Gateway priority, BULK for batch work
 
         Returns:
             str: Formatted recipe text
@@ -177,18 +176,24 @@ class AIService:
             - בחר רמת קושי מתאימה: קל/בינוני/מורכב
             """
 
-            # Use new SDK
-            client = genai.Client(api_key=current_app.config["GOOGLE_API_KEY"])
-
-            # Generate response
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=recipe_text,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt
+            model = "gemini-2.5-flash"
+            prompt_version = AIResultCache.prompt_version(system_prompt)
+
+            def generate():
+                response = GeminiGateway.generate_content(
+                    recipe_text,
+                    model=model,
+                    config=types.GenerateContentConfig(
+                        system_instruction=system_prompt
+                    ),
+                    priority=priority
                 )
-            )
-            return response.text
+                # A formatted recipe reformats to itself, so bulk parsing it again is free
+                AIResultCache.put(AIResultCache.key('reformat', model, prompt_version, response.text), response.text)
+                return response.text
+
+            # Same text asked again is answered from the cache
+            return AIResultCache.cached(AIResultCache.key('reformat', model, prompt_version, recipe_text), generate)
 
         except Exception as e:
             print(f"Recipe reformatting error: {str(e)}")
@@ -225,7 +230,7 @@ class AIService:
                 """
 
             # Build prompt
-            prompt = f"""
+            prompt_template = """
             זהו המתכון המקורי:
             {recipe_text}
 
@@ -234,19 +239,22 @@ class AIService:
 
             אנא שפר את המתכון לפי הבקשה תוך שמירה על אותו פורמט בדיוק.
             """
+            prompt = prompt_template.format(recipe_text=recipe_text, refinement_request=refinement_request)
 
-            # Use new SDK
-            client = genai.Client(api_key=current_app.config["GOOGLE_API_KEY"])
+            model = "gemini-2.5-flash"
+            key = AIResultCache.key(
+                'refine', model, AIResultCache.prompt_version(system_instruction, prompt_template),
+                recipe_text, refinement_request
+            )
 
-            # Generate response
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
+            # Generate response, unless the same refinement was asked before
+            return AIResultCache.cached(key, lambda: GeminiGateway.generate_content(
+                prompt,
+                model=model,
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction
                 )
-            )
-            return response.text
+            ).text)
 
         except Exception as e:
             print(f"Recipe refinement error: {str(e)}")
@@ -343,7 +351,6 @@ class AIService:
         try:
             # Create AI client with Nano Banana Pro API key (paid account)
             api_key = current_app.config.get("GOOGLE_API_KEY_NANO_BANANA") or current_app.config["GOOGLE_API_KEY"]
-            client = genai.Client(api_key=api_key)
 
             # Simplified prompt - send full recipe content and let the model have creative freedom
             prompt_text = f"""Generate an image:
@@ -361,12 +368,14 @@ Style: Modern infographic design, warm appetizing colors, clean layout.
             # 1. Go to https://aistudio.google.com/
             # 2. Enable billing for your project
             # 3. The API key needs to be from a project with billing enabled
-            response = client.models.generate_content(
+            response = await GeminiGateway.generate_content_async(
+                prompt_text,
                 model="gemini-3-pro-image-preview",
-                contents=prompt_text,
                 config=types.GenerateContentConfig(
                     response_modalities=['IMAGE'],
                 ),
+                api_key=api_key,
+                max_wait=GeminiGateway.JOB_MAX_WAIT_SECONDS
             )
 
             # Extract the image from the response
@@ -444,63 +453,96 @@ Style: Modern infographic design, warm appetizing colors, clean layout.
             7. אל תוסיף הערות או הסברים - רק JSON
             """
 
-            # Use new SDK
-            client = genai.Client(api_key=current_app.config["GOOGLE_API_KEY"])
+            model = "gemini-2.5-flash"
+            key = AIResultCache.key('optimize', model, AIResultCache.prompt_version(system_instruction), recipe_text)
 
-            # Generate response
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=recipe_text,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction
+            def generate():
+                response = GeminiGateway.generate_content(
+                    recipe_text,
+                    model=model,
+                    config=types.GenerateContentConfig(
+                        system_instruction=system_instruction
+                    )
                 )
-            )
-            response_text = response.text.strip()
-            
-            # Clean the response text from markdown code blocks
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]  # Remove ```json prefix
-            if response_text.startswith('```'):
-                response_text = response_text[3:]  # Remove ``` prefix
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]  # Remove ``` suffix
-            
-            response_text = response_text.strip()
-            
-            # Try to parse the response as JSON
-            try:
-                parsed_steps = json.loads(response_text)
-                
-                # Validate structure
-                if not isinstance(parsed_steps, dict):
-                    raise ValueError("Response must be a JSON object")
-                
-                required_fields = ["optimized_steps", "prep_ahead_steps", "total_optimized_time", 
-                                 "total_sequential_time", "time_saved"]
-                for field in required_fields:
-                    if field not in parsed_steps:
-                        raise ValueError(f"Missing required field: {field}")
-                
-                if not isinstance(parsed_steps["optimized_steps"], list):
-                    raise ValueError("optimized_steps must be an array")
-                
-                if not isinstance(parsed_steps["prep_ahead_steps"], list):
-                    raise ValueError("prep_ahead_steps must be an array")
-                
-                # Convert string times to integers if needed
-                for field in ["total_optimized_time", "total_sequential_time", "time_saved"]:
-                    if isinstance(parsed_steps[field], str):
-                        parsed_steps[field] = int(''.join(filter(str.isdigit, parsed_steps[field])))
-                
-                return parsed_steps
-                
-            except json.JSONDecodeError as e:
-                print(f"Invalid JSON from AI: {response_text}")
-                raise ValueError("AI response is not valid JSON")
-            except Exception as e:
-                print(f"Validation error: {str(e)}")
-                raise ValueError(f"Invalid response structure: {str(e)}")
+                return cls._parse_optimized_steps(response.text)
+
+            # Only validated answers are cached
+            return AIResultCache.cached(key, generate)
 
         except Exception as e:
             print(f"Recipe step optimization error: {str(e)}")
             raise
+
+    @classmethod
+    def _parse_optimized_steps(cls, response_text):
+        """
+        Parse and validate the JSON answer of a step optimization
+
+        Args:
+            response_text (str): Answer of the model
+
+        Returns:
+            dict: Optimized recipe information with parallel steps
+
+        Raises:
+            ValueError: When the answer is no valid optimization
+        """
+        response_text = response_text.strip()
+        
+        # Clean the response text from markdown code blocks
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]  # Remove ```json prefix
+        if response_text.startswith('```'):
+            response_text = response_text[3:]  # Remove ``` prefix
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]  # Remove ``` suffix
+        
+        response_text = response_text.strip()
+        
+        # Try to parse the response as JSON
+        try:
+            parsed_steps = json.loads(response_text)
+            
+            # Validate structure
+            if not isinstance(parsed_steps, dict):
+                raise ValueError("Response must be a JSON object")
+            
+            required_fields = ["optimized_steps", "prep_ahead_steps", "total_optimized_time", 
+                             "total_sequential_time", "time_saved"]
+            for field in required_fields:
+                if field not in parsed_steps:
+                    raise ValueError(f"Missing required field: {field}")
+            
+            if not isinstance(parsed_steps["optimized_steps"], list):
+                raise ValueError("optimized_steps must be an array")
+            
+            if not isinstance(parsed_steps["prep_ahead_steps"], list):
+                raise ValueError("prep_ahead_steps must be an array")
+            
+            # Convert string times to integers if needed
+            for field in ["total_optimized_time", "total_sequential_time", "time_saved"]:
+                if isinstance(parsed_steps[field], str):
+                    parsed_steps[field] = int(''.join(filter(str.isdigit, parsed_steps[field])))
+            
+            return parsed_steps
+            
+        except json.JSONDecodeError as e:
+            print(f"Invalid JSON from AI: {response_text}")
+            raise ValueError("AI response is not valid JSON")
+        except Exception as e:
+            print(f"Validation error: {str(e)}")
+            raise ValueError(f"Invalid response structure: {str(e)}")
+
+
+@JobQueue.handler('generate_image', max_attempts=2)
+async def run_generate_image_job(payload):
+    """Job queue entry point of recipe image generation"""
+    image_base64 = await AIService.generate_recipe_image(payload['recipe_content'])
+    return {"image": f"data:image/jpeg;base64,{image_base64}"}
+
+
+@JobQueue.handler('generate_infographic', max_attempts=2)
+async def run_generate_infographic_job(payload):
+    """Job queue entry point of recipe infographic generation"""
+    image_base64 = await AIService.generate_recipe_infographic(payload['recipe_content'])
+    return {"image": f"data:image/png;base64,{image_base64}"}
@@ -0,0 +1,313 @@
+"""
+Gateway of all Gemini API calls of the process
+
+Gemini limits requests per minute and per day for each model. Calls wait
+for a slot here instead of running into 429 answers:
+
+- Each model has a token bucket paced to its requests per minute, and a
+  daily counter. A call past the daily limit fails at once.
+- Waiting calls queue by priority, interactive requests before bulk work,
+  and in arrival order within a priority.
+- A 429 answer blocks the model for the retry delay Gemini names, then the
+  call queues again, up to MAX_RETRIES times.
+- No call waits longer than its limit (GEMINI_MAX_WAIT_SECONDS for
+  interactive calls), it raises GeminiBusyError with the seconds to retry
+  after, so a request answers instead of pinning its worker for minutes.
+
+Async callers wait with asyncio.sleep and never block their event loop.
+Queue waits, retries and rejections are counted in metrics().
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app, has_app_context
+from google.genai import errors
+from ..utils.rate_limit import TokenBucket
+from .genai_clients import GenAIClients
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiBusyError(Exception):
+    """Gemini has no capacity for a call within the time it may wait"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _ModelLimit:
+    """Rate limit state and wait queue of one model"""
+
+    def __init__(self, per_minute, per_day, burst):
+        self.bucket = TokenBucket(per_minute / 60, burst)
+        self.per_day = per_day
+        self.day = None
+        self.used_today = 0
+        self.waiting = []  # Heap of (priority, seq) tickets
+
+    def count_call(self):
+        today = datetime.now(timezone.utc).date()
+        if today != self.day:
+            self.day, self.used_today = today, 0
+        self.used_today += 1
+
+    def day_exhausted(self):
+        return self.day == datetime.now(timezone.utc).date() and self.used_today >= self.per_day
+
+
+class GeminiGateway:
+    """Rate limit, queue and retry Gemini calls"""
+
+    INTERACTIVE = 0
+    BULK = 1
+    PRIORITY_NAMES = {INTERACTIVE: 'interactive', BULK: 'bulk'}
+
+    DEFAULT_MODEL = 'gemini-2.5-flash'
+    # Free tier requests per minute and per day of each model
+    MODEL_LIMITS = {
+        'gemini-2.5-flash': (10, 250),
+        'gemini-3-pro-image-preview': (10, 1000),
+    }
+    DEFAULT_LIMITS = (10, 250)
+    # Calls a model may take at once before pacing starts
+    BURST = 2
+    # Longest wait of a call for a slot, including retry delays
+    MAX_WAIT_SECONDS = {INTERACTIVE: 20, BULK: 600}
+    # Longest wait of calls made by background jobs someone waits for
+    JOB_MAX_WAIT_SECONDS = 300
+    # 429 answers retried per call
+    MAX_RETRIES = 3
+    # Retry delay when a 429 answer names none
+    DEFAULT_RETRY_DELAY = 60
+    # Longest sleep between checks of a waiting call
+    POLL_SECONDS = 0.5
+
+    _RETRY_DELAY_RE = re.compile(r'retry_?delay\D*?(\d+(?:\.\d+)?)', re.IGNORECASE)
+
+    _lock = threading.Lock()
+    _models = {}  # Model name -> _ModelLimit, per process
+    _seq = itertools.count()
+    _metrics = {}
+
+    @classmethod
+    def _config(cls, key, default):
+        return current_app.config.get(key, default) if has_app_context() else default
+
+    @classmethod
+    def _limit(cls, model):
+        """Rate limit state of a model, call with the lock held"""
+        limit = cls._models.get(model)
+        if limit is None:
+            per_minute, per_day = cls.MODEL_LIMITS.get(model, cls.DEFAULT_LIMITS)
+            per_minute = cls._config('GEMINI_RPM', None) or per_minute
+            per_day = cls._config('GEMINI_RPD', None) or per_day
+            limit = _ModelLimit(per_minute, per_day, cls.BURST)
+            cls._models[model] = limit
+        return limit
+
+    @classmethod
+    def _stats(cls, priority):
+        return cls._metrics.setdefault(cls.PRIORITY_NAMES[priority], {
+            'calls': 0, 'wait_total': 0.0, 'wait_max': 0.0, 'rate_limited': 0, 'rejected': 0,
+        })
+
+    @classmethod
+    def _max_wait(cls, priority, max_wait):
+        if max_wait is not None:
+            return max_wait
+        if priority == cls.INTERACTIVE:
+            return cls._config('GEMINI_MAX_WAIT_SECONDS', cls.MAX_WAIT_SECONDS[priority])
+        return cls.MAX_WAIT_SECONDS[priority]
+
+    @classmethod
+    def _enqueue(cls, model, priority):
+        ticket = (priority, next(cls._seq))
+        with cls._lock:
+            heapq.heappush(cls._limit(model).waiting, ticket)
+        return ticket
+
+    @classmethod
+    def _dequeue(cls, model, ticket):
+        with cls._lock:
+            waiting = cls._limit(model).waiting
+            if ticket in waiting:
+                waiting.remove(ticket)
+                heapq.heapify(waiting)
+
+    @classmethod
+    def _next_wait(cls, model, ticket, deadline):
+        """
+        Take a call slot for the ticket when it is first in line and one is free
+
+        Returns:
+            float: 0 when the slot was taken, else seconds to sleep before asking again
+
+        Raises:
+            GeminiBusyError: When the daily limit is used up or the deadline would pass
+        """
+        priority = ticket[0]
+        with cls._lock:
+            limit = cls._limit(model)
+            if limit.day_exhausted():
+                tomorrow = datetime.combine(limit.day + timedelta(days=1), datetime.min.time(), timezone.utc)
+                retry_after = (tomorrow - datetime.now(timezone.utc)).total_seconds()
+                cls._stats(priority)['rejected'] += 1
+                raise GeminiBusyError(f"Daily Gemini limit of {model} reached", retry_after)
+
+            first = limit.waiting[0] == ticket
+            wait = limit.bucket.available_in() if first else cls.POLL_SECONDS
+            if first and wait == 0:
+                limit.bucket.take()
+                limit.count_call()
+                heapq.heappop(limit.waiting)
+                return 0
+
+            left = deadline - time.monotonic()
+            if left <= 0 or (first and wait > left):
+                cls._stats(priority)['rejected'] += 1
+                raise GeminiBusyError(f"Gemini {model} is busy", max(wait, cls.POLL_SECONDS))
+            return min(wait, cls.POLL_SECONDS, left)
+
+    @classmethod
+    def _record_wait(cls, priority, waited):
+        with cls._lock:
+            stats = cls._stats(priority)
+            stats['calls'] += 1
+            stats['wait_total'] += waited
+            stats['wait_max'] = max(stats['wait_max'], waited)
+
+    @classmethod
+    def _acquire(cls, model, priority, deadline):
+        """Wait in line for a call slot of the model"""
+        ticket = cls._enqueue(model, priority)
+        started = time.monotonic()
+        try:
+            while wait := cls._next_wait(model, ticket, deadline):
+                time.sleep(wait)
+        except BaseException:
+            cls._dequeue(model, ticket)
+            raise
+        cls._record_wait(priority, time.monotonic() - started)
+
+    @classmethod
+    async def _acquire_async(cls, model, priority, deadline):
+        """Wait in line for a call slot of the model, without blocking the event loop"""
+        ticket = cls._enqueue(model, priority)
+        started = time.monotonic()
+        try:
+            while wait := cls._next_wait(model, ticket, deadline):
+                await asyncio.sleep(wait)
+        except BaseException:
+            cls._dequeue(model, ticket)
+            raise
+        cls._record_wait(priority, time.monotonic() - started)
+
+    @classmethod
+    def _retry_delay(cls, error):
+        match = cls._RETRY_DELAY_RE.search(str(error))
+        return float(match.group(1)) if match else cls.DEFAULT_RETRY_DELAY
+
+    @classmethod
+    def _rate_limited(cls, model, priority, error, attempt, deadline):
+        """
+        Handle a failed call: block the model after a 429 answer so the call can queue again
+
+        Raises:
+            The error itself when it is no 429 answer, GeminiBusyError when
+            retries are used up or the retry delay passes the deadline
+        """
+        if not isinstance(error, errors.ClientError) or error.code != 429:
+            raise error
+        delay = cls._retry_delay(error)
+        with cls._lock:
+            cls._limit(model).bucket.block(delay)
+            cls._stats(priority)['rate_limited'] += 1
+        logger.warning(f"Gemini {model} rate limited, retrying in {delay:.0f} seconds")
+        if attempt >= cls.MAX_RETRIES or time.monotonic() + delay > deadline:
+            with cls._lock:
+                cls._stats(priority)['rejected'] += 1
+            raise GeminiBusyError(f"Gemini {model} is rate limited", delay) from error
+
+    @classmethod
+    def call(cls, operation, model=DEFAULT_MODEL, priority=INTERACTIVE, max_wait=None):
+        """
+        Run a Gemini call when the model has capacity
+
+        Args:
+            operation (callable): Makes the call, without arguments
+            model (str): Model the call uses, whose limits apply
+            priority (int): INTERACTIVE or BULK
+            max_wait (float): Seconds the call may wait, by priority by default
+
+        Returns:
+            The result of the operation
+
+        Raises:
+            GeminiBusyError: When no capacity is found in time
+        """
+        deadline = time.monotonic() + cls._max_wait(priority, max_wait)
+        for attempt in itertools.count(1):
+            cls._acquire(model, priority, deadline)
+            try:
+                return operation()
+            except errors.ClientError as e:
+                cls._rate_limited(model, priority, e, attempt, deadline)
+
+    @classmethod
+    async def call_async(cls, operation, model=DEFAULT_MODEL, priority=INTERACTIVE, max_wait=None):
+        """Like call, for an operation returning an awaitable"""
+        deadline = time.monotonic() + cls._max_wait(priority, max_wait)
+        for attempt in itertools.count(1):
+            await cls._acquire_async(model, priority, deadline)
+            try:
+                return await operation()
+            except errors.ClientError as e:
+                cls._rate_limited(model, priority, e, attempt, deadline)
+
+    @classmethod
+    def generate_content(cls, contents, model=DEFAULT_MODEL, config=None, api_key=None,
+                         priority=INTERACTIVE, max_wait=None):
+        """Generate content through the gateway, with the shared client of the API key"""
+        client = GenAIClients.get(api_key)
+        return cls.call(
+            lambda: client.models.generate_content(model=model, contents=contents, config=config),
+            model=model, priority=priority, max_wait=max_wait
+        )
+
+    @classmethod
+    async def generate_content_async(cls, contents, model=DEFAULT_MODEL, config=None, api_key=None,
+                                     priority=INTERACTIVE, max_wait=None):
+        """Generate content through the gateway, running the shared client in a worker thread"""
+        client = GenAIClients.get(api_key)
+        return await cls.call_async(
+            lambda: asyncio.to_thread(client.models.generate_content, model=model, contents=contents, config=config),
+            model=model, priority=priority, max_wait=max_wait
+        )
+
+    @classmethod
+    def metrics(cls):
+        """Queue wait, retry and rejection counts by priority, and state by model"""
+        with cls._lock:
+            priorities = {
+                name: {
+                    **stats,
+                    'wait_average': stats['wait_total'] / stats['calls'] if stats['calls'] else 0.0,
+                }
+                for name, stats in cls._metrics.items()
+            }
+            models = {
+                model: {
+                    'waiting': len(limit.waiting),
+                    'used_today': limit.used_today if limit.day == datetime.now(timezone.utc).date() else 0,
+                    'per_day': limit.per_day,
+                    'blocked_for': limit.bucket.blocked_for(),
+                }
+                for model, limit in cls._models.items()
+            }
+        return {'priorities': priorities, 'models': models}
@@ -0,0 +1,108 @@
+"""
+Shared genai clients, one per API key
+
+A genai.Client keeps an httpx connection pool, so reusing one client keeps
+the HTTPS connection to Gemini open between AI calls instead of paying a
+new TLS handshake per request. Clients are created on first use, with the
+timeout and keep-alive of the app config, and a warm-up at startup opens
+the connection before the first AI feature is used.
+
+Async callers run the pooled sync client in a worker thread: an httpx
+async pool is bound to the event loop that opened it, and background jobs
+each run in a loop of their own.
+"""
+import logging
+import threading
+import httpx
+from flask import current_app
+from google import genai
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+class GenAIClients:
+    """Registry of genai clients keyed by API key"""
+
+    # Seconds a Gemini request may take
+    TIMEOUT_SECONDS = 120
+    # Seconds an idle pooled connection is kept open
+    KEEPALIVE_SECONDS = 300
+    # Open connections kept per client
+    MAX_KEEPALIVE_CONNECTIONS = 10
+
+    _lock = threading.Lock()
+    _clients = {}  # API key -> genai.Client, per process
+
+    @classmethod
+    def get(cls, api_key=None):
+        """
+        Get the shared client of an API key
+
+        Args:
+            api_key (str): GOOGLE_API_KEY by default
+
+        Returns:
+            genai.Client: Client created on first use
+        """
+        api_key = api_key or current_app.config["GOOGLE_API_KEY"]
+        with cls._lock:
+            client = cls._clients.get(api_key)
+            if client is None:
+                client = genai.Client(api_key=api_key, http_options=cls._http_options())
+                cls._clients[api_key] = client
+            return client
+
+    @classmethod
+    def _http_options(cls):
+        config = current_app.config
+        limits = httpx.Limits(
+            max_keepalive_connections=cls.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.get('GEMINI_KEEPALIVE_SECONDS', cls.KEEPALIVE_SECONDS)
+        )
+        return types.HttpOptions(
+            # The SDK takes milliseconds
+            timeout=int(config.get('GEMINI_TIMEOUT_SECONDS', cls.TIMEOUT_SECONDS) * 1000),
+            client_args={'limits': limits},
+        )
+
+    @classmethod
+    def close_all(cls):
+        """Close every client and its connections"""
+        with cls._lock:
+            clients, cls._clients = list(cls._clients.values()), {}
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Closing genai client failed: {str(e)}")
+
+    @classmethod
+    def init_app(cls, app):
+        """Warm up the clients of the configured API keys in the background, unless testing"""
+        if app.config.get('TESTING') or not app.config.get('GEMINI_WARMUP', True):
+            return
+        api_keys = {
+            key for key in (app.config.get("GOOGLE_API_KEY"), app.config.get("GOOGLE_API_KEY_NANO_BANANA"))
+            if key
+        }
+        if not api_keys:
+            return
+        threading.Thread(
+            target=cls._warm_up,
+            args=(app, api_keys),
+            daemon=True,
+            name='genai-warmup'
+        ).start()
+
+    @classmethod
+    def _warm_up(cls, app, api_keys):
+        """Open the pooled connection of each client with a model lookup, not a generation request"""
+        from .gemini_gateway import GeminiGateway
+        with app.app_context():
+            for api_key in api_keys:
+                try:
+                    cls.get(api_key).models.get(model=GeminiGateway.DEFAULT_MODEL)
+                except Exception as e:
+                    logger.warning(f"Gemini warm-up failed: {str(e)}")
+        logger.info(f"Warmed up {len(api_keys)} genai clients")
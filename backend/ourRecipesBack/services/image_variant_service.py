@@ -0,0 +1,169 @@
+"""
+Responsive image variants
+
+Each stored image gets thumbnail, medium and full size copies in WebP and
+JPEG. Variants are derived once per image hash in a background worker pool,
+stored in the blob store and looked up by the image endpoint. Until they
+exist the original image is served, so requests never wait for resizing.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..blob_store import blob_store
+from ..models.image_variant import ImageVariant
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional, originals are served without it
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+class ImageVariantService:
+    """Derive, store and look up image variants"""
+
+    # Longest side in pixels for each variant
+    SIZES = {
+        'thumb': 320,
+        'medium': 800,
+        'full': 1600,
+    }
+    FORMATS = {
+        'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+        'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+    }
+    MAX_WORKERS = 2
+
+    _executor = None
+    _pending = set()
+    _lock = threading.Lock()
+
+    @classmethod
+    def is_enabled(cls):
+        return Image is not None
+
+    @classmethod
+    def _get_executor(cls):
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.MAX_WORKERS,
+                    thread_name_prefix='image-variants'
+                )
+            return cls._executor
+
+    @classmethod
+    def schedule(cls, source_hash):
+        """
+        Queue variant generation for an image hash
+
+        Returns:
+            Future | None: None when there is nothing to do
+        """
+        if not source_hash or not cls.is_enabled():
+            return None
+        with cls._lock:
+            if source_hash in cls._pending:
+                return None
+            cls._pending.add(source_hash)
+
+        app = current_app._get_current_object()
+        return cls._get_executor().submit(cls._run, app, source_hash)
+
+    @classmethod
+    def _run(cls, app, source_hash):
+        try:
+            with app.app_context():
+                return cls.generate(source_hash)
+        except Exception as e:
+            logger.error(f"Failed to generate image variants for {source_hash}: {str(e)}")
+        finally:
+            with cls._lock:
+                cls._pending.discard(source_hash)
+
+    @classmethod
+    def generate(cls, source_hash):
+        """
+        Create the missing variants of an image
+
+        Returns:
+            int: Number of variants created
+        """
+        existing = {
+            (v.size, v.format)
+            for v in ImageVariant.query.filter_by(source_hash=source_hash).all()
+        }
+        missing = [
+            (size, fmt) for size in cls.SIZES for fmt in cls.FORMATS
+            if (size, fmt) not in existing
+        ]
+        if not missing:
+            return 0
+
+        data = blob_store.get(source_hash)
+        if data is None:
+            return 0
+
+        with Image.open(BytesIO(data)) as original:
+            original = ImageOps.exif_transpose(original)
+            original.load()
+
+            for size, fmt in missing:
+                encoded, width, height = cls._render(original, cls.SIZES[size], fmt)
+                db.session.add(ImageVariant(
+                    source_hash=source_hash,
+                    size=size,
+                    format=fmt,
+                    variant_hash=blob_store.put(encoded),
+                    width=width,
+                    height=height
+                ))
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored the same variants first
+            db.session.rollback()
+            return 0
+        logger.info(f"Generated {len(missing)} image variants for {source_hash}")
+        return len(missing)
+
+    @classmethod
+    def _render(cls, image, max_side, fmt):
+        """Resize within max_side and encode, returns (bytes, width, height)"""
+        resized = image.copy()
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        if fmt == 'jpeg' and resized.mode not in ('RGB', 'L'):
+            resized = resized.convert('RGB')
+        elif fmt == 'webp' and resized.mode not in ('RGB', 'RGBA'):
+            resized = resized.convert('RGBA' if 'A' in resized.getbands() else 'RGB')
+
+        output = BytesIO()
+        resized.save(output, **cls.FORMATS[fmt])
+        return output.getvalue(), resized.width, resized.height
+
+    @classmethod
+    def find(cls, source_hash, size, accepts_webp):
+        """
+        Get the variant hash for a requested size, preferring WebP when accepted
+
+        Schedules generation when the variant does not exist yet.
+
+        Returns:
+            str | None: Variant hash, None when the original should be served
+        """
+        if size not in cls.SIZES or not cls.is_enabled():
+            return None
+        fmt = 'webp' if accepts_webp else 'jpeg'
+        variant_hash = db.session.query(ImageVariant.variant_hash).filter_by(
+            source_hash=source_hash, size=size, format=fmt
+        ).scalar()
+        if variant_hash is None:
+            cls.schedule(source_hash)
+        return variant_hash
@@ -0,0 +1,387 @@
+"""
+Background job queue
+
+Slow operations such as channel syncs and AI generation are stored as rows
+of the sync_queue table and run by a small pool of worker threads, so a
+request only enqueues them and answers 202 with a job id to poll. A job that
+raises is retried with exponential backoff until it runs out of attempts,
+except for ValueError which marks bad input and fails it at once. Workers
+heartbeat the job they run, and a job whose worker stopped heartbeating is
+picked up again by another worker. A job type may register a failure hook,
+called once a job of it failed for good or was cancelled, also when its
+handler never ran.
+"""
+import asyncio
+import inspect
+import logging
+import threading
+from datetime import timedelta
+from flask import current_app
+from ..extensions import db
+from ..models.enums import QueueStatus, QueueActionType
+from ..models.sync import SyncQueue, _utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Enqueue background jobs and run them in worker threads"""
+
+    # Worker threads when JOB_WORKERS is not configured
+    WORKERS = 2
+    # Seconds an idle worker waits before looking for jobs again
+    POLL_SECONDS = 5
+    # Seconds between heartbeats of a running job
+    HEARTBEAT_SECONDS = 30
+    # Seconds without a heartbeat after which a running job is taken over
+    STALE_SECONDS = 600
+    # Delay before the first retry, doubled for every further attempt
+    RETRY_BACKOFF_SECONDS = 15
+    MAX_BACKOFF_SECONDS = 900
+    # Finished jobs and their results are kept this long
+    RESULT_TTL = timedelta(days=1)
+    PURGE_INTERVAL = timedelta(hours=1)
+    # Candidates read per claim attempt
+    CLAIM_BATCH = 5
+
+    _handlers = {}
+    _failure_hooks = {}
+    _running = {}  # Job id -> (loop, task) of async jobs running in this process
+    _lock = threading.Lock()
+    _wake = threading.Event()
+    _last_purge = None
+
+    @classmethod
+    def handler(cls, job_type, max_attempts=3):
+        """
+        Register the function running a job type
+
+        The function gets the job payload and returns a JSON serializable
+        result. It may be a coroutine function.
+        """
+        def decorator(func):
+            cls._handlers[job_type] = (func, max_attempts)
+            return func
+        return decorator
+
+    @classmethod
+    def on_failure(cls, job_type):
+        """
+        Register the function called when a job of the type will not run again
+
+        The function gets the job payload and the error, after the job was
+        stored failed or cancelled: on its last attempt, on a ValueError, on
+        cancel and when it was given up without running.
+        """
+        def decorator(func):
+            cls._failure_hooks[job_type] = func
+            return func
+        return decorator
+
+    @classmethod
+    def enqueue(cls, job_type, payload=None, user_id='system', max_attempts=None, delay_seconds=None,
+                recipe_id=None):
+        """
+        Store a job for the workers
+
+        Args:
+            delay_seconds (int): Not run before this many seconds passed
+            recipe_id (int): Recipe the job is about, for finding it with pending()
+
+        Returns:
+            SyncQueue: The pending job
+        """
+        if job_type not in cls._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = SyncQueue(
+            user_id=str(user_id),
+            action_type=QueueActionType.JOB.value,
+            job_type=job_type,
+            recipe_id=recipe_id,
+            data=payload or {},
+            status=QueueStatus.PENDING.value,
+            attempts=0,
+            max_attempts=max_attempts or cls._handlers[job_type][1],
+            run_after=_utcnow() + timedelta(seconds=delay_seconds) if delay_seconds else None,
+            cancel_requested=False
+        )
+        db.session.add(job)
+        db.session.commit()
+        cls._wake.set()
+        return job
+
+    @classmethod
+    def get(cls, job_id):
+        """Get a background job by id, None for unknown ids and offline changes"""
+        job = db.session.get(SyncQueue, job_id)
+        if job is None or job.action_type != QueueActionType.JOB.value:
+            return None
+        return job
+
+    @classmethod
+    def pending(cls, job_type, recipe_id):
+        """Get a job of the type for a recipe that did not start yet, None when there is none"""
+        return SyncQueue.query.filter(
+            SyncQueue.job_type == job_type,
+            SyncQueue.recipe_id == recipe_id,
+            SyncQueue.status == QueueStatus.PENDING.value
+        ).order_by(SyncQueue.id).first()
+
+    @classmethod
+    def has_active(cls, job_type):
+        """Whether a job of the type is waiting or running"""
+        return db.session.query(
+            SyncQueue.query.filter(
+                SyncQueue.job_type == job_type,
+                SyncQueue.status.in_([QueueStatus.PENDING.value, QueueStatus.RUNNING.value])
+            ).exists()
+        ).scalar()
+
+    @classmethod
+    def cancel(cls, job):
+        """
+        Cancel a pending job, or ask the worker running it to stop
+
+        Returns:
+            bool: False when the job had already finished
+        """
+        cancelled = SyncQueue.query.filter(
+            SyncQueue.id == job.id,
+            SyncQueue.status == QueueStatus.PENDING.value
+        ).update({
+            SyncQueue.status: QueueStatus.CANCELLED.value,
+            SyncQueue.cancel_requested: True,
+            SyncQueue.finished_at: _utcnow(),
+        }, synchronize_session=False)
+        db.session.commit()
+        if cancelled:
+            cls._run_failure_hook(job, "Cancelled")
+            return True
+
+        if job.status != QueueStatus.RUNNING.value:
+            return False
+        job.cancel_requested = True
+        db.session.commit()
+        cls._cancel_local(job.id)
+        return True
+
+    @classmethod
+    def claim_next(cls):
+        """
+        Take the oldest job that is due, or whose worker stopped
+
+        Returns:
+            SyncQueue | None: The job, now running with this worker
+        """
+        now = _utcnow()
+        stale_before = now - timedelta(seconds=current_app.config.get('JOB_STALE_SECONDS', cls.STALE_SECONDS))
+        candidates = SyncQueue.query.filter(
+            SyncQueue.action_type == QueueActionType.JOB.value,
+            db.or_(
+                db.and_(
+                    SyncQueue.status == QueueStatus.PENDING.value,
+                    db.or_(SyncQueue.run_after.is_(None), SyncQueue.run_after <= now)
+                ),
+                db.and_(
+                    SyncQueue.status == QueueStatus.RUNNING.value,
+                    SyncQueue.heartbeat_at < stale_before
+                ),
+            )
+        ).order_by(SyncQueue.id).limit(cls.CLAIM_BATCH).all()
+
+        for job in candidates:
+            if job.status == QueueStatus.RUNNING.value:
+                logger.info(f"Taking over job {job.id} from a stopped worker")
+            if SyncQueue.claim(job.id, job.status, job.heartbeat_at):
+                return job
+        return None
+
+    @classmethod
+    def run_next(cls):
+        """
+        Claim and run one job in the calling thread
+
+        Returns:
+            SyncQueue | None: The job run, None when nothing was due
+        """
+        job = cls.claim_next()
+        if job is not None:
+            cls._execute(job)
+        return job
+
+    @classmethod
+    def _execute(cls, job):
+        """Run a claimed job and record its outcome"""
+        func, _ = cls._handlers.get(job.job_type, (None, None))
+        if job.cancel_requested:
+            cls._finish(job, QueueStatus.CANCELLED.value, error="Cancelled")
+            return
+        if func is None:
+            cls._finish(job, QueueStatus.FAILED.value, error=f"Unknown job type: {job.job_type}")
+            return
+        if job.attempts > job.max_attempts:
+            # Its last attempt was cut off by a stopped worker
+            cls._finish(job, QueueStatus.FAILED.value, error=job.error or "Worker stopped")
+            return
+
+        try:
+            result = func(job.data or {})
+            if inspect.isawaitable(result):
+                result = asyncio.run(cls._await(job.id, result))
+        except asyncio.CancelledError:
+            db.session.rollback()
+            cls._finish(job, QueueStatus.CANCELLED.value, error="Cancelled")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Job {job.id} ({job.job_type}) attempt {job.attempts} failed: {str(e)}")
+            if isinstance(e, ValueError) or job.attempts >= job.max_attempts:
+                cls._finish(job, QueueStatus.FAILED.value, error=str(e))
+            else:
+                cls._retry(job, e)
+        else:
+            if job.cancel_requested:
+                cls._finish(job, QueueStatus.CANCELLED.value, error="Cancelled")
+            else:
+                cls._finish(job, QueueStatus.COMPLETED.value, result=result)
+
+    @classmethod
+    async def _await(cls, job_id, awaitable):
+        """Await a job coroutine as a task that cancel() can reach"""
+        task = asyncio.ensure_future(awaitable)
+        with cls._lock:
+            cls._running[job_id] = (asyncio.get_running_loop(), task)
+        try:
+            return await task
+        finally:
+            with cls._lock:
+                cls._running.pop(job_id, None)
+
+    @classmethod
+    def _cancel_local(cls, job_id):
+        """Cancel the task of a job if it runs in this process"""
+        with cls._lock:
+            running = cls._running.get(job_id)
+        if running:
+            loop, task = running
+            loop.call_soon_threadsafe(task.cancel)
+
+    @classmethod
+    def _retry(cls, job, error):
+        delay = min(cls.RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1), cls.MAX_BACKOFF_SECONDS)
+        job.status = QueueStatus.PENDING.value
+        job.run_after = _utcnow() + timedelta(seconds=delay)
+        job.heartbeat_at = None
+        job.error = str(error)
+        db.session.commit()
+        logger.info(f"Retrying job {job.id} in {delay} seconds")
+
+    @classmethod
+    def _finish(cls, job, status, result=None, error=None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = _utcnow()
+        db.session.commit()
+        if status in (QueueStatus.FAILED.value, QueueStatus.CANCELLED.value):
+            cls._run_failure_hook(job, error)
+
+    @classmethod
+    def _run_failure_hook(cls, job, error):
+        hook = cls._failure_hooks.get(job.job_type)
+        if hook is None:
+            return
+        try:
+            hook(job.data or {}, error)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failure hook of job {job.id} ({job.job_type}) failed: {str(e)}")
+
+    @classmethod
+    def init_app(cls, app):
+        """Start the worker threads, unless testing or JOB_WORKERS is 0"""
+        workers = app.config.get('JOB_WORKERS', cls.WORKERS)
+        if app.config.get('TESTING') or not workers:
+            return
+        for i in range(workers):
+            thread = threading.Thread(
+                target=cls._work,
+                args=(app,),
+                daemon=True,
+                name=f'job-worker-{i}'
+            )
+            thread.start()
+        logger.info(f"Started {workers} job workers")
+
+    @classmethod
+    def _work(cls, app):
+        while True:
+            job = None
+            with app.app_context():
+                try:
+                    job = cls.claim_next()
+                    if job is None:
+                        cls._purge_finished()
+                    else:
+                        cls._run_with_heartbeat(app, job)
+                except Exception as e:
+                    logger.error(f"Job worker error: {str(e)}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            if job is None:
+                cls._wake.wait(cls.POLL_SECONDS)
+                cls._wake.clear()
+
+    @classmethod
+    def _run_with_heartbeat(cls, app, job):
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=cls._heartbeat,
+            args=(app, job.id, stop),
+            daemon=True,
+            name=f'job-heartbeat-{job.id}'
+        )
+        heartbeat.start()
+        try:
+            cls._execute(job)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    @classmethod
+    def _heartbeat(cls, app, job_id, stop):
+        """Keep a running job claimed and pass on cancel requests"""
+        with app.app_context():
+            try:
+                while not stop.wait(cls.HEARTBEAT_SECONDS):
+                    SyncQueue.query.filter(
+                        SyncQueue.id == job_id,
+                        SyncQueue.status == QueueStatus.RUNNING.value
+                    ).update({SyncQueue.heartbeat_at: _utcnow()}, synchronize_session=False)
+                    db.session.commit()
+                    cancel_requested = db.session.query(SyncQueue.cancel_requested).filter(
+                        SyncQueue.id == job_id
+                    ).scalar()
+                    if cancel_requested:
+                        cls._cancel_local(job_id)
+            except Exception as e:
+                logger.error(f"Heartbeat of job {job_id} failed: {str(e)}")
+            finally:
+                db.session.remove()
+
+    @classmethod
+    def _purge_finished(cls):
+        """Delete jobs finished longer than RESULT_TTL ago, at most once per PURGE_INTERVAL"""
+        now = _utcnow()
+        with cls._lock:
+            if cls._last_purge is not None and now - cls._last_purge < cls.PURGE_INTERVAL:
+                return
+            cls._last_purge = now
+        deleted = SyncQueue.query.filter(
+            SyncQueue.action_type == QueueActionType.JOB.value,
+            SyncQueue.status.in_(SyncQueue.FINISHED_STATUSES),
+            SyncQueue.finished_at < now - cls.RESULT_TTL
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if deleted:
+            logger.info(f"Purged {deleted} finished jobs")
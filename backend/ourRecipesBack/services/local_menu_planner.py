@@ -0,0 +1,175 @@
+"""
+Deterministic menu planner over the recipe catalog
+
+Fills every requested meal with a main course and, when fitting recipes are
+left, a salad and a side (and a dessert when the requests ask for one). It
+picks from RecipeCatalog entries without calling the AI, so a plan takes
+milliseconds and the same request gets the same plan. Constraints:
+
+- Kosher: a meal never mixes meat and dairy, and the menu's dietary type
+  limits every recipe to that type or pareve.
+- Exclusions: recipe ids, and ingredients named after "ללא"/"בלי" in the
+  special requests, looked up in the recipe token index.
+- Variety: no recipe is used twice, and no two recipes of the menu share a
+  main ingredient.
+- Time: recipes over max_cooking_time are skipped, and a meal's recipes stay
+  within meal_time_budget minutes of preparation and cooking together.
+
+Among the recipes left, those serving the requested number, with a picture,
+of this course first and quicker ones win.
+"""
+import re
+from ..models.enums import DietaryType
+from ..models.recipe_token import RecipeToken
+from ..utils.hebrew_text import strip_prefixes, tokenize
+from .recipe_catalog import RecipeCatalog
+
+
+class LocalMenuPlanner:
+    """Plan menus from the recipe catalog by constraints and scores"""
+
+    # Courses of a meal in serving order, a main course is required
+    MEAL_COURSES = ['main', 'salad', 'side']
+    # Words in the special requests asking for a dessert
+    DESSERT_WORDS = {'קינוח', 'קינוחים', 'מתוק', 'מתוקים'}
+    # Special requests naming an ingredient to leave out: "ללא אורז ובלי בוטנים",
+    # the first word after each one is the ingredient ("ללא אגוזים בבקשה")
+    EXCLUSION_RE = re.compile(r'(?<!\S)ו?(?:ללא|בלי|without)\s+([^\s,.;]+)', re.IGNORECASE)
+    # Words never taken as the excluded ingredient
+    EXCLUSION_STOP_WORDS = {'ללא', 'בלי', 'וללא', 'ובלי', 'או', 'and', 'or', 'without'}
+
+    # Dietary types a recipe may have in a menu of each dietary type
+    ALLOWED_DIETARY = {
+        DietaryType.MEAT.value: {DietaryType.MEAT.value, DietaryType.PAREVE.value},
+        DietaryType.DAIRY.value: {DietaryType.DAIRY.value, DietaryType.PAREVE.value},
+        DietaryType.PAREVE.value: {DietaryType.PAREVE.value},
+    }
+
+    @classmethod
+    def plan(cls, preferences, catalog=None):
+        """
+        Plan a menu for the preview preferences
+
+        Args:
+            preferences (dict): meal_types, dietary_type, servings, special_requests,
+                and optionally exclude_recipe_ids, max_cooking_time, meal_time_budget
+            catalog (list[dict]): Catalog entries, RecipeCatalog's by default
+
+        Returns:
+            dict | None: Menu plan in the AI's format ({'meals', 'reasoning'}),
+                None when some meal gets no main course
+        """
+        catalog = RecipeCatalog.entries() if catalog is None else catalog
+        dietary_type = (preferences.get('dietary_type') or '').lower() or None
+        servings = int(preferences.get('servings') or 4)
+        special_requests = preferences.get('special_requests') or ''
+        max_cooking_time = preferences.get('max_cooking_time')
+        meal_time_budget = preferences.get('meal_time_budget')
+
+        excluded = {int(recipe_id) for recipe_id in preferences.get('exclude_recipe_ids') or []}
+        excluded |= cls._recipes_with_excluded_ingredients(special_requests)
+        candidates = [
+            entry for entry in catalog
+            if entry['id'] not in excluded
+            and (not max_cooking_time or entry['cooking_time'] <= max_cooking_time)
+            and (dietary_type not in cls.ALLOWED_DIETARY
+                 or entry['dietary_type'] in cls.ALLOWED_DIETARY[dietary_type])
+        ]
+        courses = list(cls.MEAL_COURSES)
+        if cls.DESSERT_WORDS & set(tokenize(special_requests)):
+            courses.append('dessert')
+
+        used_ids = set()
+        used_ingredients = set()
+        meals = []
+        for meal_order, meal_type in enumerate(preferences.get('meal_types') or [], start=1):
+            meal_dietary = dietary_type
+            time_left = meal_time_budget
+            recipes = []
+            for course in courses:
+                entry = cls._pick(candidates, course, servings, meal_dietary, time_left,
+                                  used_ids, used_ingredients)
+                if entry is None:
+                    if course == 'main':
+                        return None
+                    continue
+                used_ids.add(entry['id'])
+                if entry.get('main_ingredient'):
+                    used_ingredients.add(entry['main_ingredient'])
+                if entry['dietary_type'] != DietaryType.PAREVE.value:
+                    meal_dietary = entry['dietary_type']
+                if time_left is not None:
+                    time_left -= cls._total_time(entry)
+                recipes.append({
+                    'recipe_id': entry['id'],
+                    'course_type': course,
+                    'course_order': len(recipes) + 1,
+                    'reason': cls._reason(entry, course, servings),
+                })
+            meals.append({'meal_type': meal_type, 'meal_order': meal_order, 'recipes': recipes})
+
+        if not meals:
+            return None
+        return {
+            'meals': meals,
+            'reasoning': 'התפריט הורכב אוטומטית מהמתכונים הזמינים: מנה עיקרית לכל ארוחה, '
+                         'בלי חזרה על מתכון או על מרכיב עיקרי ובלי ערבוב בשר וחלב',
+        }
+
+    @classmethod
+    def _pick(cls, candidates, course, servings, meal_dietary, time_left, used_ids, used_ingredients):
+        """Best candidate for a course, or None"""
+        allowed = cls.ALLOWED_DIETARY.get(meal_dietary)
+        best = None
+        best_key = None
+        for entry in candidates:
+            if course not in entry['course_hints'] or entry['id'] in used_ids:
+                continue
+            if allowed is not None and entry['dietary_type'] not in allowed:
+                continue
+            if entry.get('main_ingredient') and entry['main_ingredient'] in used_ingredients:
+                continue
+            if time_left is not None and cls._total_time(entry) > time_left:
+                continue
+            key = (-cls._score(entry, course, servings), entry['id'])
+            if best_key is None or key < best_key:
+                best, best_key = entry, key
+        return best
+
+    @staticmethod
+    def _total_time(entry):
+        return entry['cooking_time'] + entry.get('preparation_time', 0)
+
+    @classmethod
+    def _score(cls, entry, course, servings):
+        """Higher is better, ties go to the lower recipe id"""
+        score = 0.0
+        # Missing portions count more than leftovers
+        if entry['servings'] < servings:
+            score -= (servings - entry['servings']) / servings
+        else:
+            score -= (entry['servings'] - servings) / (4 * servings)
+        if entry['course_hints'][0] == course:
+            score += 0.3
+        if entry['has_image']:
+            score += 0.2
+        score -= cls._total_time(entry) / 240
+        return score
+
+    @staticmethod
+    def _reason(entry, course, servings):
+        reason = f"{entry['title']} ({entry['cooking_time']} דקות בישול, {entry['servings']} מנות)"
+        if entry['servings'] < servings:
+            reason += f" - יש להגדיל את הכמויות ל-{servings} מנות"
+        return reason
+
+    @classmethod
+    def _recipes_with_excluded_ingredients(cls, special_requests):
+        """Ids of recipes whose title or ingredients name an excluded ingredient"""
+        terms = set()
+        for word in cls.EXCLUSION_RE.findall(special_requests):
+            tokens = tokenize(word)
+            if tokens and tokens[0] not in cls.EXCLUSION_STOP_WORDS:
+                # "הבוטנים" excludes recipes with בוטנים too
+                terms.update(strip_prefixes(tokens[0]))
+        return RecipeToken.recipe_ids_with_any(terms)
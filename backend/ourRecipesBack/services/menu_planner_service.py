@@ -1,71 +1,48 @@
-from google import genai
 from google.genai import types, errors
 from flask import current_app
 import json
 import time
-from sqlalchemy import and_, or_
+from sqlalchemy import or_
 from ..extensions import db
 from ..models import Recipe, Menu, MenuMeal, MealRecipe
-from ..models.enums import DietaryType, RecipeStatus
+from ..models.enums import CourseType, DietaryType, RecipeStatus
+from .gemini_gateway import GeminiBusyError, GeminiGateway
+from .genai_clients import GenAIClients
+from .job_queue import JobQueue
+from .local_menu_planner import LocalMenuPlanner
+from .recipe_catalog import RecipeCatalog
 
 
 class MenuPlannerService:
     """Service for AI-powered menu planning with Function Calling"""
 
+    MODEL = "gemini-2.5-flash"
+
+    # Values the AI may filter recipes by, matched against the recipe's
+    # dietary_type and course_mask columns derived from its categories
+    DIETARY_TYPES = {dietary.value for dietary in DietaryType}
+    COURSE_TYPES = {course.value for course in CourseType}
+
     @classmethod
-    def _send_message_with_retry(cls, chat, message, max_retries=3):
+    def _send_message(cls, chat, message):
         """
-        Send message to AI with automatic retry on rate limit.
+        Send message to AI through the Gemini gateway, which waits out rate limits.
 
         Args:
             chat: The chat session
             message: Message to send (can be string or Content)
-            max_retries: Maximum number of retries (default: 3)
 
         Returns:
             Response from AI
 
         Raises:
-            Exception: If all retries are exhausted
+            GeminiBusyError: If the model has no capacity in time
         """
-        retry_count = 0
-
-        while retry_count <= max_retries:
-            try:
-                return chat.send_message(message)
-
-            except errors.ClientError as rate_limit_error:
-                # Check if it's a rate limit error (429)
-                if hasattr(rate_limit_error, 'code') and rate_limit_error.code != 429:
-                    raise  # Re-raise if not a rate limit error
-                retry_count += 1
-
-                # Extract retry delay from error if available
-                error_str = str(rate_limit_error)
-                wait_time = 60  # Default to 60 seconds as user requested
-
-                # Try to parse retry delay from error message
-                # Error format: "retry_delay: {seconds: 27}"
-                if "retry_delay" in error_str and "seconds:" in error_str:
-                    try:
-                        import re
-                        match = re.search(r'seconds:\s*(\d+)', error_str)
-                        if match:
-                            wait_time = int(match.group(1))
-                    except Exception:
-                        pass  # Keep default wait_time
-
-                if retry_count <= max_retries:
-                    print(f"⏳ Rate limit reached! Waiting {wait_time} seconds before retry ({retry_count}/{max_retries})...")
-                    time.sleep(wait_time)
-                    print(f"🔄 Retrying request (attempt {retry_count + 1}/{max_retries + 1})...")
-                else:
-                    print(f"❌ Rate limit exhausted after {max_retries} retries")
-                    raise
-
-            except Exception as e:
-                # Re-raise other exceptions immediately
-                raise
+        return GeminiGateway.call(
+            lambda: chat.send_message(message),
+            model=cls.MODEL,
+            max_wait=GeminiGateway.JOB_MAX_WAIT_SECONDS
+        )
 
     @staticmethod
     def _get_search_tools():
@@ -132,48 +109,12 @@ class MenuPlannerService:
         )
 
         # Apply dietary type filter
-        if dietary_type:
-            if dietary_type == 'meat':
-                query = query.filter(
-                    or_(
-                        Recipe._categories.contains('בשר'),
-                        Recipe._categories.contains('עוף'),
-                        Recipe._categories.contains('דגים')
-                    )
-                )
-            elif dietary_type == 'dairy':
-                query = query.filter(
-                    or_(
-                        Recipe._categories.contains('חלבי'),
-                        Recipe._categories.contains('גבינה'),
-                        Recipe._categories.contains('חלב')
-                    )
-                )
-            elif dietary_type == 'pareve':
-                query = query.filter(
-                    and_(
-                        ~Recipe._categories.contains('בשר'),
-                        ~Recipe._categories.contains('עוף'),
-                        ~Recipe._categories.contains('חלבי'),
-                        ~Recipe._categories.contains('חלב')
-                    )
-                )
+        if dietary_type in cls.DIETARY_TYPES:
+            query = query.filter(Recipe.dietary_type == DietaryType(dietary_type))
 
         # Apply course type filter
-        if course_type:
-            course_keywords = {
-                'appetizer': ['מנה ראשונה', 'פתיח'],
-                'salad': ['סלט', 'ירקות'],
-                'soup': ['מרק'],
-                'main': ['בשר', 'עוף', 'דג', 'עיקרי', 'מנה עיקרית'],
-                'side': ['תוספת', 'אורז', 'פסטה', 'תפוחי אדמה'],
-                'dessert': ['קינוח', 'עוגה', 'מתוק', 'עוגיות']
-            }
-
-            if course_type in course_keywords:
-                keywords = course_keywords[course_type]
-                conditions = [Recipe._categories.contains(kw) for kw in keywords]
-                query = query.filter(or_(*conditions))
+        if course_type in cls.COURSE_TYPES:
+            query = query.filter(Recipe.fits_course(course_type))
 
         # Apply cooking time filter
         if max_cooking_time:
@@ -224,7 +165,7 @@ class MenuPlannerService:
                 'cooking_time': recipe.cooking_time or 30,
                 'preparation_time': recipe.preparation_time or 15,
                 'servings': recipe.servings or 4,
-                'has_image': bool(recipe.image_url or recipe.image_data),
+                'has_image': bool(recipe.image_url or recipe.image_hash),
                 # Add more context for AI decision-making
                 'ingredients_preview': cls._get_ingredients_preview(recipe),
                 'description_preview': cls._get_description_preview(recipe),
@@ -297,7 +238,7 @@ class MenuPlannerService:
             'preparation_time': recipe.preparation_time or 15,
             'servings': recipe.servings or 4,
             'ingredients_count': len(recipe.ingredients) if recipe.ingredients else 0,
-            'has_image': bool(recipe.image_url or recipe.image_data)
+            'has_image': bool(recipe.image_url or recipe.image_hash)
         }
 
     @classmethod
@@ -399,33 +340,14 @@ class MenuPlannerService:
             elif hasattr(recipe, 'instructions') and recipe.instructions:
                 instructions = recipe.instructions
 
-            # Determine dietary type
             categories = recipe._categories or ''
-            dietary = 'pareve'  # default
-            if any(cat in categories for cat in ['בשר', 'עוף', 'דגים']):
-                dietary = 'meat'
-            elif any(cat in categories for cat in ['חלבי', 'גבינה', 'חלב']):
-                dietary = 'dairy'
-
-            # Determine course hints
-            course_hints = []
-            if any(cat in categories for cat in ['סלט', 'ירקות']):
-                course_hints.append('salad')
-            if any(cat in categories for cat in ['מרק']):
-                course_hints.append('soup')
-            if any(cat in categories for cat in ['בשר', 'עוף', 'דג', 'עיקרי']):
-                course_hints.append('main')
-            if any(cat in categories for cat in ['תוספת', 'אורז', 'פסטה', 'תפוחי אדמה']):
-                course_hints.append('side')
-            if any(cat in categories for cat in ['קינוח', 'עוגה', 'מתוק', 'עוגיות']):
-                course_hints.append('dessert')
 
             # Build FULL recipe details
             recipe_details = {
                 'id': recipe.id,
                 'title': recipe.title,
-                'dietary_type': dietary,
-                'course_hints': course_hints,
+                'dietary_type': cls._get_dietary_type_from_recipe(recipe),
+                'course_hints': [course.value for course in recipe.course_types],
                 'categories': categories,
                 'cooking_time': recipe.cooking_time or 30,
                 'preparation_time': recipe.preparation_time or 15,
@@ -434,7 +356,7 @@ class MenuPlannerService:
                 'ingredients': ingredients_full,  # FULL ingredients list
                 'ingredients_count': len(ingredients_full),
                 'instructions': instructions,  # FULL instructions
-                'has_image': bool(recipe.image_url or recipe.image_data)
+                'has_image': bool(recipe.image_url or recipe.image_hash)
             }
 
             results.append(recipe_details)
@@ -569,84 +491,63 @@ CRITICAL RULES:
         Returns:
             list: All recipes with enhanced metadata for better AI decision-making
         """
-        print(f"   📚 Loading recipe catalog with enhanced metadata...")
-        recipes = Recipe.query.filter(
-            Recipe.status == RecipeStatus.ACTIVE.value,
-            Recipe.is_parsed == True,
-            Recipe.title.isnot(None)
-        ).all()
-        print(f"   ✓ Loaded {len(recipes)} recipes")
+        recipes = RecipeCatalog.entries()
+        print(f"   ✓ Loaded {len(recipes)} recipes from the catalog")
+        return recipes
+
+    @classmethod
+    def generate_menu_preview(cls, preferences):
+        """
+        Generate menu PREVIEW (WITHOUT saving to database).
+        This allows user to review the menu before confirming.
 
-        result = []
+        The local planner builds the menu from the recipe catalog in
+        milliseconds. The AI only runs to refine that draft, when asked by
+        refine_with_ai (or MENU_PLANNER_AI_REFINE), or to plan the menu when
+        the local planner finds no main course for some meal.
 
-        for recipe in recipes:
-            categories = recipe._categories or ''
+        Args:
+            preferences: Dictionary with menu preferences
 
-            # Determine dietary type from categories
-            dietary = 'pareve'  # default
-            if any(cat in categories for cat in ['בשר', 'עוף', 'דגים']):
-                dietary = 'meat'
-            elif any(cat in categories for cat in ['חלבי', 'גבינה', 'חלב']):
-                dietary = 'dairy'
-
-            # Determine course type from categories
-            course_hints = []
-            if any(cat in categories for cat in ['סלט', 'ירקות']):
-                course_hints.append('salad')
-            if any(cat in categories for cat in ['מרק']):
-                course_hints.append('soup')
-            if any(cat in categories for cat in ['בשר', 'עוף', 'דג', 'עיקרי']):
-                course_hints.append('main')
-            if any(cat in categories for cat in ['תוספת', 'אורז', 'פסטה', 'תפוחי אדמה']):
-                course_hints.append('side')
-            if any(cat in categories for cat in ['קינוח', 'עוגה', 'מתוק', 'עוגיות']):
-                course_hints.append('dessert')
-
-            # Get ingredients preview (first 3 ingredients)
-            ingredients_preview = ""
+        Returns:
+            dict: Menu plan with full recipe details (not saved to database yet)
+        """
+        started = time.perf_counter()
+        draft = LocalMenuPlanner.plan(preferences)
+        print(f"🧮 Local planner {'built a draft' if draft else 'found no complete menu'} "
+              f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        refine = preferences.get('refine_with_ai', current_app.config.get('MENU_PLANNER_AI_REFINE', False))
+        if draft and not refine:
+            menu_plan = draft
+        else:
             try:
-                # Use ingredients_list (JSON) if available, fallback to ingredients (text)
-                if recipe.ingredients_list and isinstance(recipe.ingredients_list, list):
-                    first_ingredients = recipe.ingredients_list[:3]
-                    names = [ing.get('name', ing.get('ingredient', '')) for ing in first_ingredients if isinstance(ing, dict)]
-                    ingredients_preview = ', '.join([name for name in names if name])
-                    if len(recipe.ingredients_list) > 3:
-                        ingredients_preview += f" (+{len(recipe.ingredients_list) - 3})"
-                elif recipe.ingredients:
-                    # Fallback: ingredients is list of strings
-                    first_ingredients = recipe.ingredients[:3]
-                    ingredients_preview = ', '.join([str(ing) for ing in first_ingredients if ing])
-                    if len(recipe.ingredients) > 3:
-                        ingredients_preview += f" (+{len(recipe.ingredients) - 3})"
-            except Exception as e:
-                pass  # Silently fail, return empty preview
-
-            # Return ENHANCED info for better AI decisions
-            result.append({
-                'id': recipe.id,
-                'title': recipe.title,
-                'dietary_type': dietary,
-                'course_hints': course_hints,
-                'cooking_time': recipe.cooking_time or 30,
-                'difficulty': recipe.difficulty.value if recipe.difficulty else 'medium',
-                'servings': recipe.servings or 4,
-                'ingredients_preview': ingredients_preview,
-                'has_image': bool(recipe.image_url or recipe.image_data)
-            })
+                menu_plan = cls._generate_ai_menu_plan(preferences, draft)
+            except ValueError:
+                if not draft:
+                    raise
+                print("⚠️ AI refinement failed, using the local plan")
+                menu_plan = draft
 
-        return result
+        # CRITICAL: Enrich menu plan with FULL recipe details for preview
+        # This allows frontend to display recipe names, images, etc. instead of just IDs
+        print(f"📝 Enriching preview with full recipe details...")
+        enriched_plan = cls._enrich_menu_plan_with_recipes(menu_plan)
+
+        print(f"✓ Menu preview generated with full recipe details - NOT saved to database yet")
+        return enriched_plan
 
     @classmethod
-    def generate_menu_preview(cls, preferences):
+    def _generate_ai_menu_plan(cls, preferences, draft=None):
         """
-        Generate menu PREVIEW using AI with Function Calling (WITHOUT saving to database).
-        This allows user to review the menu before confirming.
+        Plan a menu using AI with Function Calling.
 
         Args:
             preferences: Dictionary with menu preferences
+            draft: Menu plan of the local planner for the AI to improve, if any
 
         Returns:
-            dict: Menu plan JSON from AI (not saved to database yet)
+            dict: Menu plan JSON from AI, with recipe ids only
         """
         try:
             # Extract preferences
@@ -664,6 +565,7 @@ Servings: {servings}
 Dietary: {dietary_type.value if dietary_type else 'any'}
 Meals: {', '.join(meal_types)}
 {f'Notes: {special_requests}' if special_requests else ''}
+{f'Draft menu (keeps every rule, improve it or return it as is): {json.dumps(draft, ensure_ascii=False)}' if draft else ''}
 
 ⚠️ RESOURCE BUDGET: You have UP TO 8 iterations - use wisely!
 
@@ -675,8 +577,8 @@ STRATEGY:
 
 Start NOW with get_all_recipes()."""
 
-            # Create client and chat with tools
-            client = genai.Client(api_key=current_app.config["GOOGLE_API_KEY"])
+            # Shared client and chat with tools
+            client = GenAIClients.get()
 
             # Create chat session with configuration
             chat = client.chats.create(
@@ -686,7 +588,7 @@ Start NOW with get_all_recipes()."""
                 # Alternatives:
                 #   - 2.5 Pro: Smarter but only 5 RPM (too slow)
                 #   - 1.5 Pro: Old model (2024) with only 2 RPM
-                model="gemini-2.5-flash",
+                model=cls.MODEL,
                 config=types.GenerateContentConfig(
                     tools=cls._get_search_tools(),
                     system_instruction=cls._get_menu_planner_system_prompt(),
@@ -700,7 +602,7 @@ Start NOW with get_all_recipes()."""
             )
 
             # Send initial message
-            response = cls._send_message_with_retry(chat, user_prompt)
+            response = cls._send_message(chat, user_prompt)
 
             # Handle function calling loop
             max_iterations = 8  # Up to 8 iterations: get_all_recipes + optional batch calls + JSON response
@@ -752,7 +654,7 @@ RETURN THE FINAL JSON MENU NOW using the data you already have:
 
 This is MANDATORY. Return JSON in your next response."""
 
-                            response = cls._send_message_with_retry(chat, force_message)
+                            response = cls._send_message(chat, force_message)
                             iteration += 1
                             continue  # Skip to next iteration (should be text response)
 
@@ -861,7 +763,7 @@ Analyze data and return JSON menu."""
 
                     # Send function results back to AI with guidance
                     all_parts = function_responses + [types.Part(text=guidance_message)]
-                    response = cls._send_message_with_retry(
+                    response = cls._send_message(
                         chat,
                         all_parts  # Send list of Parts directly, not wrapped in Content
                     )
@@ -952,7 +854,7 @@ This is your LAST chance to respond. Return JSON immediately."""
 
                     # Send the function responses WITH the strong guidance
                     all_parts = function_responses + [types.Part(text=completion_prompt)]
-                    response = cls._send_message_with_retry(
+                    response = cls._send_message(
                         chat,
                         all_parts  # Send list of Parts directly, not wrapped in Content
                     )
@@ -966,7 +868,7 @@ This is your LAST chance to respond. Return JSON immediately."""
                     if final_has_function_call:
                         print(f"⚠️ AI still trying to call functions, sending final force completion...")
                         try:
-                            response = cls._send_message_with_retry(chat, completion_prompt)
+                            response = cls._send_message(chat, completion_prompt)
                         except Exception as e:
                             print(f"❌ Failed to force completion: {e}")
                             raise ValueError(f"AI could not complete menu generation after {max_iterations} iterations. Try reducing the number of meals or courses.")
@@ -1025,13 +927,14 @@ This is your LAST chance to respond. Return JSON immediately."""
             for meal in menu_plan.get('meals', []):
                 print(f"   - {meal.get('meal_type')}: {len(meal.get('recipes', []))} recipes")
 
-            # CRITICAL: Enrich menu plan with FULL recipe details for preview
-            # This allows frontend to display recipe names, images, etc. instead of just IDs
-            print(f"📝 Enriching preview with full recipe details...")
-            enriched_plan = cls._enrich_menu_plan_with_recipes(menu_plan)
+            return menu_plan
 
-            print(f"✓ Menu preview generated with full recipe details - NOT saved to database yet")
-            return enriched_plan
+        except GeminiBusyError as busy:
+            print(f"❌ Gemini busy: {str(busy)}")
+            raise ValueError(
+                f"AI service is temporarily unavailable due to rate limits. "
+                f"Please wait {int(busy.retry_after) + 1} seconds and try again."
+            )
 
         except errors.ClientError as rate_error:
             # Check if it's a rate limit error (429)
@@ -1114,13 +1017,8 @@ This is your LAST chance to respond. Return JSON immediately."""
 
     @staticmethod
     def _get_dietary_type_from_recipe(recipe):
-        """Helper to determine dietary type from recipe categories"""
-        categories = recipe._categories or ''
-        if any(cat in categories for cat in ['בשר', 'עוף', 'דגים']):
-            return 'meat'
-        elif any(cat in categories for cat in ['חלבי', 'גבינה', 'חלב']):
-            return 'dairy'
-        return 'pareve'
+        """Helper to get the dietary type stored with a recipe"""
+        return recipe.dietary_type.value if recipe.dietary_type else DietaryType.PAREVE.value
 
     @classmethod
     def save_menu_from_preview(cls, user_id, preferences, menu_plan):
@@ -1248,37 +1146,12 @@ This is your LAST chance to respond. Return JSON immediately."""
             )
 
             # Filter by dietary type if menu has restrictions
-            if menu.dietary_type:
-                if menu.dietary_type == DietaryType.MEAT:
-                    query = query.filter(
-                        or_(
-                            Recipe._categories.contains('בשר'),
-                            Recipe._categories.contains('עוף'),
-                            Recipe._categories.contains('דגים')
-                        )
-                    )
-                elif menu.dietary_type == DietaryType.DAIRY:
-                    query = query.filter(
-                        or_(
-                            Recipe._categories.contains('חלבי'),
-                            Recipe._categories.contains('גבינה')
-                        )
-                    )
+            if menu.dietary_type in (DietaryType.MEAT, DietaryType.DAIRY):
+                query = query.filter(Recipe.dietary_type == menu.dietary_type)
 
             # Filter by course type
-            course_keywords = {
-                'salad': ['סלט', 'ירקות'],
-                'soup': ['מרק'],
-                'appetizer': ['מנה ראשונה', 'פתיח'],
-                'main': ['בשר', 'עוף', 'דג', 'עיקרי'],
-                'side': ['תוספת', 'אורז', 'פסטה'],
-                'dessert': ['קינוח', 'עוגה', 'מתוק']
-            }
-
-            keywords = course_keywords.get(course_type, [])
-            if keywords:
-                conditions = [Recipe._categories.contains(kw) for kw in keywords]
-                query = query.filter(or_(*conditions))
+            if course_type in cls.COURSE_TYPES:
+                query = query.filter(Recipe.fits_course(course_type))
 
             suggestions = query.limit(10).all()
 
@@ -1298,3 +1171,13 @@ This is your LAST chance to respond. Return JSON immediately."""
         except Exception as e:
             print(f"Error suggesting replacements: {str(e)}")
             return []
+
+
+@JobQueue.handler('menu_preview', max_attempts=2)
+def run_menu_preview_job(payload):
+    """Job queue entry point of menu preview generation, ValueErrors are not retried"""
+    return {
+        "success": True,
+        "preview": MenuPlannerService.generate_menu_preview(payload),
+        "preferences": payload  # Echo back for save endpoint
+    }
@@ -4,11 +4,14 @@ Similar to RecipeService but for Menus
 """
 import logging
 from datetime import datetime
+from flask import current_app
 from sqlalchemy.sql import func
 from ..extensions import db
 from ..models import Menu, MenuMeal, MealRecipe, Recipe
 from ..models.enums import DietaryType
 from .telegram_service import telegram_service
+from .telegram_outbox import TelegramOutbox
+from .job_queue import JobQueue
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,9 @@ logger = logging.getLogger(__name__)
 class MenuService:
     """Service for syncing menus with Telegram"""
 
+    # Seconds to wait for further edits of a recipe before refreshing its menus
+    MENU_REFRESH_DELAY_SECONDS = 10
+
     @classmethod
     def format_menu_for_telegram(cls, menu):
         """
@@ -240,10 +246,11 @@ class MenuService:
             return None
 
     @classmethod
-    async def update_in_telegram(cls, menu):
+    def update_in_telegram(cls, menu):
         """
-        Update existing menu message in Telegram
-        Returns True if successful, False otherwise
+        Queue an update of the menu message in Telegram
+        The outbox delivers it and sets last_sync
+        Returns True if queued, False otherwise
         """
         try:
             if not menu.telegram_message_id:
@@ -251,16 +258,10 @@ class MenuService:
                 return False
 
             text = cls.format_menu_for_telegram(menu)
-            success = await telegram_service.edit_message(menu.telegram_message_id, text)
-
-            if success:
-                menu.last_sync = func.now()
-                db.session.commit()
-                logger.info(f"Menu {menu.id} updated in Telegram (message {menu.telegram_message_id})")
-            else:
-                logger.error(f"Failed to update menu {menu.id} in Telegram")
-
-            return success
+            TelegramOutbox.edit(menu.telegram_message_id, text, target=menu)
+            db.session.commit()
+            logger.info(f"Menu {menu.id} update queued for Telegram (message {menu.telegram_message_id})")
+            return True
 
         except Exception as e:
             logger.error(f"Error updating menu in Telegram: {str(e)}")
@@ -291,46 +292,96 @@ class MenuService:
             return False
 
     @classmethod
-    async def update_menus_with_recipe(cls, recipe_id):
+    def schedule_menus_with_recipe(cls, recipe_id):
+        """
+        Queue a refresh of the menus containing a recipe, after it was edited
+        Edits within MENU_REFRESH_DELAY_SECONDS share one refresh, which
+        renders the menus when it runs, so it sees the latest edit
+        Returns the pending refresh job
+        """
+        job = JobQueue.pending('refresh_menus', recipe_id)
+        if job is None:
+            delay = current_app.config.get('MENU_REFRESH_DELAY_SECONDS', cls.MENU_REFRESH_DELAY_SECONDS)
+            job = JobQueue.enqueue('refresh_menus', {'recipe_id': recipe_id},
+                                   delay_seconds=delay, recipe_id=recipe_id)
+        return job
+
+    @classmethod
+    def update_menus_with_recipe(cls, recipe_id):
         """
         Update all menus in Telegram that contain a specific recipe
-        Called when a recipe is edited to keep menus in sync
+        The edits are queued in the Telegram outbox, which paces their delivery
+        Returns the number of menus queued
         """
-        try:
-            # Find all menus that contain this recipe
-            from ..models import MealRecipe
-            meal_recipes = MealRecipe.query.filter_by(recipe_id=recipe_id).all()
-
-            if not meal_recipes:
-                logger.info(f"No menus contain recipe {recipe_id}")
-                return 0
-
-            # Get unique menu IDs
-            menu_ids = set(mr.meal.menu_id for mr in meal_recipes)
-            logger.info(f"Found {len(menu_ids)} menus containing recipe {recipe_id}")
-
-            updated_count = 0
-            for menu_id in menu_ids:
-                menu = Menu.query.get(menu_id)
-                if menu and menu.telegram_message_id:
-                    success = await cls.update_in_telegram(menu)
-                    if success:
-                        updated_count += 1
-                        logger.info(f"Updated menu {menu_id} in Telegram after recipe {recipe_id} change")
-                    else:
-                        logger.warning(f"Failed to update menu {menu_id} in Telegram")
+        menu_ids = db.session.query(MenuMeal.menu_id).join(MealRecipe).filter(
+            MealRecipe.recipe_id == recipe_id
+        ).distinct()
+        # Meals and their recipes are loaded with the menus
+        menus = Menu.query.filter(
+            Menu.id.in_(menu_ids),
+            Menu.telegram_message_id.isnot(None)
+        ).all()
+
+        if not menus:
+            logger.info(f"No synced menus contain recipe {recipe_id}")
+            return 0
 
-            return updated_count
+        for menu in menus:
+            TelegramOutbox.edit(menu.telegram_message_id, cls.format_menu_for_telegram(menu), target=menu)
+        db.session.commit()
 
-        except Exception as e:
-            logger.error(f"Error updating menus with recipe {recipe_id}: {str(e)}")
-            return 0
+        logger.info(f"Queued Telegram updates of {len(menus)} menus after recipe {recipe_id} change")
+        return len(menus)
+
+    @classmethod
+    def prefetch_for_sync(cls, messages):
+        """
+        Load the rows a batch of menu messages needs with one query per table
+
+        Returns:
+            dict: parsed menu data, existing menus and referenced recipes,
+                for passing to sync_message
+        """
+        parsed = {}
+        for message in messages:
+            if message and message.text and "🍽️ תפריט" in message.text:
+                parsed[message.id] = cls.parse_menu_from_telegram(message.text)
+
+        recipe_ids, titles = set(), set()
+        for menu_data in parsed.values():
+            for meal_data in (menu_data or {}).get('meals', []):
+                for recipe_data in meal_data.get('recipes', []):
+                    if recipe_data.get('recipe_id'):
+                        recipe_ids.add(recipe_data['recipe_id'])
+                    if recipe_data.get('title'):
+                        titles.add(recipe_data['title'])
+
+        menus = Menu.query.filter(Menu.telegram_message_id.in_(parsed)).all() if parsed else []
+        recipes_by_id = {
+            recipe.id: recipe for recipe in Recipe.query.filter(Recipe.id.in_(recipe_ids))
+        } if recipe_ids else {}
+        recipes_by_title = {}
+        if titles:
+            # Keep the first recipe per title, like filter_by(title=...).first()
+            for recipe in Recipe.query.filter(Recipe.title.in_(titles)).order_by(Recipe.id):
+                recipes_by_title.setdefault(recipe.title, recipe)
+
+        return {
+            'parsed': parsed,
+            'menus': {menu.telegram_message_id: menu for menu in menus},
+            'recipes_by_id': recipes_by_id,
+            'recipes_by_title': recipes_by_title,
+        }
 
     @classmethod
-    async def sync_message(cls, client, message, sync_log):
+    async def sync_message(cls, client, message, sync_log, prefetched=None):
         """
         Sync single Telegram menu message to database
         Similar to RecipeService.sync_message but for menus
+
+        Args:
+            prefetched (dict): Result of prefetch_for_sync for the message batch;
+                rows are queried per message when omitted
         """
         try:
             if not message or not message.text:
@@ -342,14 +393,20 @@ class MenuService:
                 return  # Not a menu message
 
             # Parse menu data
-            menu_data = cls.parse_menu_from_telegram(message.text)
+            if prefetched is not None and message.id in prefetched['parsed']:
+                menu_data = prefetched['parsed'][message.id]
+            else:
+                menu_data = cls.parse_menu_from_telegram(message.text)
             if not menu_data:
                 logger.error(f"Failed to parse menu from message {message.id}")
                 sync_log.menus_failed += 1
                 return
 
             # Check if menu already exists
-            existing_menu = Menu.query.filter_by(telegram_message_id=message.id).first()
+            if prefetched is not None:
+                existing_menu = prefetched['menus'].get(message.id)
+            else:
+                existing_menu = Menu.query.filter_by(telegram_message_id=message.id).first()
 
             if existing_menu:
                 # Update existing menu
@@ -416,13 +473,19 @@ class MenuService:
                         # First try to find recipe by ID if available
                         recipe = None
                         if recipe_data.get('recipe_id'):
-                            recipe = Recipe.query.get(recipe_data['recipe_id'])
+                            if prefetched is not None:
+                                recipe = prefetched['recipes_by_id'].get(recipe_data['recipe_id'])
+                            else:
+                                recipe = Recipe.query.get(recipe_data['recipe_id'])
                             if not recipe:
                                 logger.warning(f"Recipe with ID {recipe_data['recipe_id']} not found, trying by title")
 
                         # Fallback to finding by title if ID not available or recipe not found
                         if not recipe and recipe_data.get('title'):
-                            recipe = Recipe.query.filter_by(title=recipe_data['title']).first()
+                            if prefetched is not None:
+                                recipe = prefetched['recipes_by_title'].get(recipe_data['title'])
+                            else:
+                                recipe = Recipe.query.filter_by(title=recipe_data['title']).first()
 
                         if recipe:
                             meal_recipe = MealRecipe(
@@ -444,3 +507,9 @@ class MenuService:
             sync_log.menus_failed += 1
             logger.error(f"Error syncing menu message {message.id}: {str(e)}")
             raise
+
+
+@JobQueue.handler('refresh_menus', max_attempts=3)
+def run_refresh_menus_job(payload):
+    """Queue the Telegram updates of the menus containing a recipe"""
+    return {"menus": MenuService.update_menus_with_recipe(payload['recipe_id'])}
@@ -0,0 +1,100 @@
+"""
+Resolved Telegram peers by channel URL
+
+Resolving a channel username is a network round trip that counts against
+flood limits, so resolved input peers are kept in memory for
+TELEGRAM_PEER_TTL_SECONDS and stored in the telegram_peers table to
+survive restarts. A peer the server rejects as invalid is dropped and
+resolved again.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from telethon.errors import (
+    ChannelIdInvalidError,
+    ChannelInvalidError,
+    ChannelPrivateError,
+    ChatIdInvalidError,
+    PeerIdInvalidError,
+)
+from ..extensions import db
+from ..models.telegram_peer import TelegramPeer
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PeerCache:
+    """TTL cache of resolved input peers, persisted in the database"""
+
+    # Errors meaning a cached peer no longer identifies the channel
+    INVALID_PEER_ERRORS = (
+        ChannelIdInvalidError,
+        ChannelInvalidError,
+        ChannelPrivateError,
+        ChatIdInvalidError,
+        PeerIdInvalidError,
+    )
+    # Seconds a resolved peer is used when TELEGRAM_PEER_TTL_SECONDS is not configured
+    DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+    _peers = {}  # Channel URL -> (input peer, resolved at)
+    _lock = threading.Lock()
+
+    @classmethod
+    def _ttl(cls):
+        return timedelta(seconds=current_app.config.get('TELEGRAM_PEER_TTL_SECONDS', cls.DEFAULT_TTL_SECONDS))
+
+    @classmethod
+    def get(cls, channel_url):
+        """Get the resolved peer of a channel URL, None when unknown or expired"""
+        cutoff = _utcnow() - cls._ttl()
+        with cls._lock:
+            cached = cls._peers.get(channel_url)
+        if cached and cached[1] > cutoff:
+            return cached[0]
+
+        row = db.session.get(TelegramPeer, channel_url)
+        if row is None or row.resolved_at <= cutoff:
+            return None
+        peer = row.to_input_peer()
+        with cls._lock:
+            cls._peers[channel_url] = (peer, row.resolved_at)
+        return peer
+
+    @classmethod
+    def put(cls, channel_url, peer):
+        """
+        Remember a resolved peer
+
+        The row is written with the session's next commit, so a caller's
+        unfinished work is never committed early.
+        """
+        now = _utcnow()
+        with cls._lock:
+            cls._peers[channel_url] = (peer, now)
+        row = db.session.get(TelegramPeer, channel_url) or TelegramPeer(channel_url=channel_url)
+        if row.set_input_peer(peer):
+            row.resolved_at = now
+            db.session.add(row)
+
+    @classmethod
+    def invalidate(cls, channel_url):
+        """Forget the peer of a channel URL, after the server rejected it"""
+        logger.info(f"Dropping cached Telegram peer of {channel_url}")
+        with cls._lock:
+            cls._peers.pop(channel_url, None)
+        row = db.session.get(TelegramPeer, channel_url)
+        if row is not None:
+            db.session.delete(row)
+            db.session.flush()
+
+    @classmethod
+    def clear(cls):
+        """Forget all peers kept in memory"""
+        with cls._lock:
+            cls._peers.clear()
@@ -0,0 +1,205 @@
+"""
+In-process catalog of the recipes the menu planner chooses from
+
+Every active, parsed recipe is kept as the compact entry the planner hands
+to the model (dietary type, course hints, ingredient preview, ...), so a
+planner call reads memory instead of the whole recipes table. Entries are
+replaced when a reindexed recipe is committed. Other processes edit recipes
+too, so the snapshot carries the version of the table it was read at: the
+recipe count and latest change time. Each read compares it with the
+database in one aggregate query, reloads only the rows changed since, and
+rebuilds when rows disappeared.
+"""
+import logging
+import threading
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+from ..extensions import db
+from ..utils.hebrew_text import tokenize
+from ..models.enums import DietaryType, RecipeStatus
+
+logger = logging.getLogger(__name__)
+
+
+class RecipeCatalog:
+    """Versioned in-memory snapshot of the menu planner's recipe catalog"""
+
+    # Ingredients named in a preview
+    PREVIEW_INGREDIENTS = 3
+    # Words of an ingredient line that are not the ingredient itself (normalized)
+    UNIT_WORDS = {
+        'כוס', 'כוסות', 'כפ', 'כפות', 'כפית', 'כפיות', 'גרמ', 'קג', 'קילו', 'ליטר', 'מל',
+        'חבילה', 'חבילות', 'יחידות', 'קורט', 'חצי', 'רבע', 'שליש',
+    }
+
+    _lock = threading.Lock()
+    _entries = {}      # recipe_id -> catalog entry
+    _version = None    # (recipe count, latest change) of the table the entries match
+    _ready = False
+
+    @classmethod
+    def init_app(cls, app):
+        """Build the catalog at startup"""
+        with app.app_context():
+            try:
+                cls.build()
+            except Exception as e:
+                db.session.rollback()
+                cls._ready = False
+                logger.error(f"Recipe catalog unavailable, it is built on first use: {str(e)}")
+
+    @staticmethod
+    def _columns():
+        from ..models.recipe import Recipe
+        return load_only(
+            Recipe.id, Recipe.title, Recipe.dietary_type, Recipe.course_mask,
+            Recipe._ingredients, Recipe.ingredients_list,
+            Recipe.cooking_time, Recipe.preparation_time, Recipe.difficulty, Recipe.servings, Recipe.image_url, Recipe.image_hash,
+            Recipe.status, Recipe.is_parsed
+        )
+
+    @staticmethod
+    def _changed_at():
+        from ..models.recipe import Recipe
+        return func.coalesce(Recipe.updated_at, Recipe.created_at)
+
+    @classmethod
+    def _table_version(cls):
+        from ..models.recipe import Recipe
+        return tuple(db.session.query(func.count(Recipe.id), func.max(cls._changed_at())).one())
+
+    @classmethod
+    def build(cls):
+        """Load every plannable recipe into a fresh snapshot"""
+        from ..models.recipe import Recipe
+        version = cls._table_version()
+        recipes = Recipe.query.options(cls._columns()).all()
+        entries = {}
+        for recipe in recipes:
+            entry = cls.entry_for(recipe)
+            if entry is not None:
+                entries[recipe.id] = entry
+        with cls._lock:
+            cls._entries = entries
+            cls._version = version
+            cls._ready = True
+        logger.info(f"Recipe catalog built with {len(entries)} of {len(recipes)} recipes")
+
+    @classmethod
+    def _refresh(cls):
+        """Bring the snapshot up to the table's current version"""
+        from ..models.recipe import Recipe
+        if not cls._ready:
+            cls.build()
+            return
+        version = cls._table_version()
+        with cls._lock:
+            known = cls._version
+        if version == known:
+            return
+        count, changed_at = version
+        known_count, known_changed_at = known
+        if count < known_count or known_changed_at is None:
+            cls.build()
+            return
+
+        changed = Recipe.query.options(cls._columns()).filter(cls._changed_at() >= known_changed_at).all()
+        with cls._lock:
+            for recipe in changed:
+                cls._put(recipe.id, cls.entry_for(recipe))
+            cls._version = version
+        logger.info(f"Recipe catalog refreshed {len(changed)} changed recipes")
+
+    @classmethod
+    def update_recipe(cls, recipe_id, entry):
+        """Replace a recipe's entry from entry_for(), once its change is committed"""
+        if not cls._ready:
+            return
+        with cls._lock:
+            cls._put(recipe_id, entry)
+
+    @classmethod
+    def _put(cls, recipe_id, entry):
+        if entry is None:
+            cls._entries.pop(recipe_id, None)
+        else:
+            cls._entries[recipe_id] = entry
+
+    @classmethod
+    def entries(cls):
+        """
+        Get the catalog entries of all plannable recipes
+
+        Returns:
+            list[dict]: Shared entries, callers must not change them
+        """
+        cls._refresh()
+        with cls._lock:
+            return list(cls._entries.values())
+
+    @classmethod
+    def count(cls):
+        """Number of plannable recipes"""
+        cls._refresh()
+        with cls._lock:
+            return len(cls._entries)
+
+    @classmethod
+    def entry_for(cls, recipe):
+        """
+        Build the catalog entry of a recipe
+
+        Returns:
+            dict | None: None for recipes the planner may not choose
+        """
+        if recipe.status != RecipeStatus.ACTIVE.value or not recipe.is_parsed or recipe.title is None:
+            return None
+        names = cls._ingredient_names(recipe)
+        return {
+            'id': recipe.id,
+            'title': recipe.title,
+            'dietary_type': recipe.dietary_type.value if recipe.dietary_type else DietaryType.PAREVE.value,
+            'course_hints': [course.value for course in recipe.course_types],
+            'cooking_time': recipe.cooking_time or 30,
+            'preparation_time': recipe.preparation_time or 15,
+            'difficulty': recipe.difficulty.value if recipe.difficulty else 'medium',
+            'servings': recipe.servings or 4,
+            'ingredients_preview': cls._ingredients_preview(names),
+            'main_ingredient': cls._main_ingredient(names),
+            'has_image': bool(recipe.image_url or recipe.image_hash),
+        }
+
+    @classmethod
+    def _ingredient_names(cls, recipe):
+        """Ingredient names of a recipe, in order"""
+        try:
+            # Use ingredients_list (JSON) if available, fallback to ingredients (text)
+            if recipe.ingredients_list and isinstance(recipe.ingredients_list, list):
+                return [
+                    ing.get('name', ing.get('ingredient', '')) if isinstance(ing, dict) else ''
+                    for ing in recipe.ingredients_list
+                ]
+            return [str(ing) for ing in recipe.ingredients]
+        except Exception:
+            return []
+
+    @classmethod
+    def _ingredients_preview(cls, names):
+        """First ingredient names, with the number of the rest"""
+        preview = ', '.join(name for name in names[:cls.PREVIEW_INGREDIENTS] if name)
+        if len(names) > cls.PREVIEW_INGREDIENTS:
+            preview += f" (+{len(names) - cls.PREVIEW_INGREDIENTS})"
+        return preview
+
+    @classmethod
+    def _main_ingredient(cls, names):
+        """
+        Last word of the first ingredient, without amounts and units
+
+        The last word names the ingredient itself ("חזה עוף", "בשר בקר").
+        """
+        for name in names:
+            words = [token for token in tokenize(name) if not token.isdigit() and token not in cls.UNIT_WORDS]
+            if words:
+                return words[-1]
+        return None
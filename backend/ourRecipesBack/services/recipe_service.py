@@ -1,24 +1,94 @@
 from io import BytesIO
-from flask import current_app
 from ..extensions import db
 from ..models.recipe import Recipe
+from ..models.recipe_token import RecipeToken
+from ..models.category import Category
 from .telegram_service import telegram_service
+from .telegram_outbox import TelegramOutbox
 from ..models.enums import RecipeDifficulty
 from .ai_service import AIService
+from .gemini_gateway import GeminiGateway
+from .search_index_service import SearchIndexService
+from .suggestion_index import SuggestionIndex
+from .recipe_catalog import RecipeCatalog
+from .image_variant_service import ImageVariantService
+from .job_queue import JobQueue
+from ..utils.hebrew_text import index_terms, tokenize
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.sql import func
 from datetime import datetime, timezone
+import asyncio
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Session.info keys of the recipes reindexed in the open transaction, and of
+# their in-memory index updates waiting for the commit
+_REINDEXED = 'reindexed_recipes'
+_INDEX_UPDATES = 'recipe_index_updates'
+
+
+@event.listens_for(Session, 'before_commit')
+def _prepare_index_updates(session):
+    """Read the in-memory index entries of the reindexed recipes, while SQL can still run"""
+    recipes = session.info.pop(_REINDEXED, None)
+    if not recipes:
+        return
+    session.flush()
+    updates = []
+    for recipe in recipes:
+        state = inspect(recipe)
+        # Recipes added in a savepoint that rolled back are gone
+        if not state.persistent:
+            continue
+        updates.append((recipe.id, recipe.title, recipe.categories, RecipeCatalog.entry_for(recipe)))
+    session.info[_INDEX_UPDATES] = updates
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_index_updates(session):
+    for recipe_id, title, categories, entry in session.info.pop(_INDEX_UPDATES, ()):
+        SuggestionIndex.update_recipe(recipe_id, title, categories)
+        RecipeCatalog.update_recipe(recipe_id, entry)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_index_updates(session, previous_transaction):
+    # A rolled back savepoint keeps the others, its recipes are skipped or reloaded at commit
+    if previous_transaction.parent is None:
+        session.info.pop(_REINDEXED, None)
+        session.info.pop(_INDEX_UPDATES, None)
+
+
 class RecipeService:
     """Service class for handling recipe operations"""
 
+    # Concurrent Telegram media downloads during sync
+    MEDIA_DOWNLOAD_CONCURRENCY = 4
+    _download_semaphore = None
+    _download_loop = None
+
     @staticmethod
     def get_recipe(telegram_id):
         """Get recipe by telegram ID"""
         return Recipe.query.filter_by(telegram_id=telegram_id).first()
 
+    @staticmethod
+    def get_recipes_by_telegram_ids(telegram_ids):
+        """Load recipes for a batch of Telegram message ids in one query, keyed by id"""
+        if not telegram_ids:
+            return {}
+        recipes = Recipe.query.filter(Recipe.telegram_id.in_(telegram_ids)).all()
+        return {recipe.telegram_id: recipe for recipe in recipes}
+
+    @staticmethod
+    def get_image_hash(recipe_id):
+        """Get the image hash of a recipe without loading the recipe"""
+        return db.session.query(Recipe.image_hash).filter(Recipe.id == recipe_id).scalar()
+
     @staticmethod
     def get_first_line(text):
         """Extract first line from recipe text"""
@@ -38,35 +108,23 @@ class RecipeService:
     async def create_recipe(cls, text, image_data=None, created_by=None):
         """Create new recipe and send to Telegram"""
         try:
-            client = await telegram_service.get_client()
-            async with client:
-                channel_entity = await client.get_entity(current_app.config["CHANNEL_URL"])
-
-                if image_data:
-                    file = BytesIO(image_data)
-                    file.name = "image.jpg"
-                    message = await client.send_message(
-                        channel_entity,
-                        text,
-                        file=file
-                    )
-                else:
-                    message = await client.send_message(channel_entity, text)
-
-                if not message:
-                    return None, None
-
-                recipe = Recipe(
-                    telegram_id=message.id,
-                    title=cls.get_first_line(text),
-                    raw_content=text,
-                    image_data=image_data
-                )
+            message = await telegram_service.send_message(text, image_data)
+            if not message:
+                return None, None
+
+            recipe = Recipe(
+                telegram_id=message.id,
+                title=cls.get_first_line(text),
+                raw_content=text,
+                image_data=image_data
+            )
 
-                db.session.add(recipe)
-                db.session.commit()
+            recipe.refresh_search_tokens()
+            db.session.add(recipe)
+            cls.reindex_recipe(recipe)
+            db.session.commit()
 
-                return recipe, message.id
+            return recipe, message.id
 
         except Exception as e:
             print(f"Error creating recipe: {str(e)}")
@@ -98,86 +156,159 @@ class RecipeService:
                 created_by=created_by,
                 change_description="Recipe update"
             )
+            cls.reindex_recipe(recipe)
 
-            # Telegram update
-            print(f"[RecipeService.update_recipe] Updating Telegram message {telegram_id}...", flush=True)
-            success = await telegram_service.edit_message(
-                telegram_id,
-                new_text,
-                image_data
-            )
-
-            if success:
-                print(f"[RecipeService.update_recipe] Telegram update successful, committing to DB", flush=True)
-                db.session.commit()
-                return recipe, None
-            else:
-                print(f"[RecipeService.update_recipe] Telegram update failed, rolling back DB", flush=True)
-                db.session.rollback()
-                return None, "Failed to update Telegram message"
+            # Telegram update, delivered by the outbox after the commit
+            print(f"[RecipeService.update_recipe] Queueing Telegram edit of message {telegram_id}...", flush=True)
+            TelegramOutbox.edit(telegram_id, new_text, image_data, target=recipe)
+            db.session.commit()
+            return recipe, None
 
         except Exception as e:
             print(f"[RecipeService.update_recipe] Exception: {str(e)}", flush=True)
             db.session.rollback()
-            error_msg = str(e)
-            # Handle Telegram's "message not modified" error gracefully
-            if "message was not modified" in error_msg.lower():
-                # If the message wasn't modified but everything else is fine,
-                # we can consider this a success
-                print(f"[RecipeService.update_recipe] Telegram says 'not modified', treating as success", flush=True)
-                return recipe, "not modified"
-            print(f"[RecipeService.update_recipe] Returning error: {error_msg}", flush=True)
-            return None, error_msg
+            return None, str(e)
+
+    @staticmethod
+    def get_media_key(media):
+        """
+        Get the (id, access_hash) identifying a Telegram photo or document
+
+        Returns:
+            tuple | None: None for media without a downloadable file
+        """
+        item = getattr(media, 'photo', None) or getattr(media, 'document', None)
+        if item is None or getattr(item, 'id', None) is None:
+            return None
+        return item.id, getattr(item, 'access_hash', None)
 
     @classmethod
-    async def sync_message(cls, client, message, sync_log):
+    def _get_download_semaphore(cls):
+        # Semaphores belong to an event loop, and each sync may run in a new one
+        loop = asyncio.get_running_loop()
+        if cls._download_loop is not loop:
+            cls._download_semaphore = asyncio.Semaphore(cls.MEDIA_DOWNLOAD_CONCURRENCY)
+            cls._download_loop = loop
+        return cls._download_semaphore
+
+    @staticmethod
+    async def _download(client, media):
+        media_bytes = BytesIO()
+        await client.download_media(media, file=media_bytes)
+        return media_bytes.getvalue()
+
+    @classmethod
+    async def download_media(cls, client, media):
+        """Download Telegram media bytes, bounded by MEDIA_DOWNLOAD_CONCURRENCY"""
+        async with cls._get_download_semaphore():
+            return await cls._download(client, media)
+
+    @staticmethod
+    def get_stored_media_keys(telegram_ids):
+        """Get the Telegram media (id, access_hash) of stored images, by telegram_id"""
+        if not telegram_ids:
+            return {}
+        rows = db.session.query(
+            Recipe.telegram_id, Recipe.telegram_media_id, Recipe.telegram_media_access_hash
+        ).filter(
+            Recipe.telegram_id.in_(telegram_ids),
+            Recipe.image_hash.isnot(None),
+            Recipe.telegram_media_id.isnot(None)
+        )
+        return {telegram_id: (media_id, access_hash) for telegram_id, media_id, access_hash in rows}
+
+    @classmethod
+    async def fetch_message_media(cls, client, message, stored_media_key=None, bounded=True):
+        """
+        Download a message's media unless it is the one already stored
+
+        Does not touch the database, so it can run concurrently with writes.
+
+        Args:
+            stored_media_key (tuple): Media (id, access_hash) of the stored image
+            bounded (bool): Limit by MEDIA_DOWNLOAD_CONCURRENCY; callers running
+                under their own limit pass False
+
+        Returns:
+            tuple: (media bytes or None, media key)
+        """
+        media_key = cls.get_media_key(message.media)
+        if not message.media or (media_key is not None and media_key == stored_media_key):
+            return None, media_key
+        if bounded:
+            return await cls.download_media(client, message.media), media_key
+        return await cls._download(client, message.media), media_key
+
+    @classmethod
+    def apply_message(cls, message, existing_recipe, media_data=None, media_key=None):
+        """
+        Write a fetched Telegram recipe message to the session
+
+        Returns:
+            str: 'added' or 'updated'
+        """
+        # Simply use the message text as-is (read-only)
+        message_text = message.text
+
+        if existing_recipe:
+            # Update existing recipe with whatever is in Telegram
+            existing_recipe.title = cls.get_first_line(message_text)
+            existing_recipe.raw_content = message_text
+            existing_recipe._parse_content(message_text)
+            if media_data:
+                existing_recipe.set_image(image_data=media_data)
+                existing_recipe.set_telegram_media(media_key)
+            existing_recipe.last_sync = func.now()  # Mark as synced
+            cls.reindex_recipe(existing_recipe)
+            return 'updated'
+
+        # Create new recipe from Telegram message (as-is)
+        new_recipe = Recipe(
+            telegram_id=message.id,
+            title=cls.get_first_line(message_text),
+            raw_content=message_text,
+            last_sync=func.now()  # Set initial sync time
+        )
+        new_recipe._parse_content(message_text)
+        if media_data:
+            new_recipe.set_image(image_data=media_data)
+            new_recipe.set_telegram_media(media_key)
+        db.session.add(new_recipe)
+        cls.reindex_recipe(new_recipe)
+        return 'added'
+
+    @classmethod
+    async def sync_message(cls, client, message, sync_log, existing_recipes=None):
         """
         Sync single Telegram message to database (READ-ONLY from Telegram)
 
         This function only reads from Telegram and updates the local DB.
         It does NOT modify Telegram messages during sync.
         URLs are added to Telegram messages only when creating/updating recipes through the app.
+
+        Args:
+            existing_recipes (dict): Recipes of the sync batch by telegram_id,
+                from get_recipes_by_telegram_ids; queried per message when omitted
         """
         try:
             if not message or not message.text:
                 sync_log.recipes_failed += 1
                 return
 
-            existing_recipe = Recipe.query.filter_by(telegram_id=message.id).first()
-
-            # Download media in parallel if it exists
-            media_data = None
-            if message.media:
-                media_bytes = BytesIO()
-                await client.download_media(message.media, file=media_bytes)
-                media_bytes.seek(0)
-                media_data = media_bytes.read()
-
-            # Simply use the message text as-is (read-only)
-            message_text = message.text
-
-            if existing_recipe:
-                # Update existing recipe with whatever is in Telegram
-                existing_recipe.title = cls.get_first_line(message_text)
-                existing_recipe.raw_content = message_text
-                existing_recipe._parse_content(message_text)
-                if media_data:
-                    existing_recipe.set_image(image_data=media_data)
-                existing_recipe.last_sync = func.now()  # Mark as synced
-                sync_log.recipes_updated += 1
+            if existing_recipes is None:
+                existing_recipe = Recipe.query.filter_by(telegram_id=message.id).first()
             else:
-                # Create new recipe from Telegram message (as-is)
-                new_recipe = Recipe(
-                    telegram_id=message.id,
-                    title=cls.get_first_line(message_text),
-                    raw_content=message_text,
-                    last_sync=func.now()  # Set initial sync time
-                )
-                new_recipe._parse_content(message_text)
-                if media_data:
-                    new_recipe.set_image(image_data=media_data)
-                db.session.add(new_recipe)
+                existing_recipe = existing_recipes.get(message.id)
+
+            stored_media_key = None
+            if existing_recipe and existing_recipe.image_hash:
+                stored_media_key = (existing_recipe.telegram_media_id, existing_recipe.telegram_media_access_hash)
+            media_data, media_key = await cls.fetch_message_media(client, message, stored_media_key)
+
+            if cls.apply_message(message, existing_recipe, media_data, media_key) == 'added':
                 sync_log.recipes_added += 1
+            else:
+                sync_log.recipes_updated += 1
 
             sync_log.recipes_processed += 1
             logger.info(f"Recipe message {message.id} synced successfully")
@@ -187,12 +318,28 @@ class RecipeService:
             print(f"Error processing message {message.id}: {str(e)}")
             raise
 
+    @classmethod
+    def reindex_recipe(cls, recipe):
+        """
+        Refresh search structures after a recipe was created or changed
+
+        The full-text index is written in the caller's transaction. The
+        in-memory suggestion index and catalog are updated once it commits,
+        a rollback leaves them as they were.
+        """
+        SearchIndexService.index_recipe(recipe)
+        db.session.info.setdefault(_REINDEXED, set()).add(recipe)
+        ImageVariantService.schedule(recipe.image_hash)
+
     @classmethod
     def search_recipes(cls, query=None, categories=None, prep_time=None, difficulty=None, 
                       include_terms=None, exclude_terms=None):
         """
         Search recipes with advanced filters
         
+        Text criteria (query, include and exclude terms) are answered by the
+        full-text index and results are ordered by relevance.
+
         Args:
             query (str): Text to search for
             categories (list): Categories to filter by
@@ -203,21 +350,27 @@ class RecipeService:
         """
         try:
             recipes_query = Recipe.query
-
-            # Text search
-            if query:
-                search_pattern = f"%{query}%"
-                recipes_query = recipes_query.filter(
-                    db.or_(
-                        Recipe.title.ilike(search_pattern),
-                        Recipe.raw_content.ilike(search_pattern)
-                    )
-                )
+            ranking = None
+
+            if SearchIndexService.is_available():
+                # Query and include terms must all match
+                ranking = SearchIndexService.search(query, include_terms)
+                if ranking is not None:
+                    if not ranking:
+                        return []
+                    recipes_query = recipes_query.filter(Recipe.id.in_(list(ranking)))
+
+                # Exclude terms are resolved against the index too
+                excluded_ids = SearchIndexService.matching_any(exclude_terms)
+                if excluded_ids:
+                    recipes_query = recipes_query.filter(~Recipe.id.in_(list(excluded_ids)))
+            else:
+                recipes_query = cls._apply_text_filters(recipes_query, query, include_terms, exclude_terms)
 
             # Category filter
             if categories:
                 for category in categories:
-                    recipes_query = recipes_query.filter(Recipe._categories.ilike(f"%{category}%"))
+                    recipes_query = recipes_query.filter(Recipe.id.in_(Category.recipe_ids_named(category)))
 
             # Preparation time filter
             if prep_time:
@@ -231,69 +384,171 @@ class RecipeService:
                 except KeyError:
                     print(f"Invalid difficulty value: {difficulty}")
 
-            # Text content filters
-            if include_terms:
-                for term in include_terms:
-                    recipes_query = recipes_query.filter(Recipe.raw_content.ilike(f"%{term}%"))
-            
-            if exclude_terms:
-                for term in exclude_terms:
-                    recipes_query = recipes_query.filter(~Recipe.raw_content.ilike(f"%{term}%"))
-
             # Execute query and format results
-            recipes = recipes_query.all()
-            return cls._format_search_results(recipes)
+            recipes = recipes_query.order_by(Recipe.created_at.desc()).all()
+            if ranking:
+                recipes.sort(key=lambda r: ranking.get(r.id, 0), reverse=True)
+            return cls._format_search_results(recipes, ranking)
 
         except Exception as e:
             print(f"Search error in service: {str(e)}", flush=True)
             raise
 
     @staticmethod
-    def _format_search_results(recipes):
-        """Format recipes for search results"""
-        results = {}
+    def _apply_text_filters(recipes_query, query, include_terms, exclude_terms):
+        """ILIKE text filters, used only when the full-text index is unavailable"""
+        if query:
+            search_pattern = f"%{query}%"
+            recipes_query = recipes_query.filter(
+                db.or_(
+                    Recipe.title.ilike(search_pattern),
+                    Recipe.raw_content.ilike(search_pattern)
+                )
+            )
+        for term in include_terms or []:
+            recipes_query = recipes_query.filter(Recipe.raw_content.ilike(f"%{term}%"))
+        for term in exclude_terms or []:
+            recipes_query = recipes_query.filter(~Recipe.raw_content.ilike(f"%{term}%"))
+        return recipes_query
+
+    @staticmethod
+    def _format_search_results(recipes, ranking=None):
+        """Format recipes for search results, a list so best matches stay first"""
+        results = []
         for recipe in recipes:
-            # Use database ID as key for consistency
-            results[str(recipe.id)] = {
+            results.append({
                 "id": recipe.id,  # Return database ID (primary key)
                 "telegram_id": recipe.telegram_id,
                 "title": recipe.title,
                 "details": recipe.raw_content,
-                "image": recipe.get_image_url() if hasattr(recipe, 'get_image_url') else None,
+                "image": recipe.get_image_url('medium') if hasattr(recipe, 'get_image_url') else None,
                 "categories": recipe.categories,
                 "preparation_time": recipe.preparation_time,
-                "difficulty": recipe.difficulty.value if recipe.difficulty else None
-            }
+                "difficulty": recipe.difficulty.value if recipe.difficulty else None,
+                "score": ranking.get(recipe.id) if ranking else None
+            })
         return results
 
-    @staticmethod
-    def get_recipes_for_management():
+    # Management fields: columns they read and how they are rendered
+    MANAGEMENT_FIELDS = {
+        "id": ((), lambda r: r.id),
+        "telegram_id": (("telegram_id",), lambda r: r.telegram_id),
+        "title": (("title",), lambda r: r.title),
+        "raw_content": (("raw_content",), lambda r: r.raw_content),
+        "categories": (("_categories",), lambda r: r.categories),
+        "difficulty": (("difficulty",), lambda r: r.difficulty.value if r.difficulty else None),
+        "preparation_time": (("preparation_time",), lambda r: r.preparation_time),
+        "ingredients": (("_ingredients",), lambda r: r.ingredients),
+        "instructions": (("_instructions",), lambda r: r.instructions),
+        "is_parsed": (("is_parsed",), lambda r: r.is_parsed),
+        "parse_errors": (("parse_errors",), lambda r: r.parse_errors),
+        "created_at": ((), lambda r: r.created_at.isoformat() if r.created_at else None),
+        "updated_at": (("updated_at",), lambda r: r.updated_at.isoformat() if r.updated_at else None),
+        "image": (("image_hash", "image_url"), lambda r: r.get_image_url('medium')),
+        "thumbnail": (("image_hash", "image_url"), lambda r: r.get_image_url('thumb')),
+    }
+    DEFAULT_MANAGEMENT_FIELDS = [
+        "id", "telegram_id", "title", "raw_content", "categories", "difficulty",
+        "preparation_time", "ingredients", "instructions", "is_parsed",
+        "parse_errors", "created_at", "updated_at", "image"
+    ]
+    MANAGEMENT_PAGE_SIZE = 50
+    MANAGEMENT_MAX_PAGE_SIZE = 200
+
+    @classmethod
+    def _management_query(cls, fields):
+        """Recipes newest first, reading only the columns the fields need"""
+        columns = {"id", "created_at"}
+        for field in fields:
+            columns.update(cls.MANAGEMENT_FIELDS[field][0])
+        return Recipe.query.options(
+            load_only(*(getattr(Recipe, column) for column in sorted(columns)))
+        ).order_by(Recipe.created_at.desc(), Recipe.id.desc())
+
+    @classmethod
+    def _management_row(cls, recipe, fields):
+        return {field: cls.MANAGEMENT_FIELDS[field][1](recipe) for field in fields}
+
+    @classmethod
+    def get_recipes_for_management(cls):
         """Get all recipes with management metadata"""
         try:
-            recipes = Recipe.query.order_by(Recipe.created_at.desc()).all()
-            return [
-                {
-                    "id": recipe.id,
-                    "telegram_id": recipe.telegram_id,
-                    "title": recipe.title,
-                    "raw_content": recipe.raw_content,
-                    "categories": recipe.categories,
-                    "difficulty": recipe.difficulty.value if recipe.difficulty else None,
-                    "preparation_time": recipe.preparation_time,
-                    "ingredients": recipe.ingredients,
-                    "instructions": recipe.instructions,
-                    "is_parsed": recipe.is_parsed,
-                    "parse_errors": recipe.parse_errors,
-                    "created_at": recipe.created_at.isoformat() if recipe.created_at else None,
-                    "updated_at": recipe.updated_at.isoformat() if recipe.updated_at else None,
-                    "image": recipe.get_image_url() if hasattr(recipe, 'get_image_url') else None,
-                }
-                for recipe in recipes
-            ]
+            fields = cls.DEFAULT_MANAGEMENT_FIELDS
+            return [cls._management_row(recipe, fields) for recipe in cls._management_query(fields)]
         except Exception as e:
             print(f"Error fetching recipes for management: {str(e)}", flush=True)
             raise
 
+    @staticmethod
+    def _encode_cursor(recipe):
+        payload = json.dumps([recipe.created_at.isoformat(), recipe.id])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            created_at, recipe_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(created_at), int(recipe_id)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+
+    @classmethod
+    def get_recipes_page(cls, limit=None, cursor=None, fields=None):
+        """
+        Get one page of recipes for management, newest first
+
+        Pages are addressed by a keyset cursor on (created_at, id), so each page
+        costs the same regardless of its position.
+
+        Args:
+            limit (int): Page size (default MANAGEMENT_PAGE_SIZE)
+            cursor (str): Cursor returned with the previous page
+            fields (list): Fields to return, all management fields by default
+
+        Returns:
+            dict: data, next_cursor and total/parsed/unparsed counts
+
+        Raises:
+            ValueError: On an unknown field, invalid limit or malformed cursor
+        """
+        fields = fields or cls.DEFAULT_MANAGEMENT_FIELDS
+        unknown = [field for field in fields if field not in cls.MANAGEMENT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        limit = cls.MANAGEMENT_PAGE_SIZE if limit is None else int(limit)
+        if not 1 <= limit <= cls.MANAGEMENT_MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {cls.MANAGEMENT_MAX_PAGE_SIZE}")
+
+        query = cls._management_query(fields)
+        if cursor:
+            created_at, recipe_id = cls._decode_cursor(cursor)
+            query = query.filter(
+                db.or_(
+                    Recipe.created_at < created_at,
+                    db.and_(Recipe.created_at == created_at, Recipe.id < recipe_id)
+                )
+            )
+
+        # Fetch one extra row to know whether another page exists
+        recipes = query.limit(limit + 1).all()
+        has_more = len(recipes) > limit
+        recipes = recipes[:limit]
+
+        total, parsed = db.session.query(
+            func.count(Recipe.id),
+            func.count(Recipe.id).filter(Recipe.is_parsed.is_(True))
+        ).one()
+
+        return {
+            "data": [cls._management_row(recipe, fields) for recipe in recipes],
+            "next_cursor": cls._encode_cursor(recipes[-1]) if has_more else None,
+            "counts": {
+                "total": total,
+                "parsed": parsed,
+                "unparsed": total - parsed,
+            },
+        }
+
     @classmethod
     async def bulk_parse_recipes(cls, recipe_ids):
         """
@@ -313,28 +568,21 @@ class RecipeService:
             for recipe in recipes:
                 try:
                     if recipe.raw_content and recipe.telegram_id:
-                        # AI reformatting
-                        reformatted_text = AIService.reformat_recipe(recipe.raw_content)
-                        
-                        # Update Telegram first
-                        telegram_success = await telegram_service.edit_message(
-                            recipe.telegram_id,
-                            reformatted_text,
-                            recipe.image_data if hasattr(recipe, 'image_data') else None
+                        # AI reformatting, behind interactive AI requests
+                        reformatted_text = AIService.reformat_recipe(
+                            recipe.raw_content, priority=GeminiGateway.BULK
                         )
                         
-                        if telegram_success:
-                            # If Telegram update succeeded, update DB
-                            recipe.update_content(
-                                title=cls.get_first_line(reformatted_text),
-                                raw_content=reformatted_text,
-                                created_by="AI Parser",
-                                change_description="AI Bulk Parse"
-                            )
-                            processed += 1
-                        else:
-                            failed += 1
-                            print(f"Telegram update failed for recipe {recipe.id}")
+                        recipe.update_content(
+                            title=cls.get_first_line(reformatted_text),
+                            raw_content=reformatted_text,
+                            created_by="AI Parser",
+                            change_description="AI Bulk Parse"
+                        )
+                        cls.reindex_recipe(recipe)
+                        # Telegram keeps the image, the outbox paces the edits
+                        TelegramOutbox.edit(recipe.telegram_id, reformatted_text, target=recipe)
+                        processed += 1
                     else:
                         failed += 1
                         print(f"Recipe {recipe.id} missing content or telegram_id")
@@ -371,31 +619,52 @@ class RecipeService:
             if not query or len(query.strip()) < 2:
                 return []
 
-            search_pattern = f"%{query}%"
-            
-            # Search in titles and categories
-            recipes = Recipe.query.filter(
-                db.or_(
-                    Recipe.title.ilike(search_pattern),
-                    Recipe._categories.ilike(search_pattern)
+            # Answered from memory when the prefix index is loaded
+            if SuggestionIndex.is_ready():
+                return SuggestionIndex.suggest(query, limit)
+
+            words = tokenize(query)
+            if not words:
+                return []
+            *complete_words, partial_word = words
+
+            # Indexed token lookups: the last word may be incomplete and is
+            # matched as a prefix range, earlier words must match exactly
+            fields = (RecipeToken.FIELD_TITLE, RecipeToken.FIELD_CATEGORY)
+            matching_ids = db.session.query(RecipeToken.recipe_id).filter(
+                RecipeToken.field.in_(fields),
+                RecipeToken.token >= partial_word,
+                RecipeToken.token < partial_word + '\uffff'
+            )
+            for word in complete_words:
+                matching_ids = matching_ids.filter(
+                    RecipeToken.recipe_id.in_(
+                        db.session.query(RecipeToken.recipe_id).filter(
+                            RecipeToken.field.in_(fields),
+                            RecipeToken.token == word
+                        )
+                    )
                 )
-            ).limit(limit).all()
-            
-            suggestions = set()
-            
-            for recipe in recipes:
-                # Add matching title if it contains the query
-                if query.lower() in recipe.title.lower():
-                    suggestions.add(recipe.title)
-                
-                # Add matching categories
-                if recipe.categories:
-                    for category in recipe.categories:
-                        if query.lower() in category.lower():
-                            suggestions.add(category)
-            
-            return list(suggestions)[:limit]
-            
+            matching_ids = matching_ids.distinct().limit(limit * 4)
+
+            rows = db.session.query(Recipe.title, Recipe._categories).filter(
+                Recipe.id.in_(matching_ids)
+            ).all()
+
+            def matches(text):
+                terms = index_terms(text)
+                return (all(word in terms for word in complete_words)
+                        and any(term.startswith(partial_word) for term in terms))
+
+            suggestions = []
+            for title, categories in rows:
+                candidates = [title or ''] + [c.strip() for c in (categories or '').split(',')]
+                for candidate in candidates:
+                    if candidate and candidate not in suggestions and matches(candidate):
+                        suggestions.append(candidate)
+
+            return suggestions[:limit]
+
         except Exception as e:
             print(f"Error getting search suggestions: {str(e)}", flush=True)
             return []
@@ -431,4 +700,10 @@ def get_recipe_by_id(recipe_id: int) -> dict:
         'categories': recipe.categories,
         'preparation_time': recipe.preparation_time,
         'difficulty': recipe.difficulty.value if recipe.difficulty else None
-    }
\ No newline at end of file
+    }
+
+
+@JobQueue.handler('bulk_parse', max_attempts=1)
+async def run_bulk_parse_job(payload):
+    """Job queue entry point of bulk recipe parsing"""
+    return await RecipeService.bulk_parse_recipes(payload['recipe_ids'])
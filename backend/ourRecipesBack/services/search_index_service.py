@@ -0,0 +1,226 @@
+"""
+Full-text search index for recipes
+
+SQLite databases get an FTS5 virtual table, Postgres gets a tsvector table
+with a GIN index. Both live in the `recipe_search` table, are keyed by the
+recipe id and return relevance scores so callers can rank results.
+"""
+import logging
+from sqlalchemy import DDL, event, text
+from ..extensions import db
+from ..utils.hebrew_text import index_text, query_terms
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'recipe_search'
+
+_SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    "USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+)
+_POSTGRES_CREATE = (
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    "recipe_id INTEGER PRIMARY KEY REFERENCES recipes(id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)"
+)
+_POSTGRES_CREATE_INDEX = (
+    f"CREATE INDEX IF NOT EXISTS idx_{SEARCH_TABLE}_document "
+    f"ON {SEARCH_TABLE} USING GIN (document)"
+)
+
+# Keep the index table in step with db.create_all() / db.drop_all()
+event.listen(db.metadata, 'after_create', DDL(_SQLITE_CREATE).execute_if(dialect='sqlite'))
+event.listen(db.metadata, 'after_create', DDL(_POSTGRES_CREATE).execute_if(dialect='postgresql'))
+event.listen(db.metadata, 'after_create', DDL(_POSTGRES_CREATE_INDEX).execute_if(dialect='postgresql'))
+event.listen(db.metadata, 'before_drop', DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+class SearchIndexService:
+    """Maintain and query the recipe full-text index"""
+
+    # Title matches weigh more than body matches
+    TITLE_WEIGHT = 10.0
+    BODY_WEIGHT = 1.0
+
+    _available = None
+
+    @classmethod
+    def init_app(cls, app):
+        """Create the index if needed and backfill it when it is out of date"""
+        with app.app_context():
+            try:
+                cls.ensure_index()
+                from ..models.recipe import Recipe
+                from ..models.recipe_token import RecipeToken
+                indexed = db.session.execute(text(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")).scalar()
+                total = Recipe.query.count()
+                # Recipes without tokens predate normalized indexing: tokenize them
+                # and re-index everything so stored terms use the same normalization
+                needs_tokens = total and not db.session.query(RecipeToken.recipe_id).first()
+                if needs_tokens:
+                    cls.backfill_tokens()
+                if needs_tokens or indexed != total:
+                    logger.info(f"Search index has {indexed} of {total} recipes, rebuilding")
+                    cls.rebuild()
+                cls._available = True
+            except Exception as e:
+                db.session.rollback()
+                cls._available = False
+                logger.error(f"Search index unavailable, falling back to ILIKE search: {str(e)}")
+
+    @classmethod
+    def is_available(cls):
+        """Whether the index can be used for queries"""
+        return bool(cls._available) and cls._dialect() in ('sqlite', 'postgresql')
+
+    @staticmethod
+    def _dialect():
+        return db.engine.dialect.name
+
+    @classmethod
+    def ensure_index(cls):
+        """Create the index table for the current database dialect"""
+        dialect = cls._dialect()
+        if dialect == 'sqlite':
+            db.session.execute(text(_SQLITE_CREATE))
+        elif dialect == 'postgresql':
+            db.session.execute(text(_POSTGRES_CREATE))
+            db.session.execute(text(_POSTGRES_CREATE_INDEX))
+        else:
+            raise RuntimeError(f"Full-text search is not supported on {dialect}")
+        db.session.commit()
+
+    @staticmethod
+    def backfill_tokens():
+        """Compute search tokens for every recipe"""
+        from ..models.recipe import Recipe
+        recipes = Recipe.query.all()
+        for recipe in recipes:
+            recipe.refresh_search_tokens()
+        db.session.commit()
+        logger.info(f"Search tokens computed for {len(recipes)} recipes")
+
+    @classmethod
+    def rebuild(cls):
+        """Re-index every recipe"""
+        from ..models.recipe import Recipe
+        db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+        rows = db.session.query(Recipe.id, Recipe.title, Recipe.raw_content).all()
+        for recipe_id, title, body in rows:
+            cls._write(recipe_id, title, body)
+        db.session.commit()
+        logger.info(f"Search index rebuilt with {len(rows)} recipes")
+
+    @classmethod
+    def index_recipe(cls, recipe):
+        """
+        Insert or replace a recipe in the index.
+
+        Runs inside the caller's transaction; the caller commits.
+        """
+        if not cls.is_available():
+            return
+        if recipe.id is None:
+            db.session.flush()
+        cls._write(recipe.id, recipe.title, recipe.raw_content)
+
+    @classmethod
+    def _write(cls, recipe_id, title, body):
+        # Store normalized terms (no niqqud, no final letters, prefixes peeled)
+        # so Hebrew inflections of a word land on the same index entry
+        params = {'recipe_id': recipe_id, 'title': index_text(title), 'body': index_text(body)}
+        if cls._dialect() == 'sqlite':
+            db.session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :recipe_id"), params)
+            db.session.execute(
+                text(f"INSERT INTO {SEARCH_TABLE} (rowid, title, body) VALUES (:recipe_id, :title, :body)"),
+                params
+            )
+        else:
+            db.session.execute(
+                text(
+                    f"INSERT INTO {SEARCH_TABLE} (recipe_id, document) VALUES (:recipe_id, "
+                    "setweight(to_tsvector('simple', :title), 'A') || "
+                    "setweight(to_tsvector('simple', :body), 'B')) "
+                    "ON CONFLICT (recipe_id) DO UPDATE SET document = EXCLUDED.document"
+                ),
+                params
+            )
+
+    @staticmethod
+    def _terms(values):
+        """Split search input into normalized term groups"""
+        return query_terms(v for v in values or [] if v)
+
+    @classmethod
+    def _build_match(cls, groups, operator, prefix=True):
+        """
+        Build an FTS5 MATCH or tsquery expression.
+
+        Alternatives inside a group are OR-ed, groups are joined by operator.
+        With prefix, terms also match longer words starting with them.
+        """
+        if cls._dialect() == 'sqlite':
+            joiner = ' AND ' if operator == 'and' else ' OR '
+            star = '*' if prefix else ''
+            return joiner.join(
+                '(' + ' OR '.join('"{}"{}'.format(t.replace('"', '""'), star) for t in group) + ')'
+                for group in groups
+            )
+        joiner = ' & ' if operator == 'and' else ' | '
+        star = ':*' if prefix else ''
+        return joiner.join(
+            '(' + ' | '.join(f"{t}{star}" for t in group) + ')'
+            for group in groups
+        )
+
+    @classmethod
+    def _match(cls, expression):
+        """Run a match expression and return {recipe_id: score}"""
+        if cls._dialect() == 'sqlite':
+            rows = db.session.execute(
+                text(
+                    f"SELECT rowid, bm25({SEARCH_TABLE}, :title_weight, :body_weight) "
+                    f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :expression"
+                ),
+                {
+                    'expression': expression,
+                    'title_weight': cls.TITLE_WEIGHT,
+                    'body_weight': cls.BODY_WEIGHT
+                }
+            ).all()
+            # bm25() is lower-is-better, flip it so higher scores rank first
+            return {row[0]: -row[1] for row in rows}
+
+        rows = db.session.execute(
+            text(
+                f"SELECT recipe_id, ts_rank(document, to_tsquery('simple', :expression)) "
+                f"FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', :expression)"
+            ),
+            {'expression': expression}
+        ).all()
+        return {row[0]: row[1] for row in rows}
+
+    @classmethod
+    def search(cls, query=None, include_terms=None):
+        """
+        Rank recipes that contain every query and include term.
+
+        Returns:
+            dict | None: {recipe_id: score}, or None when there is nothing to match
+        """
+        terms = cls._terms([query] + list(include_terms or []))
+        if not terms:
+            return None
+        return cls._match(cls._build_match(terms, 'and'))
+
+    @classmethod
+    def matching_any(cls, terms):
+        """
+        Return ids of recipes containing at least one of the terms.
+
+        Terms match whole words only, so excluding מלח keeps recipes with מלחמה.
+        """
+        terms = cls._terms(terms)
+        if not terms:
+            return set()
+        return set(cls._match(cls._build_match(terms, 'or', prefix=False)))
@@ -66,14 +66,14 @@ class SecurityService:
             response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
             response.headers['Permissions-Policy'] = 'geolocation=(), microphone=(), camera=()'
             
-            # Cache control for API
-            if request.path.startswith('/api/'):
+            # Cache control for API, unless the endpoint chose its own caching
+            if request.path.startswith('/api/') and 'Cache-Control' not in response.headers:
                 response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
                 response.headers['Pragma'] = 'no-cache'
                 response.headers['Expires'] = '0'
             
             # Add Vary header for proper caching
-            response.headers['Vary'] = 'Origin, Accept-Encoding'
+            response.vary.update(('Origin', 'Accept-Encoding'))
             
             if app.config.get('DEBUG', False):
                 LoggingService.log_with_context(
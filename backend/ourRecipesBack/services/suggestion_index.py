@@ -0,0 +1,175 @@
+"""
+In-process prefix index for search suggestions
+
+Recipe titles and categories are normalized and stored as sorted keys so a
+prefix lookup is a bisect plus a short scan, without a database round trip.
+Every word of a suggestion (and its prefix-stripped forms) starts a key, so
+typing the beginning of any word in a title finds it.
+"""
+import logging
+import threading
+from bisect import bisect_left, insort
+from sqlalchemy import func
+from ..extensions import db
+from ..utils.hebrew_text import strip_prefixes, tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class SuggestionIndex:
+    """Sorted-key prefix index of recipe titles and categories"""
+
+    KIND_TITLE = 'title'
+    KIND_CATEGORY = 'category'
+
+    # Upper bound on prefix matches ranked for a single lookup
+    MAX_SCAN = 500
+
+    _lock = threading.Lock()
+    _keys = []          # sorted [(key, display)]
+    _entries = {}       # display -> {'kind', 'recipes': set}
+    _recipes = {}       # recipe_id -> (title, [categories])
+    _popularity = {}    # recipe_id -> number of menu meals using it
+    _ready = False
+
+    @classmethod
+    def init_app(cls, app):
+        """Build the index at startup"""
+        with app.app_context():
+            try:
+                cls.build()
+            except Exception as e:
+                db.session.rollback()
+                cls._ready = False
+                logger.error(f"Suggestion index unavailable, falling back to database lookups: {str(e)}")
+
+    @classmethod
+    def is_ready(cls):
+        return cls._ready
+
+    @classmethod
+    def build(cls):
+        """Load every recipe title and category into a fresh index"""
+        from ..models.recipe import Recipe
+        from ..models.menu import MealRecipe
+
+        popularity = dict(
+            db.session.query(MealRecipe.recipe_id, func.count(MealRecipe.id))
+            .group_by(MealRecipe.recipe_id)
+            .all()
+        )
+        rows = db.session.query(Recipe.id, Recipe.title, Recipe._categories).all()
+
+        with cls._lock:
+            cls._keys = []
+            cls._entries = {}
+            cls._recipes = {}
+            cls._popularity = popularity
+            for recipe_id, title, categories in rows:
+                cls._add(recipe_id, title, cls._split_categories(categories))
+            cls._keys.sort()
+            cls._ready = True
+        logger.info(f"Suggestion index built with {len(cls._entries)} entries from {len(rows)} recipes")
+
+    @classmethod
+    def update_recipe(cls, recipe_id, title, categories):
+        """Replace a recipe's titles and categories in the index, once its change is committed"""
+        if not cls._ready:
+            return
+        with cls._lock:
+            if cls._recipes.get(recipe_id) == (title, categories):
+                return
+            cls._remove(recipe_id)
+            cls._add(recipe_id, title, categories, keep_sorted=True)
+
+    @classmethod
+    def suggest(cls, query, limit=5):
+        """
+        Get suggestions whose words start with the query
+
+        Args:
+            query (str): Text typed so far
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            list[str]: Suggestions, most popular first
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        # The typed word may carry a prefix the indexed word does not (העוף / עוף)
+        prefixes = [' '.join([form] + words[1:]) for form in strip_prefixes(words[0])]
+
+        matches = {}
+        with cls._lock:
+            keys = cls._keys
+            for prefix in prefixes:
+                position = bisect_left(keys, (prefix,))
+                while position < len(keys) and len(matches) < cls.MAX_SCAN:
+                    key, display = keys[position]
+                    if not key.startswith(prefix):
+                        break
+                    if display not in matches:
+                        matches[display] = cls._weight(display)
+                    position += 1
+
+        ranked = sorted(matches.items(), key=lambda item: (-item[1], len(item[0]), item[0]))
+        return [display for display, _ in ranked[:limit]]
+
+    @classmethod
+    def _weight(cls, display):
+        """Categories weigh by recipe count, titles by how often they are planned"""
+        entry = cls._entries[display]
+        if entry['kind'] == cls.KIND_CATEGORY:
+            return len(entry['recipes'])
+        return 1 + sum(cls._popularity.get(recipe_id, 0) for recipe_id in entry['recipes'])
+
+    @staticmethod
+    def _split_categories(value):
+        return [c.strip() for c in (value or '').split(',') if c.strip()]
+
+    @staticmethod
+    def _keys_for(display):
+        """Every word start of the display, with and without Hebrew prefixes"""
+        words = tokenize(display)
+        keys = set()
+        for i, word in enumerate(words):
+            rest = words[i + 1:]
+            for form in strip_prefixes(word):
+                keys.add(' '.join([form] + rest))
+        return keys
+
+    @classmethod
+    def _add(cls, recipe_id, title, categories, keep_sorted=False):
+        cls._recipes[recipe_id] = (title, list(categories))
+        displays = [(title, cls.KIND_TITLE)] if title else []
+        displays += [(category, cls.KIND_CATEGORY) for category in categories]
+        for display, kind in displays:
+            entry = cls._entries.get(display)
+            if entry is None:
+                entry = cls._entries[display] = {'kind': kind, 'recipes': set()}
+                for key in cls._keys_for(display):
+                    if keep_sorted:
+                        insort(cls._keys, (key, display))
+                    else:
+                        cls._keys.append((key, display))
+            entry['recipes'].add(recipe_id)
+
+    @classmethod
+    def _remove(cls, recipe_id):
+        previous = cls._recipes.pop(recipe_id, None)
+        if previous is None:
+            return
+        title, categories = previous
+        for display in ([title] if title else []) + categories:
+            entry = cls._entries.get(display)
+            if entry is None:
+                continue
+            entry['recipes'].discard(recipe_id)
+            if entry['recipes']:
+                continue
+            del cls._entries[display]
+            for key in cls._keys_for(display):
+                position = bisect_left(cls._keys, (key, display))
+                if position < len(cls._keys) and cls._keys[position] == (key, display):
+                    del cls._keys[position]
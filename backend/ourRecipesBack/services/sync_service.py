@@ -0,0 +1,551 @@
+"""
+Streaming Telegram channel sync
+
+Messages are read with `iter_messages` into a bounded queue by a producer
+task. A dispatcher classifies them and fetches recipe media concurrently,
+and a single writer task applies the results in batched transactions, so
+memory stays constant regardless of channel size and the session is only
+used by one task. Counters on the SyncLog are committed with every batch
+to report progress while the sync runs, together with a checkpoint that
+lets a sync interrupted by a restart continue where it stopped. Sync jobs
+run on the job queue, whose retries resume from that checkpoint.
+"""
+import asyncio
+import logging
+from collections import deque
+from flask import current_app
+from sqlalchemy.sql import func
+from telethon.tl.functions.channels import GetFullChannelRequest
+from telethon.tl.functions.updates import GetChannelDifferenceRequest
+from telethon.tl.types import ChannelMessagesFilterEmpty, UpdateEditChannelMessage
+from telethon.tl.types.updates import ChannelDifferenceEmpty, ChannelDifferenceTooLong
+from ..extensions import db
+from ..models import Recipe, Menu
+from ..models.place import Place
+from ..models.enums import SyncStatus
+from ..models.sync import SyncLog, SyncState
+from .telegram_service import telegram_service
+from .recipe_service import RecipeService
+from .menu_service import MenuService
+from .job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+MENU_MARKER = "🍽️ תפריט"
+PLACE_MARKER = "המלצה"
+DELETED_MARKER = "❌ נמחק על ידי:"
+
+# Marks the end of the message stream in the queue
+_DONE = object()
+
+
+class _Watermark:
+    """Highest message id seen during a sync"""
+
+    def __init__(self, message_id=0):
+        self.message_id = message_id
+
+    def update(self, message):
+        self.message_id = max(self.message_id, message.id)
+
+
+class _Progress:
+    """Stream position shared by the dispatcher and the writer"""
+
+    def __init__(self, sync_log):
+        # Continue from the checkpoint of an interrupted run
+        self.scanned = sync_log.messages_scanned or 0
+        # Scanned ids not yet covered by the checkpoint
+        self._uncounted = deque()
+        self.watermark = _Watermark(sync_log.high_water_message_id or 0)
+        self.menu_ids = list(sync_log.pending_menu_ids or [])
+        self.lowest_scanned = sync_log.checkpoint_message_id
+        # Ids handed to the writer but not written yet
+        self.unwritten = set()
+
+    def scan(self, message):
+        self._uncounted.append(message.id)
+        self.watermark.update(message)
+        if self.lowest_scanned is None or message.id < self.lowest_scanned:
+            self.lowest_scanned = message.id
+
+    @property
+    def checkpoint(self):
+        """Id below which the stream still has to be read"""
+        if self.unwritten:
+            return max(self.unwritten) + 1
+        return self.lowest_scanned
+
+    def count_checkpointed(self):
+        """Count scanned messages the checkpoint covers, which a resume will not read again"""
+        checkpoint = self.checkpoint
+        while self._uncounted and self._uncounted[0] >= checkpoint:
+            self._uncounted.popleft()
+            self.scanned += 1
+
+
+class SyncService:
+    """Read the Telegram channel and write recipes, places and menus to the DB"""
+
+    # Messages buffered between the reader and the writer
+    QUEUE_SIZE = 100
+    # Messages written per commit, and recipes looked up per query
+    CHUNK_SIZE = 10
+    # Concurrent media fetches when SYNC_CONCURRENCY is not configured
+    DEFAULT_CONCURRENCY = 4
+
+    @classmethod
+    def start_job(cls, sync_type='partial', user_id='system'):
+        """
+        Create a sync job and queue it for the job workers
+
+        Returns:
+            tuple: (SyncLog whose id can be polled for progress, queued SyncQueue job)
+        """
+        job = SyncLog(sync_type=sync_type)
+        job.touch()
+        db.session.add(job)
+        db.session.commit()
+        queued = JobQueue.enqueue('sync', {'sync_log_id': job.id}, user_id=user_id)
+        return job, queued
+
+    @classmethod
+    async def run_job(cls, job_id):
+        """
+        Run a sync job from its checkpoint to completion
+
+        A failed attempt records its error but leaves the job in progress,
+        the job queue retries it. fail_job() marks it failed once the queue
+        gives up on it.
+
+        Returns:
+            SyncLog: The completed job
+
+        Raises:
+            Exception: The error the attempt failed with, after recording it
+        """
+        job = db.session.get(SyncLog, job_id)
+        job.status = SyncStatus.IN_PROGRESS.value
+        job.completed_at = None
+        job.error_message = None
+        job.touch()
+        db.session.commit()
+        try:
+            if job.sync_type == 'full_resync' and not job.is_resuming:
+                # Reset sync state for all recipes, places, and menus
+                Recipe.query.update({Recipe.last_sync: None})
+                Place.query.update({Place.is_synced: False})
+                Menu.query.update({Menu.last_sync: None})
+                db.session.commit()
+
+            await cls.run(job, full=job.is_full)
+            job.complete()
+            db.session.commit()
+            logger.info(f"Sync job {job_id} completed")
+            return job
+        except asyncio.CancelledError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            job.error_message = str(e)
+            job.touch()
+            db.session.commit()
+            logger.error(f"Sync job {job_id} attempt failed: {str(e)}")
+            raise
+
+    @classmethod
+    def fail_job(cls, job_id, error):
+        """Mark a sync job failed when its queue job will not run again"""
+        job = db.session.get(SyncLog, job_id)
+        if job is None or job.status != SyncStatus.IN_PROGRESS.value:
+            return
+        job.fail(error or "Failed")
+        db.session.commit()
+        logger.error(f"Sync job {job_id} failed: {job.error_message}")
+
+    @classmethod
+    async def run(cls, sync_log, full=False):
+        """
+        Sync the configured channel
+
+        Continues from the sync log's checkpoint when it has one.
+
+        Args:
+            sync_log (SyncLog): Log receiving the counters, progress and checkpoint
+            full (bool): Re-read the whole channel instead of only changes
+        """
+        client = await telegram_service.create_client()
+        async with client:
+            channel_url = current_app.config["CHANNEL_URL"]
+            channel_entity = await client.get_entity(channel_url)
+            state = SyncState.for_channel(channel_url)
+            before_id = sync_log.checkpoint_message_id
+
+            # Read the pts first so edits made while syncing are picked up next time
+            pts = sync_log.channel_pts
+            if pts is None:
+                pts = await cls._get_channel_pts(client, channel_entity)
+                sync_log.channel_pts = pts
+                db.session.commit()
+            edited_ids = None
+            if not full and state.pts is not None:
+                edited_ids, new_pts = await cls._get_edited_message_ids(client, channel_entity, state)
+                if edited_ids is None:
+                    logger.info("Channel update gap too long, falling back to full sync")
+                else:
+                    pts = new_pts
+
+            if edited_ids is None:
+                messages = client.iter_messages(channel_entity, offset_id=before_id or 0)
+            else:
+                messages = cls._iter_changes(client, channel_entity, state, edited_ids, before_id)
+
+            watermark = await cls._process_stream(client, channel_entity, messages, sync_log)
+
+            # Move the high-water mark only after everything was processed
+            state.advance(watermark.message_id)
+            state.pts = pts
+            db.session.commit()
+
+    @staticmethod
+    async def _get_channel_pts(client, channel_entity):
+        """Get the channel's current update sequence number"""
+        full_channel = await client(GetFullChannelRequest(channel_entity))
+        return full_channel.full_chat.pts
+
+    @staticmethod
+    async def _get_edited_message_ids(client, channel_entity, state):
+        """
+        Get ids of already synced messages edited since the stored pts.
+
+        Reads the channel update stream, so the cost follows the number of
+        changes rather than the channel size.
+
+        Returns:
+            tuple: (set of message ids, new pts), or (None, None) when the
+            update gap is too long and a full sync is needed
+        """
+        edited_ids = set()
+        pts = state.pts
+        while True:
+            difference = await client(GetChannelDifferenceRequest(
+                channel=channel_entity,
+                filter=ChannelMessagesFilterEmpty(),
+                pts=pts,
+                limit=100,
+                force=True
+            ))
+            if isinstance(difference, ChannelDifferenceTooLong):
+                return None, None
+            if isinstance(difference, ChannelDifferenceEmpty):
+                return edited_ids, difference.pts
+
+            for update in difference.other_updates:
+                if isinstance(update, UpdateEditChannelMessage) and update.message.id <= state.last_message_id:
+                    edited_ids.add(update.message.id)
+            pts = difference.pts
+            if difference.final:
+                return edited_ids, pts
+
+    @staticmethod
+    async def _iter_changes(client, channel_entity, state, edited_ids, before_id=None):
+        """
+        Iterate messages above the high-water mark, then edited ones
+
+        Ids only decrease along the stream, so a checkpoint id resumes it.
+        """
+        async for message in client.iter_messages(
+            channel_entity, min_id=state.last_message_id, offset_id=before_id or 0
+        ):
+            yield message
+        edited_ids = sorted((i for i in edited_ids if not before_id or i < before_id), reverse=True)
+        if edited_ids:
+            async for message in client.iter_messages(channel_entity, ids=edited_ids):
+                if message is not None:
+                    yield message
+
+    @staticmethod
+    async def _produce(messages, queue):
+        """Feed the message stream into the queue, ending it with _DONE"""
+        try:
+            async for message in messages:
+                await queue.put(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await queue.put(_DONE)
+            raise
+        await queue.put(_DONE)
+
+    @classmethod
+    async def _process_stream(cls, client, channel_entity, messages, sync_log):
+        """
+        Classify, fetch and write streamed messages
+
+        Recipe media are fetched by up to SYNC_CONCURRENCY tasks at once.
+        Fetched messages go to a single writer task, the only one touching
+        the session and the sync log, which applies them in batched
+        transactions.
+
+        Menus reference recipes, so only their ids are kept while streaming
+        and they are read again once all recipes are written.
+
+        Returns:
+            _Watermark: Highest message id processed
+        """
+        concurrency = current_app.config.get('SYNC_CONCURRENCY') or cls.DEFAULT_CONCURRENCY
+        message_queue = asyncio.Queue(maxsize=cls.QUEUE_SIZE)
+        write_queue = asyncio.Queue(maxsize=cls.QUEUE_SIZE)
+        progress = _Progress(sync_log)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(cls._produce(messages, message_queue))
+                group.create_task(cls._write(write_queue, sync_log, progress))
+                await cls._dispatch(client, message_queue, write_queue, group, concurrency, progress)
+        except ExceptionGroup as e:
+            # Surface the failing stage's own error
+            raise e.exceptions[0]
+
+        while progress.menu_ids:
+            chunk_ids = progress.menu_ids[:cls.CHUNK_SIZE]
+            menu_messages = [
+                message async for message in client.iter_messages(channel_entity, ids=chunk_ids)
+                if message is not None
+            ]
+            prefetched = MenuService.prefetch_for_sync(menu_messages)
+            for message in menu_messages:
+                try:
+                    await MenuService.sync_message(client, message, sync_log, prefetched=prefetched)
+                except Exception as e:
+                    sync_log.menus_failed += 1
+                    logger.error(f"Error processing menu message {message.id}: {str(e)}")
+            progress.menu_ids = progress.menu_ids[len(chunk_ids):]
+            cls._report_progress(sync_log, progress)
+            db.session.commit()
+
+        return progress.watermark
+
+    @classmethod
+    async def _dispatch(cls, client, message_queue, write_queue, group, concurrency, progress):
+        """Classify queued messages, starting bounded fetch tasks for recipes"""
+        semaphore = asyncio.Semaphore(concurrency)
+        fetches = set()
+        pending = []
+
+        async def start_fetches():
+            # Media of stored images, looked up once per chunk
+            stored_media_keys = RecipeService.get_stored_media_keys([m.id for m in pending])
+            for message in pending:
+                await semaphore.acquire()
+                task = group.create_task(cls._fetch(
+                    client, message, stored_media_keys.get(message.id), semaphore, write_queue
+                ))
+                fetches.add(task)
+                task.add_done_callback(fetches.discard)
+            pending.clear()
+
+        while True:
+            message = await message_queue.get()
+            if message is _DONE:
+                break
+            progress.scan(message)
+            if not message.text:
+                continue
+            if MENU_MARKER in message.text:
+                progress.menu_ids.append(message.id)
+            elif PLACE_MARKER in message.text:
+                progress.unwritten.add(message.id)
+                await write_queue.put(('place', message, None, None))
+            else:
+                progress.unwritten.add(message.id)
+                pending.append(message)
+                if len(pending) >= cls.CHUNK_SIZE:
+                    await start_fetches()
+
+        if pending:
+            await start_fetches()
+        if fetches:
+            await asyncio.gather(*fetches)
+        await write_queue.put(_DONE)
+
+    @staticmethod
+    async def _fetch(client, message, stored_media_key, semaphore, write_queue):
+        """Fetch a recipe message's media and hand it to the writer"""
+        try:
+            media_data, media_key = await RecipeService.fetch_message_media(
+                client, message, stored_media_key, bounded=False
+            )
+            item = ('recipe', message, media_data, media_key)
+        except Exception as e:
+            logger.error(f"Error fetching media of message {message.id}: {str(e)}")
+            item = ('failed', message, None, None)
+        finally:
+            semaphore.release()
+        await write_queue.put(item)
+
+    @classmethod
+    async def _write(cls, write_queue, sync_log, progress):
+        """Apply fetched messages in batches until the stream ends"""
+        while True:
+            batch = [await write_queue.get()]
+            while len(batch) < cls.CHUNK_SIZE and not write_queue.empty():
+                batch.append(write_queue.get_nowait())
+
+            done = batch[-1] is _DONE
+            if done:
+                batch.pop()
+            cls._write_batch(batch, sync_log)
+            for item in batch:
+                progress.unwritten.discard(item[1].id)
+            cls._report_progress(sync_log, progress)
+            db.session.commit()
+            if done:
+                return
+
+    @classmethod
+    def _write_batch(cls, batch, sync_log):
+        """
+        Write a batch of fetched messages to the session
+
+        Existing rows of the whole batch are loaded with one IN query per
+        table instead of one query per message. Each recipe is written in a
+        savepoint: a message that cannot be applied is rolled back, counted
+        as failed and skipped, so it never fails the whole sync.
+        """
+        place_messages = [message for kind, message, _, _ in batch if kind == 'place']
+        if place_messages:
+            cls._sync_places(place_messages, sync_log)
+
+        recipe_items = [item for item in batch if item[0] == 'recipe']
+        existing_recipes = RecipeService.get_recipes_by_telegram_ids([item[1].id for item in recipe_items])
+        for kind, message, media_data, media_key in batch:
+            if kind == 'failed':
+                sync_log.recipes_failed += 1
+                continue
+            if kind != 'recipe':
+                continue
+            try:
+                with db.session.begin_nested():
+                    outcome = RecipeService.apply_message(
+                        message, existing_recipes.get(message.id), media_data, media_key
+                    )
+            except Exception as e:
+                sync_log.recipes_failed += 1
+                logger.error(f"Skipping message {message.id}, it could not be applied: {str(e)}")
+                continue
+            if outcome == 'added':
+                sync_log.recipes_added += 1
+            else:
+                sync_log.recipes_updated += 1
+            sync_log.recipes_processed += 1
+
+    @classmethod
+    def _sync_places(cls, messages, sync_log):
+        """Create places for messages that do not have one yet, in bulk"""
+        try:
+            ids = [message.id for message in messages]
+            existing = {
+                place.telegram_message_id: place
+                for place in Place.query.filter(Place.telegram_message_id.in_(ids))
+            }
+
+            # Places created from the app and posted to the channel
+            unsynced_ids = [place.id for place in existing.values() if not place.is_synced]
+            if unsynced_ids:
+                Place.query.filter(Place.id.in_(unsynced_ids))\
+                    .update({'is_synced': True, 'last_sync': func.now()}, synchronize_session=False)
+
+            rows = []
+            for message in messages:
+                # Skip existing places and messages indicating deletion
+                if message.id in existing or DELETED_MARKER in message.text:
+                    continue
+                place_data = cls.parse_place(message.text)
+                if place_data and place_data.get('created_by'):
+                    rows.append(dict(place_data, telegram_message_id=message.id))
+                elif place_data:
+                    sync_log.places_failed += 1
+                    logger.error(f"Place message {message.id} has no author")
+
+            inserted = Place.insert_synced(rows)
+            sync_log.places_processed += inserted
+            if inserted:
+                logger.info(f"{inserted} places synced from messages {ids}")
+
+        except Exception as e:
+            db.session.rollback()
+            sync_log.places_failed += len(messages)
+            logger.error(f"Error processing place messages {[m.id for m in messages]}: {str(e)}")
+
+    @staticmethod
+    def parse_place(text):
+        """Parse place data from Telegram message text"""
+        try:
+            data = {}
+
+            for line in text.split("\n"):
+                if ":" not in line:
+                    continue
+
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip()
+
+                if value == "לא צוין":
+                    continue
+
+                if "סוג" in key:
+                    data["type"] = value.lower()
+                elif "שם" in key:
+                    data["name"] = value
+                elif "אתר" in key:
+                    data["website"] = value
+                elif "מיקום" in key:
+                    data["location"] = value
+                elif "Waze" in key:
+                    data["waze_link"] = value
+                elif "תיאור" in key:
+                    data["description"] = value
+                elif "נוסף על ידי" in key:
+                    data["created_by"] = value
+
+            # Name is required
+            if "name" not in data:
+                return None
+
+            return data
+        except Exception as e:
+            logger.error(f"Error parsing place message: {str(e)}")
+            return None
+
+    @staticmethod
+    def _report_progress(sync_log, progress):
+        """
+        Store how far the sync got, visible to readers of the sync log and
+        used as the checkpoint to resume from once committed
+        """
+        progress.count_checkpointed()
+        sync_log.messages_scanned = progress.scanned
+        sync_log.checkpoint_message_id = progress.checkpoint
+        sync_log.high_water_message_id = progress.watermark.message_id or None
+        sync_log.pending_menu_ids = list(progress.menu_ids)
+        sync_log.touch()
+        logger.info(
+            f"Sync {sync_log.id}: {progress.scanned} messages read, "
+            f"{sync_log.recipes_processed} recipes, {sync_log.places_processed} places"
+        )
+
+
+@JobQueue.handler('sync', max_attempts=3)
+async def run_sync_job(payload):
+    """Job queue entry point of sync jobs, retries continue from the checkpoint"""
+    job = await SyncService.run_job(payload['sync_log_id'])
+    return job.to_dict()
+
+
+@JobQueue.on_failure('sync')
+def fail_sync_job(payload, error):
+    """Finish the sync log of a sync job that failed for good or was cancelled"""
+    SyncService.fail_job(payload['sync_log_id'], error)
@@ -0,0 +1,142 @@
+"""
+Shared Telegram client
+
+Connecting a TelegramClient costs a full MTProto handshake, so instead of
+connecting for every operation one client per session stays connected on a
+dedicated event loop thread. Telethon clients are bound to the loop they
+connected on, so callers on any other loop (request handlers, job workers,
+background tasks) hand over a coroutine function that runs there with the
+connected client, and await its result. The connection is checked before
+use after being idle and is re-established when it dropped.
+"""
+import asyncio
+import logging
+import threading
+import time
+from telethon import TelegramClient
+from telethon.sessions import StringSession
+from telethon.tl.functions.updates import GetStateRequest
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramClientManager:
+    """Keep connected Telegram clients on a dedicated event loop thread"""
+
+    # Seconds a connection may sit idle before it is checked with a ping
+    HEALTH_CHECK_SECONDS = 60
+    # Seconds the ping may take before the connection is considered dead
+    PING_TIMEOUT_SECONDS = 10
+
+    _loop = None
+    _lock = threading.Lock()
+    _clients = {}  # (session string, api id, api hash) -> TelegramClient
+    _last_used = {}  # Same keys -> monotonic time of the last successful use
+    _connect_locks = {}  # Same keys -> asyncio.Lock on the client loop
+
+    @classmethod
+    def _get_loop(cls):
+        with cls._lock:
+            if cls._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    daemon=True,
+                    name='telegram-client'
+                ).start()
+                cls._loop = loop
+            return cls._loop
+
+    @classmethod
+    async def run(cls, operation, session_string, api_id, api_hash):
+        """
+        Run operation(client) with the shared connected client of a session
+
+        Args:
+            operation: Coroutine function taking the client. It runs on the
+                client loop, without the caller's app context.
+
+        Returns:
+            The operation's result
+        """
+        key = (session_string, int(api_id), api_hash)
+        loop = cls._get_loop()
+        coro = cls._run_on_loop(operation, key)
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    @classmethod
+    async def _run_on_loop(cls, operation, key):
+        client = await cls._get_connected(key)
+        try:
+            result = await operation(client)
+        except ConnectionError:
+            # Make the next operation connect again
+            cls._last_used.pop(key, None)
+            raise
+        cls._last_used[key] = time.monotonic()
+        return result
+
+    @classmethod
+    async def _get_connected(cls, key):
+        """Get the client of a session, connecting or reconnecting it when needed"""
+        lock = cls._connect_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            client = cls._clients.get(key)
+            if client is None:
+                client = cls._create_client(*key)
+                cls._clients[key] = client
+
+            if client.is_connected() and not await cls._is_stale(client, key):
+                return client
+
+            if client.is_connected():
+                logger.warning("Telegram connection failed health check, reconnecting")
+                await client.disconnect()
+            await client.connect()
+            if not await client.is_user_authorized():
+                raise ValueError("Telegram session is not authorized")
+            cls._last_used[key] = time.monotonic()
+            logger.info("Connected shared Telegram client")
+            return client
+
+    @classmethod
+    async def _is_stale(cls, client, key):
+        """Ping a connection idle longer than HEALTH_CHECK_SECONDS, True when it did not answer"""
+        last_used = cls._last_used.get(key)
+        if last_used is not None and time.monotonic() - last_used < cls.HEALTH_CHECK_SECONDS:
+            return False
+        try:
+            await asyncio.wait_for(client(GetStateRequest()), cls.PING_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Telegram ping failed: {str(e)}")
+            return True
+        cls._last_used[key] = time.monotonic()
+        return False
+
+    @classmethod
+    def _create_client(cls, session_string, api_id, api_hash):
+        return TelegramClient(
+            session=StringSession(session_string),
+            api_id=api_id,
+            api_hash=api_hash
+        )
+
+    @classmethod
+    def shutdown(cls):
+        """Disconnect all shared clients and stop the client loop"""
+        with cls._lock:
+            loop, cls._loop = cls._loop, None
+        if loop is None:
+            return
+
+        async def disconnect_all():
+            for client in cls._clients.values():
+                await client.disconnect()
+
+        asyncio.run_coroutine_threadsafe(disconnect_all(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        cls._clients.clear()
+        cls._last_used.clear()
+        cls._connect_locks.clear()
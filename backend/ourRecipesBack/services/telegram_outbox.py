@@ -0,0 +1,296 @@
+"""
+Outbox of Telegram message edits
+
+Edits of recipe and menu messages are stored in the telegram_outbox table
+with the change itself, so a request answers once its commit succeeded, and
+a dispatcher thread delivers them:
+
+- Edits of the same message are coalesced and the last one wins. A new
+  edit waits TELEGRAM_OUTBOX_DELAY_SECONDS, so a burst of saves is sent once.
+- Writes to a channel are paced by a token bucket. A FloodWaitError pauses
+  the channel for as long as Telegram asks, without using up an attempt.
+- Other failures are retried with exponential backoff.
+
+The delivery state is recorded on Recipe.sync_status and Menu.last_sync.
+"""
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from flask import current_app
+from telethon.errors import FloodWaitError, MessageIdInvalidError, MessageNotModifiedError
+from ..blob_store import blob_store
+from ..extensions import db
+from ..models import Menu, Recipe
+from ..models.enums import QueueStatus
+from ..models.sync import _utcnow
+from ..models.telegram_outbox import OutboxMessage
+from ..utils.rate_limit import TokenBucket
+from .telegram_service import TelegramService
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramOutbox:
+    """Queue Telegram message edits and deliver them from a dispatcher thread"""
+
+    # Seconds a new edit waits for further edits of the same message
+    DELAY_SECONDS = 2
+    # Edits sent per minute to one channel on average, and at most at once
+    WRITES_PER_MINUTE = 20
+    WRITE_BURST = 5
+    # Failed deliveries before an edit is given up
+    MAX_ATTEMPTS = 5
+    # Delay before the first retry, doubled for every further attempt
+    RETRY_BACKOFF_SECONDS = 10
+    MAX_BACKOFF_SECONDS = 600
+    # Seconds a claimed edit may take before it is delivered again
+    STALE_SECONDS = 300
+    # Seconds an idle dispatcher waits before looking for edits again
+    POLL_SECONDS = 2
+    # Edits read per dispatch round
+    BATCH = 20
+
+    _buckets = {}  # Channel URL -> TokenBucket, per process
+    _lock = threading.Lock()
+    _wake = threading.Event()
+
+    @classmethod
+    def edit(cls, message_id, text, image_data=None, target=None, chat=None):
+        """
+        Queue an edit of a channel message, stored with the caller's next commit
+
+        Args:
+            image_data (bytes): New image, None keeps the message media
+            target (Recipe | Menu): Whose delivery state is recorded
+            chat (str): Channel URL, CHANNEL_URL by default
+
+        Returns:
+            OutboxMessage: The pending edit
+        """
+        chat = chat or current_app.config['CHANNEL_URL']
+        row = OutboxMessage.query.filter_by(chat=chat, message_id=message_id).first()
+        if row is None:
+            row = OutboxMessage(chat=chat, message_id=message_id, revision=0, attempts=0)
+            db.session.add(row)
+
+        undelivered = row.status in (QueueStatus.PENDING.value, QueueStatus.RUNNING.value)
+        if not undelivered or image_data is not None:
+            # An edit without image keeps the image of an undelivered one
+            row.image_hash = blob_store.put(image_data) if image_data else None
+        if row.status != QueueStatus.PENDING.value:
+            delay = current_app.config.get('TELEGRAM_OUTBOX_DELAY_SECONDS', cls.DELAY_SECONDS)
+            row.run_after = _utcnow() + timedelta(seconds=delay)
+        row.text = text
+        row.revision = (row.revision or 0) + 1
+        row.status = QueueStatus.PENDING.value
+        row.attempts = 0
+        row.error = None
+
+        if isinstance(target, Recipe):
+            row.target_type, row.target_id = 'recipe', target.id
+            target.sync_status = 'pending'
+        elif isinstance(target, Menu):
+            row.target_type, row.target_id = 'menu', target.id
+
+        cls._wake.set()
+        return row
+
+    @classmethod
+    def pending_count(cls):
+        """Edits not delivered yet"""
+        return OutboxMessage.query.filter(
+            OutboxMessage.status.in_([QueueStatus.PENDING.value, QueueStatus.RUNNING.value])
+        ).count()
+
+    @classmethod
+    def _bucket(cls, chat):
+        with cls._lock:
+            bucket = cls._buckets.get(chat)
+            if bucket is None:
+                per_minute = current_app.config.get('TELEGRAM_WRITES_PER_MINUTE', cls.WRITES_PER_MINUTE)
+                bucket = TokenBucket(per_minute / 60, cls.WRITE_BURST)
+                cls._buckets[chat] = bucket
+            return bucket
+
+    @classmethod
+    def _due(cls):
+        now = _utcnow()
+        stale_before = now - timedelta(seconds=cls.STALE_SECONDS)
+        return OutboxMessage.query.filter(
+            db.or_(
+                db.and_(
+                    OutboxMessage.status == QueueStatus.PENDING.value,
+                    db.or_(OutboxMessage.run_after.is_(None), OutboxMessage.run_after <= now)
+                ),
+                db.and_(
+                    OutboxMessage.status == QueueStatus.RUNNING.value,
+                    OutboxMessage.claimed_at < stale_before
+                ),
+            )
+        ).order_by(OutboxMessage.id).limit(cls.BATCH).all()
+
+    @classmethod
+    def _claim(cls, row):
+        """Take an edit for delivery, if no newer edit or other dispatcher changed it"""
+        claimed = OutboxMessage.query.filter(
+            OutboxMessage.id == row.id,
+            OutboxMessage.revision == row.revision,
+            OutboxMessage.status == row.status,
+            OutboxMessage.claimed_at.is_(None) if row.claimed_at is None
+            else OutboxMessage.claimed_at == row.claimed_at
+        ).update({
+            OutboxMessage.status: QueueStatus.RUNNING.value,
+            OutboxMessage.claimed_at: _utcnow(),
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    @classmethod
+    def _settle(cls, row_id, revision, values):
+        """
+        Record the outcome of a delivery
+
+        Returns:
+            bool: False when a newer edit arrived meanwhile, which stays pending
+        """
+        settled = OutboxMessage.query.filter(
+            OutboxMessage.id == row_id,
+            OutboxMessage.revision == revision
+        ).update({**values, OutboxMessage.claimed_at: None}, synchronize_session=False)
+        return settled == 1
+
+    @classmethod
+    async def dispatch(cls):
+        """
+        Deliver the edits that are due, in the calling thread
+
+        Returns:
+            int: Edits delivered
+        """
+        delivered = 0
+        for row in cls._due():
+            bucket = cls._bucket(row.chat)
+            blocked = bucket.blocked_for()
+            if blocked:
+                cls._settle(row.id, row.revision, {
+                    OutboxMessage.status: QueueStatus.PENDING.value,
+                    OutboxMessage.run_after: _utcnow() + timedelta(seconds=blocked),
+                })
+                db.session.commit()
+                continue
+
+            # Read before claiming, the claim expires the loaded row
+            row_id, revision, attempts = row.id, row.revision, row.attempts
+            chat, message_id, text, image_hash = row.chat, row.message_id, row.text, row.image_hash
+            target = (row.target_type, row.target_id)
+            if not cls._claim(row):
+                continue
+
+            wait = bucket.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+
+            try:
+                image_data = blob_store.get(image_hash) if image_hash else None
+                await TelegramService.edit_message_or_raise(message_id, text, image_data, chat)
+            except MessageNotModifiedError:
+                pass
+            except FloodWaitError as e:
+                logger.warning(f"Telegram flood wait of {e.seconds} seconds for {chat}")
+                bucket.block(e.seconds)
+                cls._settle(row_id, revision, {
+                    OutboxMessage.status: QueueStatus.PENDING.value,
+                    OutboxMessage.run_after: _utcnow() + timedelta(seconds=e.seconds),
+                })
+                db.session.commit()
+                continue
+            except MessageIdInvalidError:
+                cls._fail(row_id, revision, attempts + 1, target, "Message not found")
+                continue
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Delivering edit of message {message_id} failed: {str(e)}")
+                attempts += 1
+                if attempts >= cls.MAX_ATTEMPTS:
+                    cls._fail(row_id, revision, attempts, target, str(e))
+                else:
+                    delay = min(cls.RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1), cls.MAX_BACKOFF_SECONDS)
+                    cls._settle(row_id, revision, {
+                        OutboxMessage.status: QueueStatus.PENDING.value,
+                        OutboxMessage.attempts: attempts,
+                        OutboxMessage.run_after: _utcnow() + timedelta(seconds=delay),
+                        OutboxMessage.error: str(e),
+                    })
+                    db.session.commit()
+                continue
+
+            now = _utcnow()
+            if cls._settle(row_id, revision, {
+                OutboxMessage.status: QueueStatus.COMPLETED.value,
+                OutboxMessage.delivered_at: now,
+                OutboxMessage.error: None,
+            }):
+                cls._record(target, delivered_at=now)
+            db.session.commit()
+            delivered += 1
+        return delivered
+
+    @classmethod
+    def _fail(cls, row_id, revision, attempts, target, error):
+        logger.error(f"Giving up edit {row_id}: {error}")
+        if cls._settle(row_id, revision, {
+            OutboxMessage.status: QueueStatus.FAILED.value,
+            OutboxMessage.attempts: attempts,
+            OutboxMessage.error: error,
+        }):
+            cls._record(target, error=error)
+        db.session.commit()
+
+    @classmethod
+    def _record(cls, target, delivered_at=None, error=None):
+        """Record the delivery state on the recipe or menu of an edit"""
+        target_type, target_id = target
+        if target_type == 'recipe':
+            recipe = db.session.get(Recipe, target_id)
+            if recipe is None:
+                return
+            if error is None:
+                recipe.sync_status = 'synced'
+                recipe.last_sync = delivered_at
+            else:
+                recipe.sync_status = 'failed'
+                recipe.sync_error = error
+        elif target_type == 'menu' and error is None:
+            menu = db.session.get(Menu, target_id)
+            if menu is not None:
+                menu.last_sync = delivered_at
+
+    @classmethod
+    def init_app(cls, app):
+        """Start the dispatcher thread, unless testing"""
+        if app.config.get('TESTING'):
+            return
+        threading.Thread(
+            target=cls._work,
+            args=(app,),
+            daemon=True,
+            name='telegram-outbox'
+        ).start()
+        logger.info("Started Telegram outbox dispatcher")
+
+    @classmethod
+    def _work(cls, app):
+        while True:
+            delivered = 0
+            with app.app_context():
+                try:
+                    delivered = asyncio.run(cls.dispatch())
+                except Exception as e:
+                    logger.error(f"Telegram outbox error: {str(e)}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            if not delivered:
+                cls._wake.wait(cls.POLL_SECONDS)
+                cls._wake.clear()
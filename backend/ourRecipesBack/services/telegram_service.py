@@ -5,6 +5,9 @@ from io import BytesIO
 import asyncio
 import os
 from datetime import datetime, timezone
+from telethon.errors import MessageIdInvalidError
+from .telegram_client_manager import TelegramClientManager
+from .peer_cache import PeerCache
 
 class TelegramService:
     """Service for handling Telegram operations"""
@@ -60,7 +63,12 @@ class TelegramService:
 
     @classmethod
     async def create_client(cls):
-        """Create a new TelegramClient instance using session string"""
+        """
+        Create a new TelegramClient instance using session string
+
+        For long reads like a channel sync, which run on their own event
+        loop. Single operations use run_with_client instead.
+        """
         session_string = cls.get_session_string(current_app)
         
         if not session_string:
@@ -74,6 +82,56 @@ class TelegramService:
         )
         return client
 
+    @classmethod
+    async def run_with_client(cls, operation, channel_url=None):
+        """
+        Run operation(client, channel) with the shared, connected client
+
+        The channel peer comes from the PeerCache and is only resolved when
+        missing or expired. When Telegram rejects a cached peer, it is
+        resolved again and the operation retried once.
+
+        The operation runs on the client's own event loop without an app
+        context, so everything it needs from the config is read here.
+
+        Args:
+            channel_url (str): Channel to resolve, CHANNEL_URL by default
+
+        Returns:
+            The operation's result
+        """
+        session_string = cls.get_session_string(current_app)
+        if not session_string:
+            raise ValueError("SESSION_STRING environment variable not set")
+        channel_url = channel_url or current_app.config["CHANNEL_URL"]
+
+        async def run(client_operation):
+            return await TelegramClientManager.run(
+                client_operation,
+                session_string,
+                current_app.config["BOT_ID"],
+                current_app.config["API_HASH"]
+            )
+
+        async def resolve():
+            channel = await run(lambda client: client.get_input_entity(channel_url))
+            PeerCache.put(channel_url, channel)
+            return channel
+
+        channel = PeerCache.get(channel_url)
+        cached = channel is not None
+        if not cached:
+            channel = await resolve()
+
+        try:
+            return await run(lambda client: operation(client, channel))
+        except PeerCache.INVALID_PEER_ERRORS:
+            PeerCache.invalidate(channel_url)
+            if not cached:
+                raise
+            fresh_channel = await resolve()
+            return await run(lambda client: operation(client, fresh_channel))
+
     @classmethod
     def create_client_with_session(cls, session_name, api_id, api_hash):
         """Create a new TelegramClient instance with a custom session string"""
@@ -119,54 +177,58 @@ class TelegramService:
             if isinstance(user_id, str) and user_id.startswith('guest_'):
                 return False
                 
-            client = await cls.create_client()
-            async with client:
-                try:
-                    channel_entity = await client.get_entity(channel_url)
-                    permissions = await client.get_permissions(channel_entity, int(user_id))
-                    
-                    has_permission = permissions.is_admin and permissions.edit_messages
-                    print(f"User {user_id} {'can' if has_permission else 'cannot'} edit messages in the channel.", flush=True)
-                    return has_permission
-                except ValueError as e:
-                    print(f"Invalid user ID format: {str(e)}", flush=True)
+            async def get_permissions(client, channel):
+                return await client.get_permissions(channel, int(user_id))
+
+            try:
+                permissions = await cls.run_with_client(get_permissions, channel_url)
+
+                has_permission = permissions.is_admin and permissions.edit_messages
+                print(f"User {user_id} {'can' if has_permission else 'cannot'} edit messages in the channel.", flush=True)
+                return has_permission
+            except ValueError as e:
+                print(f"Invalid user ID format: {str(e)}", flush=True)
+                return False
+            except Exception as e:
+                if "not a member" in str(e).lower() or "no user" in str(e).lower():
+                    print(f"User {user_id} is not a member of the channel", flush=True)
                     return False
-                except Exception as e:
-                    if "not a member" in str(e).lower() or "no user" in str(e).lower():
-                        print(f"User {user_id} is not a member of the channel", flush=True)
-                        return False
-                    raise  # Re-raise other exceptions
+                raise  # Re-raise other exceptions
                     
         except Exception as e:
             print(f"Permission check error: {str(e)}", flush=True)
             return False
 
+    @staticmethod
+    def _as_file(image_data):
+        if not image_data:
+            return None
+        file = BytesIO(image_data)
+        file.name = "image.jpg"
+        return file
+
+    @classmethod
+    async def edit_message_or_raise(cls, message_id, new_text, image_data=None, channel_url=None):
+        """
+        Edit message in channel, leaving Telegram errors to the caller
+
+        For callers that handle FloodWaitError and friends themselves, like
+        the outbox dispatcher.
+        """
+        async def edit(client, channel):
+            await client.edit_message(channel, message_id, new_text, file=cls._as_file(image_data))
+
+        await cls.run_with_client(edit, channel_url)
+
     @classmethod
     async def edit_message(cls, message_id, new_text, image_data=None):
         """Edit message in channel"""
         try:
-            client = await cls.create_client()
-            async with client:
-                channel = await client.get_entity(current_app.config["CHANNEL_URL"])
-                message = await client.get_messages(channel, ids=message_id)
-                
-                if not message:
-                    return False
-                
-                if image_data:
-                    file = BytesIO(image_data)
-                    file.name = "image.jpg"
-                    await client.edit_message(
-                        channel, 
-                        message_id, 
-                        new_text,
-                        file=file
-                    )
-                else:
-                    await client.edit_message(channel, message_id, new_text)
-                    
-                return True
-                
+            await cls.edit_message_or_raise(message_id, new_text, image_data)
+            return True
+        except MessageIdInvalidError:
+            # The message does not exist (anymore)
+            return False
         except Exception as e:
             print(f"Error editing message: {str(e)}", flush=True)
             return False
@@ -174,24 +236,11 @@ class TelegramService:
     @classmethod
     async def send_message(cls, text, image_data=None):
         """Send new message to channel"""
+        async def send(client, channel):
+            return await client.send_message(channel, text, file=cls._as_file(image_data))
+
         try:
-            client = await cls.create_client()
-            async with client:
-                channel = await client.get_entity(current_app.config["CHANNEL_URL"])
-                
-                if image_data:
-                    file = BytesIO(image_data)
-                    file.name = "image.jpg"
-                    message = await client.send_message(
-                        channel,
-                        text,
-                        file=file
-                    )
-                else:
-                    message = await client.send_message(channel, text)
-                    
-                return message
-                
+            return await cls.run_with_client(send)
         except Exception as e:
             print(f"Error sending message: {str(e)}", flush=True)
             return None
@@ -199,13 +248,12 @@ class TelegramService:
     @classmethod
     async def delete_message(cls, message_id):
         """Delete message from channel"""
-        try:
-            client = await cls.create_client()
-            async with client:
-                channel = await client.get_entity(current_app.config["CHANNEL_URL"])
-                await client.delete_messages(channel, [message_id])
-                return True
+        async def delete(client, channel):
+            await client.delete_messages(channel, [message_id])
+            return True
 
+        try:
+            return await cls.run_with_client(delete)
         except Exception as e:
             print(f"Error deleting message: {str(e)}", flush=True)
             return False
@@ -213,12 +261,12 @@ class TelegramService:
     @classmethod
     async def get_message_text(cls, message_id):
         """Get text content of a message"""
+        async def get_text(client, channel):
+            message = await client.get_messages(channel, ids=message_id)
+            return message.text if message else None
+
         try:
-            client = await cls.create_client()
-            async with client:
-                channel = await client.get_entity(current_app.config["CHANNEL_URL"])
-                message = await client.get_messages(channel, ids=message_id)
-                return message.text if message else None
+            return await cls.run_with_client(get_text)
         except Exception as e:
             print(f"Error getting message text: {str(e)}", flush=True)
             return None
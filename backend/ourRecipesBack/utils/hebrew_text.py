@@ -0,0 +1,97 @@
+import re
+from typing import Iterable, List
+
+# Cantillation marks and niqqud (U+0591-U+05C7), excluding maqaf which acts as a hyphen
+_NIQQUD_RE = re.compile(r'[֑-ֽֿ-ׇ]')
+_MAQAF = '־'
+
+# Geresh/gershayim and their ASCII stand-ins inside words (צ'יפס, ק"ג)
+_INNER_QUOTES_RE = re.compile(r'(?<=\w)[\'"׳״`](?=\w)')
+
+_FINAL_LETTERS = str.maketrans('ךםןףץ', 'כמנפצ')
+
+_WORD_RE = re.compile(r'\w+')
+
+# One-letter prefixes that attach to Hebrew words: ה, ו, ב, ל, מ, ש
+PREFIX_LETTERS = 'הובלמש'
+MAX_PREFIX_LENGTH = 3
+MIN_STEM_LENGTH = 3
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize Hebrew text for matching
+
+    Removes niqqud, folds final letters to their regular form, drops
+    quote marks inside words and lowercases any Latin text.
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        str: Normalized text
+    """
+    if not text:
+        return ''
+    text = _NIQQUD_RE.sub('', text).replace(_MAQAF, ' ')
+    text = _INNER_QUOTES_RE.sub('', text)
+    return text.translate(_FINAL_LETTERS).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized word tokens, in order of appearance"""
+    return _WORD_RE.findall(normalize(text))
+
+
+def strip_prefixes(token: str) -> List[str]:
+    """
+    Get the token and its forms without attached prefixes
+
+    Prefix letters are peeled one at a time (e.g. והבשר -> הבשר -> בשר) as
+    long as a stem of at least MIN_STEM_LENGTH letters remains.
+
+    Args:
+        token (str): A normalized token
+
+    Returns:
+        list: The token followed by its prefix-stripped forms
+    """
+    forms = [token]
+    stem = token
+    for _ in range(MAX_PREFIX_LENGTH):
+        if len(stem) <= MIN_STEM_LENGTH or stem[0] not in PREFIX_LETTERS:
+            break
+        stem = stem[1:]
+        forms.append(stem)
+    return forms
+
+
+def index_terms(text: str) -> List[str]:
+    """Get the unique tokens of a text, including prefix-stripped forms"""
+    terms = []
+    seen = set()
+    for token in tokenize(text):
+        for form in strip_prefixes(token):
+            if form not in seen:
+                seen.add(form)
+                terms.append(form)
+    return terms
+
+
+def index_text(text: str) -> str:
+    """Render a text as a space separated string of index terms"""
+    return ' '.join(index_terms(text))
+
+
+def query_terms(values: Iterable[str]) -> List[List[str]]:
+    """
+    Turn user search input into term groups
+
+    Each word of the input becomes a group of alternatives (the word and
+    its prefix-stripped forms); a match needs one alternative per group.
+    """
+    groups = []
+    for value in values or []:
+        for token in tokenize(value):
+            groups.append(strip_prefixes(token))
+    return groups
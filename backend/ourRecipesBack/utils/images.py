@@ -0,0 +1,103 @@
+from typing import Callable, Optional
+from flask import Response, has_request_context, request, url_for
+from ..blob_store import blob_store
+
+# Content-addressed URLs never change content, so browsers may keep them for a year.
+# Images are served to signed in users only, never from shared caches.
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'private, no-cache'
+
+_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+
+def image_mimetype(data: bytes) -> str:
+    """Detect an image mimetype from its leading bytes, defaulting to JPEG"""
+    for signature, mimetype in _SIGNATURES:
+        if data.startswith(signature):
+            return mimetype
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/jpeg'
+
+
+def versioned_image_url(endpoint: str, image_hash: str, size: Optional[str] = None, **values) -> Optional[str]:
+    """
+    Build the URL of an image endpoint, versioned by the image hash
+
+    The hash in the query string changes whenever the image does, which lets
+    the endpoint mark responses as immutable.
+
+    Returns:
+        str | None: Absolute URL inside a request, None when URLs cannot be built
+    """
+    if size:
+        values['size'] = size
+    try:
+        if has_request_context():
+            scheme = request.headers.get('X-Forwarded-Proto', request.scheme)
+            return url_for(endpoint, v=image_hash, _external=True, _scheme=scheme, **values)
+        return url_for(endpoint, v=image_hash, **values)
+    except RuntimeError:
+        # No request and no SERVER_NAME configured
+        return None
+
+
+def image_response(image_hash: str, load_data: Callable[[str], Optional[bytes]],
+                   immutable: Optional[bool] = None) -> Optional[Response]:
+    """
+    Serve an image with a strong ETag and conditional request support
+
+    A matching If-None-Match is answered with 304 before the image is read.
+    Immutable responses may be cached for a year, others must revalidate.
+
+    Args:
+        image_hash (str): Content hash of the image
+        load_data (callable): Returns the image bytes for a hash
+        immutable (bool): Defaults to whether the request carries the hash as `v`
+
+    Returns:
+        Response | None: None when the image content is missing
+    """
+    if immutable is None:
+        immutable = request.args.get('v') == image_hash
+
+    if request.if_none_match.contains(image_hash):
+        response = Response(status=304)
+    else:
+        data = load_data(image_hash)
+        if data is None:
+            return None
+        response = Response(data, mimetype=image_mimetype(data))
+
+    response.set_etag(image_hash)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    return response
+
+
+def serve_image(image_hash: str) -> Optional[Response]:
+    """
+    Serve a stored image, or the variant picked by the `size` query parameter
+
+    Variants are WebP when the client accepts it and JPEG otherwise. While a
+    variant is still being generated the original is served uncached.
+    """
+    from ..services.image_variant_service import ImageVariantService
+
+    size = request.args.get('size')
+    immutable = request.args.get('v') == image_hash
+    served_hash = image_hash
+    if size:
+        accepts_webp = 'image/webp' in request.headers.get('Accept', '')
+        variant_hash = ImageVariantService.find(image_hash, size, accepts_webp)
+        served_hash = variant_hash or image_hash
+        immutable = immutable and variant_hash is not None
+
+    response = image_response(served_hash, blob_store.get, immutable)
+    if response is not None and size:
+        response.vary.add('Accept')
+    return response
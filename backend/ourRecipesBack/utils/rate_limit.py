@@ -0,0 +1,43 @@
+import time
+
+
+class TokenBucket:
+    """Pace calls to a rate limited service: rate per second on average, burst at once"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+
+    def _fill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token, returns the seconds to wait before using it"""
+        self._fill()
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def available_in(self):
+        """Seconds until a token can be taken without waiting"""
+        self._fill()
+        refill = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+        return max(refill, self.blocked_for())
+
+    def take(self):
+        """Take a token that is available now"""
+        self._fill()
+        self.tokens -= 1
+
+    def blocked_for(self):
+        """Seconds left of a block"""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    def block(self, seconds):
+        """Take no calls for seconds, after the service asked to slow down"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0)
@@ -0,0 +1,66 @@
+from typing import Iterable, List, Optional
+
+from ..models.enums import CourseType, DietaryType
+from .hebrew_text import index_terms, tokenize
+
+# Category keywords marking a recipe meat or dairy, anything else is pareve
+MEAT_KEYWORDS = ['בשר', 'בשרי', 'עוף', 'דגים']
+DAIRY_KEYWORDS = ['חלבי', 'גבינה', 'גבינות', 'חלב']
+
+# Category keywords of the courses a recipe fits, in order of precedence for
+# the recipe's main course type
+COURSE_KEYWORDS = {
+    CourseType.MAIN: ['בשר', 'עוף', 'דג', 'דגים', 'עיקרי', 'עיקריות', 'מנה עיקרית'],
+    CourseType.APPETIZER: ['מנה ראשונה', 'מנות ראשונות', 'פתיח', 'פתיחים'],
+    CourseType.SOUP: ['מרק', 'מרקים'],
+    CourseType.SALAD: ['סלט', 'סלטים', 'ירקות'],
+    CourseType.SIDE: ['תוספת', 'תוספות', 'אורז', 'פסטה', 'תפוחי אדמה'],
+    CourseType.DESSERT: ['קינוח', 'קינוחים', 'עוגה', 'עוגות', 'מתוק', 'מתוקים', 'עוגיות'],
+}
+
+# Bit of each course type in Recipe.course_mask
+COURSE_BITS = {course: 1 << i for i, course in enumerate(CourseType)}
+
+
+def _matches(categories: Iterable[str], keywords: List[str]) -> bool:
+    """
+    Whether any category contains a keyword
+
+    Keywords match whole words of a category name (Hebrew prefixes and final
+    letters folded), a multi-word keyword needs all of its words.
+    """
+    names = [set(index_terms(name)) for name in categories]
+    for keyword in keywords:
+        words = set(tokenize(keyword))
+        if words and any(words <= terms for terms in names):
+            return True
+    return False
+
+
+def dietary_type_of(categories: Iterable[str]) -> DietaryType:
+    """Get the dietary type of a recipe from its category names"""
+    categories = list(categories)
+    if _matches(categories, MEAT_KEYWORDS):
+        return DietaryType.MEAT
+    if _matches(categories, DAIRY_KEYWORDS):
+        return DietaryType.DAIRY
+    return DietaryType.PAREVE
+
+
+def course_types_of(categories: Iterable[str]) -> List[CourseType]:
+    """Get the course types a recipe's category names hint at, by precedence"""
+    categories = list(categories)
+    return [course for course, keywords in COURSE_KEYWORDS.items() if _matches(categories, keywords)]
+
+
+def course_mask_of(courses: Iterable[CourseType]) -> int:
+    """Combine course types into a bitmask"""
+    mask = 0
+    for course in courses:
+        mask |= COURSE_BITS[course]
+    return mask
+
+
+def courses_in_mask(mask: Optional[int]) -> List[CourseType]:
+    """Get the course types of a bitmask, by precedence"""
+    return [course for course in COURSE_KEYWORDS if (mask or 0) & COURSE_BITS[course]]
@@ -0,0 +1,82 @@
+"""
+Compare the local menu planner with the AI planner on the recipe database
+
+Usage:
+    python scripts/benchmark_menu_planner.py [--config development] [--runs 50] [--ai]
+
+The local planner is timed over --runs plans of the same preferences. With
+--ai the AI planner (GOOGLE_API_KEY required) is timed once, with and
+without the local draft, since every AI call costs quota.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Get the absolute path to the backend directory
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from ourRecipesBack import create_app  # noqa: E402
+from ourRecipesBack.services.local_menu_planner import LocalMenuPlanner  # noqa: E402
+from ourRecipesBack.services.menu_planner_service import MenuPlannerService  # noqa: E402
+from ourRecipesBack.services.recipe_catalog import RecipeCatalog  # noqa: E402
+
+PREFERENCES = {
+    'name': 'תפריט שבת',
+    'event_type': 'שבת',
+    'servings': 8,
+    'dietary_type': 'meat',
+    'meal_types': ['ארוחת ערב שבת', 'ארוחת צהריים שבת', 'סעודה שלישית'],
+    'special_requests': 'ללא אורז',
+}
+
+
+def _count_recipes(plan):
+    return sum(len(meal['recipes']) for meal in plan['meals']) if plan else 0
+
+
+def _time_ai(label, draft):
+    started = time.perf_counter()
+    try:
+        plan = MenuPlannerService._generate_ai_menu_plan(PREFERENCES, draft)
+    except ValueError as e:
+        print(f"{label}: failed after {time.perf_counter() - started:.1f} s: {e}")
+        return
+    print(f"{label}: {time.perf_counter() - started:.1f} s, {_count_recipes(plan)} recipes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='development', help='Flask config name')
+    parser.add_argument('--runs', type=int, default=50, help='Local plans to time')
+    parser.add_argument('--ai', action='store_true', help='Also time the AI planner (uses API quota)')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        catalog = RecipeCatalog.entries()
+        print(f"Catalog: {len(catalog)} recipes")
+
+        timings = []
+        plan = None
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            plan = LocalMenuPlanner.plan(PREFERENCES)
+            timings.append((time.perf_counter() - started) * 1000)
+        if plan is None:
+            print("Local planner: no complete menu for these preferences")
+        print(
+            f"Local planner: median {statistics.median(timings):.2f} ms, "
+            f"max {max(timings):.2f} ms over {args.runs} runs, {_count_recipes(plan)} recipes"
+        )
+
+        if args.ai:
+            _time_ai('AI planner', None)
+            if plan:
+                _time_ai('AI refinement of the local plan', plan)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 import pytest
 import asyncio
+from types import SimpleNamespace
+from telethon.tl.functions.channels import GetFullChannelRequest
 from ourRecipesBack import create_app
 from ourRecipesBack.extensions import db
 from ourRecipesBack.models import Recipe, RecipeVersion
+from ourRecipesBack.services.recipe_service import RecipeService
+from ourRecipesBack.services.telegram_service import telegram_service
 from flask_jwt_extended import create_access_token
 
 def pytest_configure(config):
@@ -36,7 +40,8 @@ def app():
         'SECRET_KEY': 'test-secret-key'
     }
     
-    app = create_app(test_config)
+    app = create_app("testing")
+    app.config.update(test_config)
     
     with app.app_context():
         db.create_all()
@@ -74,6 +79,117 @@ def cleanup_database(app):
 def test_client(app):
     return app.test_client()
 
+@pytest.fixture
+def add_recipe(app):
+    """Add recipes, parsing title and categories from the content when no title is given
+
+    With reindex the recipe is indexed for search as create_recipe does.
+    """
+    def add(telegram_id=1, title=None, raw_content=None, categories=None, reindex=False, **fields):
+        recipe = Recipe(telegram_id=telegram_id, raw_content=raw_content or title, title=title, **fields)
+        if title is None:
+            recipe._parse_content(recipe.raw_content)
+        if categories is not None:
+            recipe.categories = categories
+        db.session.add(recipe)
+        if reindex:
+            recipe.refresh_search_tokens()
+            RecipeService.reindex_recipe(recipe)
+        db.session.commit()
+        return recipe
+    return add
+
+class FakeChannelClient:
+    """
+    Telegram client serving a fixed channel, its update stream and photo downloads
+
+    Args:
+        messages (list): Messages of the channel
+        pts (int): Update stream position of the channel
+        differences (list): Answers to channel difference requests, in order
+        fail_after (int): Listing raises ConnectionError after this many messages
+        media_data (bytes): Bytes of every download, derived from the photo id when None
+        failing_media (set): Photo ids whose download raises ConnectionError
+    """
+
+    def __init__(self, messages=(), pts=1, differences=(), fail_after=None, media_data=None, failing_media=()):
+        self.messages = {m.id: m for m in messages}
+        self.pts = pts
+        self.differences = list(differences)
+        self.fail_after = fail_after
+        self.media_data = media_data
+        self.failing_media = set(failing_media)
+        self.listed = []  # min_id of each listing
+        self.offsets = []  # offset_id of each listing
+        self.fetched_ids = []
+        self.yielded = 0
+        self.downloads = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_entity(self, url):
+        return url
+
+    async def __call__(self, request):
+        if isinstance(request, GetFullChannelRequest):
+            return SimpleNamespace(full_chat=SimpleNamespace(pts=self.pts))
+        return self.differences.pop(0)
+
+    async def iter_messages(self, entity, min_id=0, offset_id=0, ids=None):
+        if ids is not None:
+            self.fetched_ids.extend(ids)
+            for i in ids:
+                yield self.messages.get(i)
+            return
+        self.listed.append(min_id)
+        self.offsets.append(offset_id)
+        for count, (i, message) in enumerate(sorted(self.messages.items(), reverse=True)):
+            if i <= min_id or (offset_id and i >= offset_id):
+                continue
+            if self.fail_after is not None and count >= self.fail_after:
+                raise ConnectionError("connection lost")
+            self.yielded += 1
+            yield message
+            await asyncio.sleep(0)
+
+    async def download_media(self, media, file):
+        self.downloads += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if media.photo.id in self.failing_media:
+                raise ConnectionError("download failed")
+            file.write(self.media_data or b'\xff\xd8\xff' + bytes([media.photo.id % 256]))
+        finally:
+            self.active -= 1
+
+@pytest.fixture
+def telegram_message():
+    """Build channel messages, with a photo when photo_id is given"""
+    def message(message_id, text, photo_id=None, access_hash=1):
+        media = SimpleNamespace(photo=SimpleNamespace(id=photo_id, access_hash=access_hash)) if photo_id else None
+        return SimpleNamespace(id=message_id, text=text, media=media, edit_date=None)
+    return message
+
+@pytest.fixture
+def channel_client(monkeypatch):
+    """Build a FakeChannelClient and make it the client syncs connect with"""
+    def use(messages=(), **options):
+        client = FakeChannelClient(messages, **options)
+
+        async def create_client():
+            return client
+        monkeypatch.setattr(telegram_service, 'create_client', create_client)
+        return client
+    return use
+
 @pytest.fixture
 def init_database():
     """Initialize test database with a recipe"""
@@ -0,0 +1,103 @@
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from ourRecipesBack.models import AIResult
+from ourRecipesBack.services.ai_result_cache import AIResultCache
+from ourRecipesBack.services.ai_service import AIService
+from ourRecipesBack.services.gemini_gateway import GeminiGateway
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(AIResultCache, '_memory', OrderedDict())
+    monkeypatch.setattr(AIResultCache, '_metrics', {'memory_hits': 0, 'db_hits': 0, 'misses': 0})
+    monkeypatch.setattr(AIResultCache, '_puts', 0)
+    return AIResultCache
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Fake Gemini answering with the queued texts, recording the prompts"""
+    calls = []
+    answers = []
+
+    def generate_content(contents, **kwargs):
+        calls.append(contents)
+        return SimpleNamespace(text=answers.pop(0))
+    monkeypatch.setattr(GeminiGateway, 'generate_content', generate_content)
+    return SimpleNamespace(calls=calls, answers=answers)
+
+
+OPTIMIZED = {
+    'optimized_steps': [], 'prep_ahead_steps': [],
+    'total_optimized_time': 20, 'total_sequential_time': 30, 'time_saved': 10,
+}
+
+
+class TestAIResultCache:
+    def test_repeat_reformat_spends_no_quota(self, app, cache, gemini):
+        """Test the same text, however spaced, and the formatted answer itself are served from the cache"""
+        with app.app_context():
+            gemini.answers.append('כותרת: עוגה')
+            assert AIService.reformat_recipe('עוגה  טעימה\r\nקמח') == 'כותרת: עוגה'
+            assert AIService.reformat_recipe(' עוגה טעימה\nקמח \n') == 'כותרת: עוגה'
+            assert AIService.reformat_recipe('כותרת: עוגה') == 'כותרת: עוגה'
+            assert len(gemini.calls) == 1
+            assert AIResult.query.count() == 2
+
+    def test_stored_results_survive_memory(self, app, cache, gemini):
+        """Test results are read back from the table once memory forgot them"""
+        with app.app_context():
+            gemini.answers.extend(['not json', json.dumps(OPTIMIZED), 'שקשוקה חריפה'])
+            with pytest.raises(ValueError):
+                AIService.optimize_recipe_steps('שקשוקה')
+            assert AIService.optimize_recipe_steps('שקשוקה') == OPTIMIZED
+            assert AIService.refine_recipe('שקשוקה', 'יותר חריף') == 'שקשוקה חריפה'
+
+            cache.clear_memory()
+            assert AIService.optimize_recipe_steps('שקשוקה') == OPTIMIZED
+            assert AIService.refine_recipe('שקשוקה', 'יותר חריף') == 'שקשוקה חריפה'
+            assert len(gemini.calls) == 3
+            assert cache.metrics()['db_hits'] == 2
+
+            # Another refinement of the same recipe is a new question
+            gemini.answers.append('שקשוקה עדינה')
+            assert AIService.refine_recipe('שקשוקה', 'פחות חריף') == 'שקשוקה עדינה'
+            assert len(gemini.calls) == 4
+
+    def test_least_recently_used_results_are_evicted(self, app, cache):
+        """Test the table and the memory layer keep the most recently used results"""
+        app.config['AI_CACHE_MAX_ROWS'] = 2
+        app.config['AI_CACHE_MEMORY_ENTRIES'] = 1
+        app.config['AI_CACHE_EVICT_EVERY'] = 1
+        with app.app_context():
+            first, second, third = (cache.key('reformat', 'model', 'v1', text) for text in ('a', 'b', 'c'))
+            cache.put(first, 'A')
+            cache.put(second, 'B')
+            assert list(cache._memory) == [second]
+
+            assert cache.get(first) == 'A'
+            cache.put(third, 'C')
+            cache.clear_memory()
+            assert cache.get(second) is None
+            assert (cache.get(first), cache.get(third)) == ('A', 'C')
+            assert AIResult.query.count() == 2
+
+            # Another prompt version never serves the old answer
+            assert cache.get(cache.key('reformat', 'model', 'v2', 'a')) is None
+
+    def test_rows_are_evicted_every_few_stores(self, app, cache):
+        """Test the rows are counted and evicted once every AI_CACHE_EVICT_EVERY stores"""
+        app.config['AI_CACHE_MAX_ROWS'] = 1
+        app.config['AI_CACHE_EVICT_EVERY'] = 3
+        with app.app_context():
+            for text in ('a', 'b'):
+                cache.put(cache.key('reformat', 'model', 'v1', text), text.upper())
+            assert AIResult.query.count() == 2
+
+            cache.put(cache.key('reformat', 'model', 'v1', 'c'), 'C')
+            assert AIResult.query.count() == 1
+            assert cache.get(cache.key('reformat', 'model', 'v1', 'c')) == 'C'
@@ -0,0 +1,41 @@
+import pytest
+from ourRecipesBack.blob_store import BlobStore, FileSystemBackend, content_hash
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe, RecipeVersion
+
+IMAGE = b'\xff\xd8\xff\xe0fake-jpeg-bytes'
+
+
+class TestBlobStore:
+    def test_filesystem_backend_roundtrip(self, tmp_path):
+        """Test blobs are stored once under their content hash"""
+        backend = FileSystemBackend(str(tmp_path))
+        key = content_hash(IMAGE)
+        backend.put(key, IMAGE)
+
+        assert backend.get(key) == IMAGE
+        assert (tmp_path / key[:2] / key).exists()
+        assert backend.get('0' * 64) is None
+
+    def test_recipe_keeps_only_the_hash(self, app):
+        """Test recipe and version rows share one stored image"""
+        with app.app_context():
+            recipe = Recipe(telegram_id=1, raw_content='כותרת: לחם', image_data=IMAGE)
+            db.session.add(recipe)
+            db.session.commit()
+
+            assert recipe.image_hash == content_hash(IMAGE)
+            assert recipe.image_data == IMAGE
+
+            recipe.update_content(title='לחם', raw_content='כותרת: לחם מלא')
+            version = RecipeVersion.query.filter_by(recipe_id=recipe.id).one()
+            assert version.image_hash == recipe.image_hash
+            assert version.image_data == IMAGE
+
+            recipe.image_data = None
+            assert recipe.image_hash is None
+
+    def test_uninitialized_store_raises(self):
+        """Test using the store before init_app fails loudly"""
+        with pytest.raises(RuntimeError):
+            BlobStore().put(IMAGE)
@@ -0,0 +1,81 @@
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe, Category
+from ourRecipesBack.services.recipe_service import RecipeService
+
+
+class TestCategoryIndex:
+    def test_parse_links_categories(self, app, add_recipe):
+        """Test parsed categories are linked once and re-linked on change"""
+        with app.app_context():
+            first = add_recipe(1, raw_content="כותרת: עוגה\nקטגוריות: קינוחים, עוגות")
+            add_recipe(2, raw_content="כותרת: עוגיות\nקטגוריות: קינוחים")
+
+            assert Category.query.count() == 2
+            assert sorted(c.name for c in first.category_links) == ['עוגות', 'קינוחים']
+
+            first._parse_content("כותרת: עוגה\nקטגוריות: מאפים")
+            db.session.commit()
+            assert dict(Category.with_counts()) == {'קינוחים': 1, 'מאפים': 1}
+
+    def test_categories_are_loaded_in_one_query(self, app, add_recipe):
+        """Test setting categories looks all names up at once, also for names new in the session"""
+        with app.app_context():
+            add_recipe(1, raw_content="כותרת: עוגה\nקטגוריות: קינוחים, עוגות")
+            statements = []
+
+            def count(conn, cursor, statement, *args):
+                if statement.startswith('SELECT') and 'FROM categories' in statement:
+                    statements.append(statement)
+            event.listen(db.engine, 'before_cursor_execute', count)
+            try:
+                first = Recipe(telegram_id=2, raw_content='פאי')
+                first.categories = ['קינוחים', 'עוגות', 'מאפים', 'פירות']
+                second = Recipe(telegram_id=3, raw_content='עוגיות')
+                second.categories = ['מאפים', 'קינוחים']
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', count)
+
+            assert len(statements) == 2
+            assert second.category_links[0] is first.category_links[2]
+            db.session.add_all([first, second])
+            db.session.commit()
+            assert Category.query.count() == 4
+
+    def test_endpoint_returns_counts(self, app, add_recipe):
+        """Test /api/categories keeps the name list and adds counts"""
+        with app.app_context():
+            add_recipe(1, raw_content="כותרת: עוגה\nקטגוריות: קינוחים, עוגות")
+            add_recipe(2, raw_content="כותרת: עוגיות\nקטגוריות: קינוחים")
+            token = create_access_token(identity='user')
+
+            response = app.test_client().get('/api/categories', base_url='https://localhost',
+                                             headers={'Authorization': f'Bearer {token}'})
+
+            data = response.get_json()
+            assert data['data'] == ['עוגות', 'קינוחים']
+            assert data['categories'] == [{'name': 'עוגות', 'count': 1}, {'name': 'קינוחים', 'count': 2}]
+
+    def test_search_category_filter_is_exact(self, app, add_recipe):
+        """Test category filters do not match category name substrings"""
+        with app.app_context():
+            cake = add_recipe(1, raw_content="כותרת: עוגה\nקטגוריות: עוגות")
+            add_recipe(2, raw_content="כותרת: עוגות גבינה\nקטגוריות: עוגות גבינה")
+
+            assert [r['id'] for r in RecipeService.search_recipes(categories=['עוגות'])] == [cake.id]
+
+    def test_backfill_from_category_strings(self, app):
+        """Test existing category strings are linked when the tables are empty"""
+        with app.app_context():
+            recipe = Recipe(telegram_id=1, raw_content='כותרת: מרק')
+            db.session.add(recipe)
+            db.session.flush()
+            db.session.execute(
+                Recipe.__table__.update().where(Recipe.id == recipe.id).values(_categories='מרקים,חורף')
+            )
+            db.session.commit()
+
+            assert Category.backfill() == 1
+            assert dict(Category.with_counts()) == {'מרקים': 1, 'חורף': 1}
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+from google.genai import errors
+
+from ourRecipesBack.services.gemini_gateway import GeminiBusyError, GeminiGateway
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(GeminiGateway, '_models', {})
+    monkeypatch.setattr(GeminiGateway, '_metrics', {})
+    return GeminiGateway
+
+
+def _rate_limit_error(delay):
+    return errors.ClientError(429, {'error': {
+        'code': 429,
+        'status': 'RESOURCE_EXHAUSTED',
+        'details': [{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': delay}],
+    }})
+
+
+class TestGeminiGateway:
+    def test_interactive_calls_go_first(self, app, gateway):
+        """Test an interactive call takes the next slot before an earlier bulk call"""
+        with app.app_context():
+            limit = gateway._limit('model')
+            limit.bucket.tokens = 0
+            bulk = gateway._enqueue('model', gateway.BULK)
+            interactive = gateway._enqueue('model', gateway.INTERACTIVE)
+            limit.bucket.tokens = 1
+
+            deadline = time.monotonic() + 10
+            assert gateway._next_wait('model', bulk, deadline) > 0
+            assert gateway._next_wait('model', interactive, deadline) == 0
+            assert limit.waiting == [bulk]
+
+    def test_rate_limited_call_is_retried_after_delay(self, app, gateway):
+        """Test a 429 answer blocks the model for its retry delay, then the call runs again"""
+        app.config['GEMINI_RPM'] = 600
+        with app.app_context():
+            answers = [_rate_limit_error('0.2s'), 'menu']
+
+            def operation():
+                answer = answers.pop(0)
+                if isinstance(answer, Exception):
+                    raise answer
+                return answer
+
+            started = time.monotonic()
+            assert gateway.call(operation, model='model') == 'menu'
+            assert time.monotonic() - started >= 0.2
+            stats = gateway.metrics()['priorities']['interactive']
+            assert (stats['calls'], stats['rate_limited'], stats['rejected']) == (2, 1, 0)
+
+    def test_long_retry_delay_fails_fast(self, app, gateway):
+        """Test a call answers at once when the retry delay passes its wait limit"""
+        with app.app_context():
+            def operation():
+                raise _rate_limit_error('45s')
+
+            started = time.monotonic()
+            with pytest.raises(GeminiBusyError) as busy:
+                gateway.call(operation, model='model', max_wait=5)
+            assert busy.value.retry_after == 45
+            assert time.monotonic() - started < 1
+
+            # The model stays blocked for everyone else
+            with pytest.raises(GeminiBusyError):
+                gateway.call(lambda: 'never', model='model', max_wait=1)
+
+    def test_daily_limit_rejects_calls(self, app, gateway):
+        """Test calls past the requests per day limit fail without calling Gemini"""
+        app.config['GEMINI_RPD'] = 1
+        with app.app_context():
+            assert asyncio.run(gateway.call_async(lambda: asyncio.sleep(0, 'first'), model='model')) == 'first'
+            with pytest.raises(GeminiBusyError):
+                gateway.call(lambda: 'second', model='model')
+            assert gateway.metrics()['models']['model']['used_today'] == 1
+
+    def test_busy_route_answers_429(self, app, gateway, monkeypatch):
+        """Test an AI route tells the client when to retry instead of waiting"""
+        def busy(*args, **kwargs):
+            raise GeminiBusyError('busy', 12.5)
+        monkeypatch.setattr(GeminiGateway, 'generate_content', busy)
+        with app.app_context():
+            token = create_access_token(identity='user')
+            response = app.test_client().post(
+                '/api/recipes/suggest',
+                json={'ingredients': 'עגבניות'},
+                headers={'Authorization': f'Bearer {token}'},
+                base_url='https://localhost'
+            )
+            assert response.status_code == 429
+            assert response.headers['Retry-After'] == '13'
@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ourRecipesBack.services.gemini_gateway import GeminiGateway
+from ourRecipesBack.services.genai_clients import GenAIClients
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    monkeypatch.setattr(GenAIClients, '_clients', {})
+    monkeypatch.setattr(GeminiGateway, '_models', {})
+    monkeypatch.setattr(GeminiGateway, '_metrics', {})
+    return GenAIClients
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, model, contents, config=None):
+        self.calls.append((model, contents))
+        return SimpleNamespace(text=f'answer to {contents}')
+
+
+class TestGenAIClients:
+    def test_one_client_per_api_key(self, app, clients):
+        """Test clients are created once per API key, with the configured timeout"""
+        app.config['GOOGLE_API_KEY'] = 'default-key'
+        app.config['GEMINI_TIMEOUT_SECONDS'] = 30
+        with app.app_context():
+            client = clients.get()
+            assert clients.get('default-key') is client
+            assert clients.get('other-key') is not client
+            assert client._api_client._http_options.timeout == 30000
+
+            clients.close_all()
+            assert clients._clients == {}
+            assert clients.get() is not client
+
+    def test_gateway_calls_share_the_client(self, app, clients, monkeypatch):
+        """Test sync and async generation both use the registry's pooled client"""
+        models = FakeModels()
+        requested_keys = []
+
+        def get(api_key=None):
+            requested_keys.append(api_key)
+            return SimpleNamespace(models=models)
+        monkeypatch.setattr(GenAIClients, 'get', get)
+
+        with app.app_context():
+            assert GeminiGateway.generate_content('soup').text == 'answer to soup'
+            response = asyncio.run(GeminiGateway.generate_content_async('cake', api_key='image-key'))
+            assert response.text == 'answer to cake'
+            assert models.calls == [(GeminiGateway.DEFAULT_MODEL, 'soup'), (GeminiGateway.DEFAULT_MODEL, 'cake')]
+            assert requested_keys == [None, 'image-key']
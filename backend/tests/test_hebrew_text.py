@@ -0,0 +1,66 @@
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe, RecipeToken
+from ourRecipesBack.models.enums import DietaryType
+from ourRecipesBack.services.recipe_service import RecipeService
+from ourRecipesBack.utils.hebrew_text import normalize, strip_prefixes, tokenize
+
+
+class TestHebrewText:
+    def test_normalize_strips_niqqud_and_final_letters(self):
+        """Test niqqud, final letters and geresh are folded"""
+        assert normalize('לֶחֶם') == 'לחמ'
+        assert normalize("צ'יפס") == 'ציפס'
+        assert normalize('Chocolate') == 'chocolate'
+
+    def test_strip_prefixes(self):
+        """Test prefix letters are peeled while a stem remains"""
+        assert strip_prefixes('והבשר') == ['והבשר', 'הבשר', 'בשר']
+        assert strip_prefixes('בצל') == ['בצל']
+        assert tokenize('עוגת שוקולד, מהירה!') == ['עוגת', 'שוקולד', 'מהירה']
+
+
+class TestRecipeTokens:
+    def test_tokens_follow_parsed_content(self, app, add_recipe):
+        """Test tokens are computed on parse and replaced on re-parse"""
+        with app.app_context():
+            recipe = add_recipe(1, raw_content="כותרת: עוגת שוקולד\nקטגוריות: קינוחים, חלבי", reindex=True)
+            tokens = {(t.field, t.token) for t in RecipeToken.query.all()}
+            assert ('category', 'חלבי') in tokens
+            assert ('title', 'שוקולד') in tokens
+
+            recipe._parse_content("כותרת: מרק עדשים\nקטגוריות: מרקים")
+            db.session.commit()
+            tokens = {t.token for t in RecipeToken.query.filter_by(recipe_id=recipe.id)}
+            assert 'שוקולד' not in tokens
+            assert 'עדשימ' in tokens
+
+    def test_search_matches_prefixed_and_pointed_words(self, app, add_recipe):
+        """Test search finds words written with prefixes or niqqud"""
+        with app.app_context():
+            recipe = add_recipe(1, raw_content="כותרת: תבשיל עוף\nרשימת מצרכים:\n- והבשר הטחון", reindex=True)
+
+            assert [r['id'] for r in RecipeService.search_recipes(query='בשר')] == [recipe.id]
+            assert [r['id'] for r in RecipeService.search_recipes(query='הָעוֹף')] == [recipe.id]
+
+    def test_suggestions_use_tokens(self, app, add_recipe):
+        """Test suggestions match titles and categories by word prefix"""
+        with app.app_context():
+            add_recipe(1, raw_content="כותרת: עוגת שוקולד\nקטגוריות: קינוחים", reindex=True)
+            add_recipe(2, raw_content="כותרת: מרק עוף\nקטגוריות: מרקים", reindex=True)
+
+            assert RecipeService.get_search_suggestions('שוקו') == ['עוגת שוקולד']
+            assert RecipeService.get_search_suggestions('מרקי') == ['מרקים']
+
+    def test_planner_category_filter(self, app, add_recipe):
+        """Test planner filters on types derived from category words"""
+        with app.app_context():
+            soup = add_recipe(1, raw_content="כותרת: מרק עוף\nקטגוריות: מרקים, בשרי", reindex=True)
+            cake = add_recipe(2, raw_content="כותרת: עוגה\nקטגוריות: קינוחים, חלבי", reindex=True)
+
+            soups = Recipe.query.filter(Recipe.fits_course('soup')).all()
+            dairy = Recipe.query.filter(Recipe.dietary_type == DietaryType.DAIRY).all()
+            pareve = Recipe.query.filter(Recipe.dietary_type == DietaryType.PAREVE).all()
+
+            assert soups == [soup]
+            assert dairy == [cake]
+            assert pareve == []
@@ -0,0 +1,66 @@
+from io import BytesIO
+
+import pytest
+from flask_jwt_extended import create_access_token
+from PIL import Image
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe, ImageVariant
+from ourRecipesBack.services.image_variant_service import ImageVariantService
+
+
+def _jpeg(width, height):
+    output = BytesIO()
+    Image.new('RGB', (width, height), (200, 120, 40)).save(output, format='JPEG')
+    return output.getvalue()
+
+
+@pytest.fixture
+def recipe(app):
+    with app.app_context():
+        recipe = Recipe(telegram_id=1, title='פיצה', raw_content='כותרת: פיצה', image_data=_jpeg(2000, 1000))
+        db.session.add(recipe)
+        db.session.commit()
+        yield recipe
+
+
+class TestImageVariants:
+    def test_generate_all_variants_once(self, app, recipe):
+        """Test every size and format is derived and stored once"""
+        assert ImageVariantService.generate(recipe.image_hash) == 6
+        assert ImageVariantService.generate(recipe.image_hash) == 0
+
+        thumb = ImageVariant.query.filter_by(source_hash=recipe.image_hash, size='thumb', format='webp').one()
+        assert (thumb.width, thumb.height) == (320, 160)
+
+    def test_background_generation(self, app, recipe):
+        """Test scheduled generation runs in the worker pool"""
+        future = ImageVariantService.schedule(recipe.image_hash)
+        assert future.result(timeout=30) == 6
+
+    def test_endpoint_serves_requested_size(self, app, recipe):
+        """Test ?size= picks the variant matching the Accept header"""
+        ImageVariantService.generate(recipe.image_hash)
+        client = app.test_client()
+        auth = {'Authorization': f'Bearer {create_access_token(identity="user")}'}
+        url = f'/api/recipes/{recipe.id}/image?v={recipe.image_hash}&size=thumb'
+
+        webp = client.get(url, headers={'Accept': 'image/webp,*/*', **auth}, base_url='https://localhost')
+        jpeg = client.get(url, headers={'Accept': 'image/*', **auth}, base_url='https://localhost')
+
+        assert webp.mimetype == 'image/webp'
+        assert jpeg.mimetype == 'image/jpeg'
+        assert Image.open(BytesIO(jpeg.data)).size == (320, 160)
+        assert 'immutable' in webp.headers['Cache-Control']
+        assert 'Accept' in webp.headers['Vary']
+
+    def test_original_served_until_variant_exists(self, app, recipe):
+        """Test a missing variant falls back to the original without long caching"""
+        client = app.test_client()
+        response = client.get(f'/api/recipes/{recipe.id}/image?v={recipe.image_hash}&size=medium',
+                              headers={'Authorization': f'Bearer {create_access_token(identity="user")}'},
+                              base_url='https://localhost')
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] == f'"{recipe.image_hash}"'
+        assert response.headers['Cache-Control'] == 'private, no-cache'
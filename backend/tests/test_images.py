@@ -0,0 +1,76 @@
+from flask_jwt_extended import create_access_token
+
+from ourRecipesBack.models import RecipeVersion
+
+JPEG = b'\xff\xd8\xff\xe0' + b'image-bytes' * 10
+PNG = b'\x89PNG\r\n\x1a\n' + b'png-bytes'
+
+
+def _get(app, url, headers=None):
+    token = create_access_token(identity='user')
+    return app.test_client().get(url, headers={'Authorization': f'Bearer {token}', **(headers or {})},
+                                 base_url='https://localhost')
+
+
+class TestImageEndpoint:
+    def test_json_returns_versioned_url(self, app, add_recipe):
+        """Test recipe JSON carries an image URL instead of inline data"""
+        with app.app_context():
+            recipe = add_recipe(title='לחם', image_data=JPEG)
+            with app.test_request_context(base_url='https://api.example.com'):
+                image = recipe.to_dict()['image']
+
+            assert image == f'https://api.example.com/api/recipes/{recipe.id}/image?v={recipe.image_hash}'
+
+    def test_image_is_served_immutable_with_etag(self, app, add_recipe):
+        """Test the endpoint streams bytes with a strong ETag"""
+        with app.app_context():
+            recipe = add_recipe(title='לחם', image_data=PNG)
+            response = _get(app, f'/api/recipes/{recipe.id}/image?v={recipe.image_hash}')
+
+            assert response.status_code == 200
+            assert response.data == PNG
+            assert response.mimetype == 'image/png'
+            assert response.headers['ETag'] == f'"{recipe.image_hash}"'
+            assert response.headers['Cache-Control'] == 'private, max-age=31536000, immutable'
+
+    def test_if_none_match_returns_304(self, app, add_recipe):
+        """Test a cached image is revalidated without a body"""
+        with app.app_context():
+            recipe = add_recipe(title='לחם', image_data=JPEG)
+            response = _get(app, f'/api/recipes/{recipe.id}/image',
+                            headers={'If-None-Match': f'"{recipe.image_hash}"'})
+
+            assert response.status_code == 304
+            assert response.data == b''
+            assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    def test_missing_image_returns_404(self, app, add_recipe):
+        """Test recipes without an image return 404"""
+        with app.app_context():
+            recipe = add_recipe(title='לחם', image_data=None)
+            response = _get(app, f'/api/recipes/{recipe.id}/image')
+            assert response.status_code == 404
+
+    def test_images_require_login(self, app, add_recipe):
+        """Test images of the private channel are not served without a token"""
+        with app.app_context():
+            recipe = add_recipe(title='לחם', image_data=JPEG)
+            recipe.update_content(title='לחם', raw_content='כותרת: לחם מלא', image_data=PNG)
+            version = RecipeVersion.query.filter_by(recipe_id=recipe.id).one()
+            client = app.test_client()
+
+            for url in (f'/api/recipes/{recipe.id}/image', f'/api/versions/{version.id}/image'):
+                assert client.get(url, base_url='https://localhost').status_code == 401
+
+    def test_version_image(self, app, add_recipe):
+        """Test version images are served from their own endpoint"""
+        with app.app_context():
+            recipe = add_recipe(title='לחם', image_data=JPEG)
+            recipe.update_content(title='לחם', raw_content='כותרת: לחם מלא', image_data=PNG)
+            version = RecipeVersion.query.filter_by(recipe_id=recipe.id).one()
+
+            response = _get(app, f'/api/versions/{version.id}/image')
+
+            assert response.status_code == 200
+            assert response.data == JPEG
@@ -0,0 +1,81 @@
+import asyncio
+
+from telethon.tl.types import UpdateEditChannelMessage
+from telethon.tl.types.updates import ChannelDifference, ChannelDifferenceEmpty, ChannelDifferenceTooLong
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe
+from ourRecipesBack.models.sync import SyncState
+from ourRecipesBack.routes import sync as sync_routes
+from ourRecipesBack.services.sync_service import SyncService
+
+CHANNEL = 'test_channel'
+
+
+def _run_sync(client, full=False):
+    sync_log = sync_routes._create_sync_log()
+    asyncio.run(SyncService.run(sync_log, full=full))
+    return sync_log
+
+
+class TestIncrementalSync:
+    def test_first_sync_reads_channel_and_stores_mark(self, app, channel_client, telegram_message):
+        """Test a sync without state reads everything and records the mark"""
+        app.config['CHANNEL_URL'] = CHANNEL
+        with app.app_context():
+            client = channel_client([telegram_message(1, "עוגה"), telegram_message(2, "מרק")], pts=50)
+            sync_log = _run_sync(client)
+
+            assert client.listed == [0]
+            assert sync_log.recipes_added == 2
+            state = db.session.get(SyncState, CHANNEL)
+            assert (state.last_message_id, state.pts) == (2, 50)
+
+    def test_sync_reads_only_new_and_edited_messages(self, app, channel_client, telegram_message):
+        """Test a sync with state uses min_id and the channel update stream"""
+        app.config['CHANNEL_URL'] = CHANNEL
+        with app.app_context():
+            _run_sync(channel_client([telegram_message(1, "עוגה"), telegram_message(2, "מרק")], pts=50))
+
+            edited = telegram_message(1, "עוגת שוקולד")
+            differences = [
+                ChannelDifference(final=False, pts=55, new_messages=[], chats=[], users=[],
+                                  other_updates=[UpdateEditChannelMessage(message=edited, pts=55, pts_count=1)]),
+                ChannelDifferenceEmpty(final=True, pts=56),
+            ]
+            client = channel_client([edited, telegram_message(2, "מרק"), telegram_message(3, "סלט")], pts=56,
+                                    differences=differences)
+            sync_log = _run_sync(client)
+
+            assert client.listed == [2]
+            assert client.fetched_ids == [1]
+            assert (sync_log.recipes_added, sync_log.recipes_updated) == (1, 1)
+            assert Recipe.query.filter_by(telegram_id=1).one().title == "עוגת שוקולד"
+            state = db.session.get(SyncState, CHANNEL)
+            assert (state.last_message_id, state.pts) == (3, 56)
+
+    def test_long_update_gap_falls_back_to_full_sync(self, app, channel_client, telegram_message):
+        """Test a too long update gap re-reads the whole channel"""
+        app.config['CHANNEL_URL'] = CHANNEL
+        with app.app_context():
+            _run_sync(channel_client([telegram_message(1, "עוגה")], pts=50))
+
+            too_long = ChannelDifferenceTooLong(dialog=None, messages=[], chats=[], users=[], final=True)
+            client = channel_client([telegram_message(1, "עוגה"), telegram_message(2, "מרק")], pts=900,
+                                    differences=[too_long])
+            _run_sync(client)
+
+            assert client.listed == [0]
+            assert db.session.get(SyncState, CHANNEL).pts == 900
+
+    def test_full_sync_ignores_stored_mark(self, app, channel_client, telegram_message):
+        """Test a forced full sync lists the whole channel"""
+        app.config['CHANNEL_URL'] = CHANNEL
+        with app.app_context():
+            _run_sync(channel_client([telegram_message(1, "עוגה")], pts=50))
+
+            client = channel_client([telegram_message(1, "עוגה"), telegram_message(2, "מרק")], pts=60)
+            _run_sync(client, full=True)
+
+            assert client.listed == [0]
+            assert db.session.get(SyncState, CHANNEL).last_message_id == 2
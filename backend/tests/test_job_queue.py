@@ -0,0 +1,161 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models.sync import SyncQueue
+from ourRecipesBack.services.job_queue import JobQueue
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Register job handlers for a single test"""
+    monkeypatch.setattr(JobQueue, '_handlers', dict(JobQueue._handlers))
+
+    def register(job_type, func, max_attempts=3):
+        JobQueue.handler(job_type, max_attempts=max_attempts)(func)
+    return register
+
+
+def _headers(identity='user'):
+    return {'Authorization': f'Bearer {create_access_token(identity=identity)}'}
+
+
+class TestJobQueue:
+    def test_job_result_is_polled_by_owner(self, app, handlers):
+        """Test a completed job exposes its result to the user who queued it only"""
+        handlers('double', lambda payload: {'value': payload['value'] * 2})
+        with app.app_context():
+            job = JobQueue.enqueue('double', {'value': 21}, user_id='user')
+            client = app.test_client()
+
+            response = client.get(f'/api/jobs/{job.id}', base_url='https://localhost', headers=_headers())
+            data = response.get_json()
+            assert (data['status'], data['result']) == ('pending', None)
+
+            assert JobQueue.run_next().id == job.id
+            assert JobQueue.run_next() is None
+
+            response = client.get(f'/api/jobs/{job.id}', base_url='https://localhost', headers=_headers())
+            data = response.get_json()
+            assert (data['status'], data['attempts'], data['result']) == ('completed', 1, {'value': 42})
+
+            response = client.get(f'/api/jobs/{job.id}', base_url='https://localhost', headers=_headers('other'))
+            assert response.status_code == 404
+
+    def test_async_handler(self, app, handlers):
+        """Test coroutine handlers are awaited"""
+        async def slow(payload):
+            await asyncio.sleep(0)
+            return 'done'
+        handlers('slow', slow)
+        with app.app_context():
+            job = JobQueue.enqueue('slow')
+            JobQueue.run_next()
+            assert (job.status, job.result) == ('completed', 'done')
+
+    def test_failures_are_retried_with_backoff(self, app, handlers):
+        """Test a failing job waits longer before every retry and fails when out of attempts"""
+        calls = []
+
+        def flaky(payload):
+            calls.append(1)
+            raise ConnectionError("unreachable")
+        handlers('flaky', flaky, max_attempts=3)
+        with app.app_context():
+            job = JobQueue.enqueue('flaky')
+            delays = []
+            for _ in range(2):
+                before = datetime.utcnow()
+                JobQueue.run_next()
+                assert job.status == 'pending'
+                delays.append(job.run_after - before)
+                # Not due yet
+                assert JobQueue.run_next() is None
+                job.run_after = None
+                db.session.commit()
+
+            JobQueue.run_next()
+            assert len(calls) == 3
+            assert delays[1] > delays[0] >= timedelta(seconds=JobQueue.RETRY_BACKOFF_SECONDS)
+            assert (job.status, job.attempts, job.error) == ('failed', 3, 'unreachable')
+
+    def test_value_error_is_not_retried(self, app, handlers):
+        """Test bad input fails the job on its first attempt"""
+        def invalid(payload):
+            raise ValueError("Not enough recipes")
+        handlers('invalid', invalid)
+        with app.app_context():
+            job = JobQueue.enqueue('invalid')
+            JobQueue.run_next()
+            assert (job.status, job.attempts, job.error) == ('failed', 1, 'Not enough recipes')
+
+    def test_cancel(self, app, handlers):
+        """Test a pending job is cancelled without running, a finished one is left alone"""
+        calls = []
+        handlers('noop', lambda payload: calls.append(1))
+        with app.app_context():
+            pending = JobQueue.enqueue('noop', user_id='user')
+            done = JobQueue.enqueue('noop', user_id='user')
+            client = app.test_client()
+
+            response = client.post(f'/api/jobs/{pending.id}/cancel', base_url='https://localhost', headers=_headers())
+            assert response.status_code == 202
+            assert response.get_json()['status'] == 'cancelled'
+
+            assert JobQueue.run_next().id == done.id
+            assert JobQueue.run_next() is None
+            assert len(calls) == 1
+
+            response = client.post(f'/api/jobs/{done.id}/cancel', base_url='https://localhost', headers=_headers())
+            assert response.status_code == 409
+
+    def test_cancel_running_async_job(self, app, handlers):
+        """Test cancelling a running coroutine job stops its task"""
+        async def wait_forever(payload):
+            JobQueue.cancel(JobQueue.get(payload['job_id']))
+            await asyncio.sleep(60)
+            return 'not reached'
+        handlers('wait', wait_forever)
+        with app.app_context():
+            job = JobQueue.enqueue('wait')
+            job.data = {'job_id': job.id}
+            db.session.commit()
+
+            JobQueue.run_next()
+            assert (job.status, job.result, job.cancel_requested) == ('cancelled', None, True)
+
+    def test_stale_job_is_taken_over_once(self, app, handlers):
+        """Test a running job is only claimed again once its heartbeat stops, by one worker"""
+        handlers('noop', lambda payload: None)
+        with app.app_context():
+            job = JobQueue.enqueue('noop')
+            assert JobQueue.claim_next().id == job.id
+            assert JobQueue.claim_next() is None
+
+            job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+            db.session.commit()
+            seen = (job.status, job.heartbeat_at)
+            assert SyncQueue.claim(job.id, *seen)
+            assert not SyncQueue.claim(job.id, *seen)
+            assert job.attempts == 2
+
+    def test_slow_endpoints_are_queued(self, app):
+        """Test slow endpoints answer 202 with a job of the requesting user"""
+        with app.app_context():
+            client = app.test_client()
+            requests = [
+                ('/api/recipes/bulk', {'action': 'parse', 'recipeIds': [1, 2]}, 'bulk_parse', {'recipe_ids': [1, 2]}),
+                ('/api/recipes/generate-image', {'recipeContent': 'עוגה'}, 'generate_image', {'recipe_content': 'עוגה'}),
+                ('/api/recipes/generate-infographic', {'recipeContent': 'עוגה'}, 'generate_infographic', {'recipe_content': 'עוגה'}),
+            ]
+            for url, body, job_type, payload in requests:
+                response = client.post(url, json=body, base_url='https://localhost', headers=_headers())
+                assert response.status_code == 202, url
+                job = JobQueue.get(response.get_json()['job_id'])
+                assert (job.job_type, job.data, job.user_id, job.status) == (job_type, payload, 'user', 'pending')
+
+            response = client.post('/api/recipes/generate-image', json={}, base_url='https://localhost', headers=_headers())
+            assert response.status_code == 400
@@ -0,0 +1,104 @@
+import pytest
+
+from ourRecipesBack.services.local_menu_planner import LocalMenuPlanner
+from ourRecipesBack.services.menu_planner_service import MenuPlannerService
+from ourRecipesBack.services.recipe_catalog import RecipeCatalog
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    monkeypatch.setattr(RecipeCatalog, '_entries', {})
+    monkeypatch.setattr(RecipeCatalog, '_version', None)
+    monkeypatch.setattr(RecipeCatalog, '_ready', False)
+    return RecipeCatalog
+
+
+@pytest.fixture
+def add_dish(add_recipe):
+    """Add parsed recipes with the times and servings the planner reads"""
+    def add(telegram_id, title, categories, ingredients, cooking_time=30, servings=4):
+        return add_recipe(
+            telegram_id, title, categories=categories, ingredients=ingredients, is_parsed=True,
+            cooking_time=cooking_time, preparation_time=10, servings=servings, reindex=True
+        )
+    return add
+
+
+def _courses(plan):
+    return [[(item['course_type'], item['recipe_id']) for item in meal['recipes']] for meal in plan['meals']]
+
+
+class TestLocalMenuPlanner:
+    def test_meals_get_distinct_kosher_recipes(self, app, catalog, add_dish):
+        """Test each meal gets a main and sides, without repeats or meat with dairy"""
+        with app.app_context():
+            chicken = add_dish(1, 'עוף בתנור', ['עוף'], ['1 קילו עוף', 'בצל'])
+            schnitzel = add_dish(2, 'שניצל', ['עוף'], ['חזה עוף', 'פירורי לחם'])
+            beef = add_dish(3, 'צלי בקר', ['בשר'], ['2 קג בשר בקר', 'יין'])
+            salad = add_dish(4, 'סלט ירקות', ['סלטים'], ['מלפפון', 'עגבניה'])
+            add_dish(5, 'פשטידת גבינה', ['תוספות', 'חלבי'], ['גבינה', 'ביצים'])
+            rice = add_dish(6, 'אורז לבן', ['תוספות'], ['אורז', 'מים'])
+
+            plan = LocalMenuPlanner.plan({'meal_types': ['ערב', 'צהריים'], 'servings': 4})
+            assert _courses(plan) == [
+                [('main', chicken.id), ('salad', salad.id), ('side', rice.id)],
+                # Schnitzel's main ingredient is the chicken of the first meal too
+                [('main', beef.id)],
+            ]
+            assert plan == LocalMenuPlanner.plan({'meal_types': ['ערב', 'צהריים'], 'servings': 4})
+            assert schnitzel.id not in {item['recipe_id'] for meal in plan['meals'] for item in meal['recipes']}
+
+    def test_constraints_narrow_the_choice(self, app, catalog, add_dish):
+        """Test dietary type, exclusions, time limits and servings steer the choice"""
+        with app.app_context():
+            quick = add_dish(1, 'פסטה ברוטב', ['עיקריות', 'חלבי'], ['פסטה', 'שמנת'], cooking_time=20)
+            slow = add_dish(2, 'לזניה', ['עיקריות', 'חלבי'], ['דפי לזניה', 'גבינה'], cooking_time=90, servings=10)
+            rice = add_dish(3, 'אורז מוקפץ', ['עיקריות'], ['אורז', 'ירקות'])
+
+            def main_of(**preferences):
+                plan = LocalMenuPlanner.plan({'meal_types': ['ערב'], **preferences})
+                return plan and plan['meals'][0]['recipes'][0]['recipe_id']
+
+            assert main_of(servings=10) == slow.id
+            assert main_of(servings=10, max_cooking_time=60) == quick.id
+            assert main_of(meal_time_budget=35) == quick.id
+            assert main_of(meal_time_budget=25) is None
+            assert main_of(dietary_type='pareve') == rice.id
+            assert main_of(dietary_type='pareve', special_requests='ללא אורז') is None
+            assert main_of(exclude_recipe_ids=[quick.id, rice.id]) == slow.id
+
+    def test_preview_uses_local_plan_without_ai(self, app, catalog, monkeypatch, add_dish):
+        """Test the preview answers from the local planner and falls back to the AI"""
+        def no_ai(preferences, draft=None):
+            raise AssertionError('AI called')
+        monkeypatch.setattr(MenuPlannerService, '_generate_ai_menu_plan', no_ai)
+        with app.app_context():
+            chicken = add_dish(1, 'עוף בתנור', ['עוף'], ['עוף'])
+
+            preview = MenuPlannerService.generate_menu_preview({'meal_types': ['ערב']})
+            assert preview['meals'][0]['recipes'][0]['recipe']['title'] == chicken.title
+
+            calls = []
+            monkeypatch.setattr(
+                MenuPlannerService, '_generate_ai_menu_plan',
+                lambda preferences, draft=None: calls.append(draft) or {'meals': []}
+            )
+            MenuPlannerService.generate_menu_preview({'meal_types': ['ערב'], 'refine_with_ai': True})
+            MenuPlannerService.generate_menu_preview({'meal_types': ['ערב'], 'dietary_type': 'dairy'})
+            assert calls[0]['meals'][0]['recipes'][0]['recipe_id'] == chicken.id
+            assert calls[1] is None
+
+    def test_exclusions_take_the_first_word(self, app, catalog, add_dish):
+        """Test words after the excluded ingredient and its prefixes do not stop the exclusion"""
+        with app.app_context():
+            nuts = add_dish(1, 'עוף עם אגוזים', ['עוף'], ['עוף', 'אגוזים'])
+            peanuts = add_dish(2, 'אטריות בוטנים', ['עיקריות'], ['אטריות', 'בוטנים'])
+            bread = add_dish(3, 'פשטידת קמח', ['עיקריות'], ['קמח', 'גלוטן'])
+
+            def excluded(special_requests):
+                return LocalMenuPlanner._recipes_with_excluded_ingredients(special_requests)
+
+            assert excluded('ללא אגוזים בבקשה') == {nuts.id}
+            assert excluded('מנה ללא גלוטן לילדים') == {bread.id}
+            assert excluded('בלי הבוטנים, וללא אגוזים') == {peanuts.id, nuts.id}
+            assert excluded('עם הרבה תבלינים') == set()
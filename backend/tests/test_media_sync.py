@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe
+from ourRecipesBack.routes.sync import _create_sync_log
+from ourRecipesBack.services.image_variant_service import ImageVariantService
+from ourRecipesBack.services.recipe_service import RecipeService
+
+
+def _sync(client, *messages):
+    sync_log = _create_sync_log()
+
+    async def run():
+        await asyncio.gather(*[RecipeService.sync_message(client, m, sync_log) for m in messages])
+
+    asyncio.run(run())
+    db.session.commit()
+    return sync_log
+
+
+@pytest.fixture(autouse=True)
+def no_variant_workers(monkeypatch):
+    # Worker threads share the in-memory test connection and would roll it back
+    monkeypatch.setattr(ImageVariantService, 'schedule', lambda source_hash: None)
+
+
+class TestMediaSync:
+    def test_unchanged_photo_is_not_downloaded_again(self, app, channel_client, telegram_message):
+        """Test a resync skips the download when the photo id matches"""
+        with app.app_context():
+            client = channel_client()
+            _sync(client, telegram_message(1, "עוגה", photo_id=100))
+            recipe = Recipe.query.filter_by(telegram_id=1).one()
+            assert (recipe.telegram_media_id, recipe.telegram_media_access_hash) == (100, 1)
+            image_hash = recipe.image_hash
+
+            _sync(client, telegram_message(1, "עוגה טעימה", photo_id=100))
+
+            assert client.downloads == 1
+            recipe = Recipe.query.filter_by(telegram_id=1).one()
+            assert recipe.title == "עוגה טעימה"
+            assert recipe.image_hash == image_hash
+
+    def test_changed_photo_is_downloaded(self, app, channel_client, telegram_message):
+        """Test a new photo id triggers a download and replaces the image"""
+        with app.app_context():
+            _sync(channel_client(), telegram_message(1, "עוגה", photo_id=100))
+
+            client = channel_client(media_data=b'\x89PNG\r\n\x1a\n new image')
+            _sync(client, telegram_message(1, "עוגה", photo_id=200))
+
+            assert client.downloads == 1
+            recipe = Recipe.query.filter_by(telegram_id=1).one()
+            assert recipe.telegram_media_id == 200
+            assert recipe.image_data == b'\x89PNG\r\n\x1a\n new image'
+
+    def test_app_image_change_forgets_telegram_media(self, app, channel_client, telegram_message):
+        """Test setting an image from the app forces the next sync to download"""
+        with app.app_context():
+            _sync(channel_client(), telegram_message(1, "עוגה", photo_id=100))
+            recipe = Recipe.query.filter_by(telegram_id=1).one()
+            recipe.set_image(image_data=b'uploaded')
+            db.session.commit()
+
+            client = channel_client()
+            _sync(client, telegram_message(1, "עוגה", photo_id=100))
+            assert client.downloads == 1
+
+    def test_downloads_are_bounded(self, app, monkeypatch, channel_client, telegram_message):
+        """Test concurrent downloads stay under MEDIA_DOWNLOAD_CONCURRENCY"""
+        monkeypatch.setattr(RecipeService, 'MEDIA_DOWNLOAD_CONCURRENCY', 2)
+        with app.app_context():
+            client = channel_client()
+            _sync(client, *[telegram_message(i, f"מתכון {i}", photo_id=i) for i in range(1, 9)])
+
+            assert client.downloads == 8
+            assert client.max_active == 2
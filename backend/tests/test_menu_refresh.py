@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from flask_jwt_extended import create_access_token
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import MealRecipe, Menu, MenuMeal, OutboxMessage, Recipe
+from ourRecipesBack.models.sync import SyncQueue
+from ourRecipesBack.services.job_queue import JobQueue
+from ourRecipesBack.services.menu_service import MenuService
+
+
+def _add_menu(name, recipes, telegram_message_id=None):
+    menu = Menu(user_id='user', name=name, telegram_message_id=telegram_message_id)
+    meal = MenuMeal(meal_type='ארוחת ערב', meal_order=1)
+    meal.recipes = [MealRecipe(recipe_id=recipe.id, course_order=i) for i, recipe in enumerate(recipes)]
+    menu.meals = [meal]
+    db.session.add(menu)
+    db.session.commit()
+    return menu
+
+
+def _update_recipe(app, text):
+    token = create_access_token(identity='user')
+    return app.test_client().put(
+        '/api/recipes/update/10',
+        json={'newText': text},
+        headers={'Authorization': f'Bearer {token}'},
+        base_url='https://localhost'
+    )
+
+
+class TestMenuRefresh:
+    def test_recipe_edits_share_one_delayed_refresh(self, app):
+        """Test repeated edits of a recipe schedule a single refresh of its menus, after a delay"""
+        with app.app_context():
+            recipe = Recipe(telegram_id=10, title='עוגה', raw_content='עוגה')
+            db.session.add(recipe)
+            db.session.commit()
+
+            assert _update_recipe(app, 'עוגה\nגרסה 1').status_code == 200
+            assert _update_recipe(app, 'עוגה\nגרסה 2').status_code == 200
+
+            job = JobQueue.pending('refresh_menus', recipe.id)
+            assert job.data == {'recipe_id': recipe.id}
+            assert job.run_after > datetime.utcnow()
+            assert SyncQueue.query.filter_by(job_type='refresh_menus').count() == 1
+            # Not due yet
+            assert JobQueue.run_next() is None
+
+    def test_refresh_queues_edits_of_affected_menus(self, app):
+        """Test the refresh renders only synced menus containing the recipe, with its new title"""
+        with app.app_context():
+            cake = Recipe(telegram_id=10, title='עוגה', raw_content='עוגה')
+            soup = Recipe(telegram_id=11, title='מרק', raw_content='מרק')
+            db.session.add_all([cake, soup])
+            db.session.commit()
+            first = _add_menu('שבת', [cake, soup], telegram_message_id=100)
+            second = _add_menu('חג', [cake], telegram_message_id=101)
+            _add_menu('טיוטה', [cake])
+            _add_menu('ערב', [soup], telegram_message_id=102)
+
+            cake.title = 'עוגת שוקולד'
+            db.session.commit()
+            assert MenuService.update_menus_with_recipe(cake.id) == 2
+
+            edits = {row.message_id: row for row in OutboxMessage.query.all()}
+            assert set(edits) == {100, 101}
+            assert 'עוגת שוקולד' in edits[100].text and 'מרק' in edits[100].text
+            assert {(row.target_type, row.target_id) for row in edits.values()} == {
+                ('menu', first.id), ('menu', second.id)
+            }
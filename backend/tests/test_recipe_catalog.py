@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models.enums import RecipeStatus
+from ourRecipesBack.services.recipe_catalog import RecipeCatalog
+from ourRecipesBack.services.recipe_service import RecipeService
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    monkeypatch.setattr(RecipeCatalog, '_entries', {})
+    monkeypatch.setattr(RecipeCatalog, '_version', None)
+    monkeypatch.setattr(RecipeCatalog, '_ready', False)
+    return RecipeCatalog
+
+
+class TestRecipeCatalog:
+    def test_entries_carry_derived_metadata(self, app, catalog, add_recipe):
+        """Test entries hold dietary type, course hints and an ingredient preview"""
+        with app.app_context():
+            chicken = add_recipe(1, 'עוף בתנור', categories='עוף,עיקריות', is_parsed=True, cooking_time=90)
+            chicken._ingredients = 'עוף||בצל||שום||פפריקה'
+            add_recipe(2, 'סלט ירקות', categories='סלטים', is_parsed=True)
+            add_recipe(3, 'טיוטה', categories='עוגות', is_parsed=True, status=RecipeStatus.ARCHIVED.value)
+            db.session.commit()
+
+            entries = {entry['id']: entry for entry in catalog.entries()}
+            assert set(entries) == {chicken.id, chicken.id + 1}
+            assert entries[chicken.id]['dietary_type'] == 'meat'
+            assert entries[chicken.id]['course_hints'] == ['main']
+            assert entries[chicken.id]['ingredients_preview'] == 'עוף, בצל, שום (+1)'
+            assert entries[chicken.id + 1]['dietary_type'] == 'pareve'
+            assert catalog.count() == 2
+
+    def test_changes_of_other_processes_are_picked_up(self, app, catalog, add_recipe):
+        """Test a read reloads rows changed behind the snapshot's back, and rebuilds after deletes"""
+        with app.app_context():
+            cake = add_recipe(1, 'עוגה', categories='עוגות', is_parsed=True, created_at=datetime(2024, 1, 1))
+            soup = add_recipe(2, 'מרק', categories='מרקים', is_parsed=True, created_at=datetime(2024, 1, 1))
+            assert catalog.count() == 2
+
+            cake.categories = 'עוגות,חלבי'
+            cake.updated_at = datetime(2024, 1, 2)
+            add_recipe(3, 'פשטידה', categories='חלבי', is_parsed=True, created_at=datetime(2024, 1, 1))
+            entries = {entry['id']: entry for entry in catalog.entries()}
+            assert entries[cake.id]['dietary_type'] == 'dairy'
+            assert len(entries) == 3
+
+            db.session.delete(soup)
+            db.session.commit()
+            assert soup.id not in {entry['id'] for entry in catalog.entries()}
+
+    def test_reindex_updates_entry(self, app, catalog, add_recipe):
+        """Test a recipe leaving the catalog through its own process is dropped at once"""
+        with app.app_context():
+            cake = add_recipe(1, 'עוגה', categories='עוגות', is_parsed=True)
+            assert catalog.count() == 1
+            cake.status = RecipeStatus.ARCHIVED.value
+            RecipeService.reindex_recipe(cake)
+            db.session.commit()
+            with catalog._lock:
+                assert catalog._entries == {}
+
+    def test_preview_precheck_counts_catalog(self, app, catalog, add_recipe):
+        """Test menu preview is refused while fewer than 5 recipes can be planned"""
+        with app.app_context():
+            for i in range(4):
+                add_recipe(i + 1, f'מתכון {i}', categories='עוגות', is_parsed=True)
+            token = create_access_token(identity='user')
+            response = app.test_client().post(
+                '/api/menus/generate-preview',
+                json={'name': 'שבת', 'meal_types': ['ארוחת ערב']},
+                headers={'Authorization': f'Bearer {token}'},
+                base_url='https://localhost'
+            )
+            assert response.status_code == 400
+            assert response.get_json()['error'] == 'Not enough recipes'
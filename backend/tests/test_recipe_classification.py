@@ -0,0 +1,58 @@
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import MenuMeal, Menu, Recipe
+from ourRecipesBack.models.enums import CourseType, DietaryType
+from ourRecipesBack.services.menu_planner_service import MenuPlannerService
+
+
+class TestRecipeClassification:
+    def test_categories_set_dietary_and_course_types(self, app, add_recipe):
+        """Test setting categories stores the derived dietary type and courses"""
+        with app.app_context():
+            chicken = add_recipe(1, 'עוף בתנור', categories=['עוף', 'עיקריות', 'תוספות'], is_parsed=True)
+            assert chicken.dietary_type == DietaryType.MEAT
+            assert chicken.course_type == CourseType.MAIN
+            assert chicken.course_types == [CourseType.MAIN, CourseType.SIDE]
+
+            # Whole words with prefixes folded, not substrings
+            quiche = add_recipe(2, 'קיש', categories=['מאפים חלביים', 'לגבינות'], is_parsed=True)
+            assert quiche.dietary_type == DietaryType.DAIRY
+            assert quiche.course_type is None
+
+            quiche.categories = ['עוגות']
+            assert quiche.dietary_type == DietaryType.PAREVE
+            assert quiche.course_types == [CourseType.DESSERT]
+
+    def test_parsed_recipe_is_classified(self, app):
+        """Test recipes are classified when their content is parsed"""
+        with app.app_context():
+            recipe = Recipe(
+                telegram_id=3,
+                raw_content="כותרת: מרק עוף\nקטגוריות: מרקים, בשרי\nמצרכים:\n- עוף\nהוראות הכנה:\n1. לבשל"
+            )
+            recipe._parse_content(recipe.raw_content)
+            assert recipe.dietary_type == DietaryType.MEAT
+            assert recipe.course_type == CourseType.SOUP
+
+    def test_planner_filters_by_stored_columns(self, app, add_recipe):
+        """Test search and replacement suggestions filter on the stored types"""
+        with app.app_context():
+            soup = add_recipe(1, 'מרק עוף', categories=['מרקים', 'בשרי'], is_parsed=True)
+            veggie_soup = add_recipe(2, 'מרק ירקות', categories=['מרקים'], is_parsed=True)
+            add_recipe(3, 'עוגת גבינה', categories=['עוגות', 'חלבי'], is_parsed=True)
+
+            found = MenuPlannerService._execute_search_recipes(dietary_type='pareve', course_type='soup')
+            assert [recipe['id'] for recipe in found] == [veggie_soup.id]
+            found = MenuPlannerService._execute_search_recipes(course_type='soup')
+            assert {recipe['id'] for recipe in found} == {soup.id, veggie_soup.id}
+
+            menu = Menu(user_id='user', name='שבת', dietary_type=DietaryType.MEAT)
+            meal = MenuMeal(meal_type='ארוחת ערב', meal_order=1)
+            menu.meals = [meal]
+            db.session.add(menu)
+            db.session.commit()
+            suggestions = MenuPlannerService.suggest_recipe_replacement(meal.id, veggie_soup.id, 'soup')
+            assert [recipe['id'] for recipe in suggestions] == [soup.id]
+
+            details = MenuPlannerService._execute_get_recipes_details_batch([soup.id])
+            assert details[0]['dietary_type'] == 'meat'
+            assert details[0]['course_hints'] == ['soup']
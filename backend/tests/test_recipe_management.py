@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe
+from ourRecipesBack.services.recipe_service import RecipeService
+
+
+def _add_recipes(count):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        recipe = Recipe(telegram_id=i + 1, title=f'מתכון {i}', raw_content=f'כותרת: מתכון {i}')
+        # Pairs of recipes share a timestamp to exercise the id tie-breaker
+        recipe.created_at = start + timedelta(minutes=i // 2)
+        recipe.is_parsed = i % 3 == 0
+        db.session.add(recipe)
+    db.session.commit()
+
+
+class TestRecipeManagement:
+    def test_keyset_pages_cover_all_recipes(self, app):
+        """Test cursors walk every recipe exactly once, newest first"""
+        with app.app_context():
+            _add_recipes(7)
+
+            seen = []
+            cursor = None
+            while True:
+                page = RecipeService.get_recipes_page(limit=3, cursor=cursor, fields=['id', 'title'])
+                seen.extend(row['id'] for row in page['data'])
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
+
+            expected = [r.id for r in Recipe.query.order_by(Recipe.created_at.desc(), Recipe.id.desc())]
+            assert seen == expected
+            assert page['counts'] == {'total': 7, 'parsed': 3, 'unparsed': 4}
+
+    def test_projection_returns_only_requested_fields(self, app):
+        """Test fields= limits the row keys"""
+        with app.app_context():
+            _add_recipes(2)
+            page = RecipeService.get_recipes_page(fields=['id', 'title', 'categories', 'thumbnail'])
+            assert set(page['data'][0]) == {'id', 'title', 'categories', 'thumbnail'}
+
+    def test_endpoint_keeps_legacy_list_and_validates(self, app):
+        """Test the endpoint returns the old list without paging parameters"""
+        with app.app_context():
+            _add_recipes(2)
+            token = create_access_token(identity='user')
+            client = app.test_client()
+            headers = {'Authorization': f'Bearer {token}'}
+
+            legacy = client.get('/api/recipes/manage', headers=headers, base_url='https://localhost')
+            paged = client.get('/api/recipes/manage?limit=1&fields=id,title', headers=headers,
+                               base_url='https://localhost')
+            invalid = client.get('/api/recipes/manage?fields=secret', headers=headers,
+                                 base_url='https://localhost')
+
+            assert isinstance(legacy.get_json(), list) and len(legacy.get_json()) == 2
+            assert 'raw_content' in legacy.get_json()[0]
+            assert paged.get_json()['data'] == [{'id': legacy.get_json()[0]['id'], 'title': legacy.get_json()[0]['title']}]
+            assert paged.get_json()['next_cursor']
+            assert invalid.status_code == 400
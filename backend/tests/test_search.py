@@ -0,0 +1,55 @@
+from ourRecipesBack.extensions import db
+from ourRecipesBack.services.recipe_service import RecipeService
+from ourRecipesBack.services.search_index_service import SearchIndexService
+
+
+class TestSearchIndex:
+    def test_index_is_available(self, app):
+        """Test the full-text index is created with the schema"""
+        with app.app_context():
+            assert SearchIndexService.is_available()
+
+    def test_search_ranks_title_matches_first(self, app, add_recipe):
+        """Test relevance ranking prefers title matches"""
+        with app.app_context():
+            body_match = add_recipe(1, "Vanilla Cake", "Vanilla cake with a chocolate glaze", reindex=True)
+            title_match = add_recipe(2, "Chocolate Cake", "Rich cake", reindex=True)
+            add_recipe(3, "Lentil Soup", "Lentils and carrots", reindex=True)
+
+            results = RecipeService.search_recipes(query="chocolate")
+
+            assert [r['id'] for r in results] == [title_match.id, body_match.id]
+            assert results[0]['score'] > results[1]['score']
+
+    def test_search_include_and_exclude_terms(self, app, add_recipe):
+        """Test include/exclude terms are applied through the index"""
+        with app.app_context():
+            with_nuts = add_recipe(1, "Brownies", "Chocolate, walnuts and butter", reindex=True)
+            without_nuts = add_recipe(2, "Truffles", "Chocolate and cream", reindex=True)
+
+            included = RecipeService.search_recipes(include_terms=["walnuts"])
+            excluded = RecipeService.search_recipes(query="chocolate", exclude_terms=["walnuts"])
+
+            assert [r['id'] for r in included] == [with_nuts.id]
+            assert [r['id'] for r in excluded] == [without_nuts.id]
+
+    def test_exclude_terms_match_whole_words(self, app, add_recipe):
+        """Test an exclude term does not drop recipes with longer words starting with it"""
+        with app.app_context():
+            add_recipe(1, "Pesto", "Basil, pine nut and oil", reindex=True)
+            nutmeg = add_recipe(2, "Custard", "Milk, eggs and nutmeg", reindex=True)
+
+            results = RecipeService.search_recipes(exclude_terms=["nut"])
+
+            assert [r['id'] for r in results] == [nutmeg.id]
+
+    def test_reindex_after_update(self, app, add_recipe):
+        """Test the index follows content changes"""
+        with app.app_context():
+            recipe = add_recipe(1, "Salad", "Tomato and cucumber", reindex=True)
+            recipe.raw_content = "Beetroot and apple"
+            RecipeService.reindex_recipe(recipe)
+            db.session.commit()
+
+            assert RecipeService.search_recipes(query="tomato") == []
+            assert [r['id'] for r in RecipeService.search_recipes(query="beetroot")] == [recipe.id]
@@ -0,0 +1,77 @@
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Menu, MenuMeal, MealRecipe, Recipe
+from ourRecipesBack.services.recipe_service import RecipeService
+from ourRecipesBack.services.suggestion_index import SuggestionIndex
+
+
+class TestSuggestionIndex:
+    def test_prefix_of_any_word(self, app, add_recipe):
+        """Test suggestions match the start of any word, ignoring prefixes"""
+        with app.app_context():
+            add_recipe(1, 'עוגת שוקולד', categories=['קינוחים'], reindex=True)
+            add_recipe(2, 'מרק עוף', categories=['מרקים'], reindex=True)
+
+            assert SuggestionIndex.suggest('שוקו') == ['עוגת שוקולד']
+            assert SuggestionIndex.suggest('העוף') == ['מרק עוף']
+            assert SuggestionIndex.suggest('מרק') == ['מרקים', 'מרק עוף']
+            assert RecipeService.get_search_suggestions('קינ') == ['קינוחים']
+
+    def test_incremental_update(self, app, add_recipe):
+        """Test renamed recipes replace their old suggestions"""
+        with app.app_context():
+            recipe = add_recipe(1, 'פשטידת ברוקולי', categories=['פשטידות'], reindex=True)
+            recipe.title = 'פשטידת תרד'
+            recipe.categories = ['מאפים']
+            RecipeService.reindex_recipe(recipe)
+            db.session.commit()
+
+            assert SuggestionIndex.suggest('ברוק') == []
+            assert SuggestionIndex.suggest('פשטיד') == ['פשטידת תרד']
+            assert SuggestionIndex.suggest('מאפ') == ['מאפים']
+
+    def test_rolled_back_changes_stay_out(self, app, add_recipe):
+        """Test the index only takes committed changes, also past a rolled back savepoint"""
+        with app.app_context():
+            recipe = add_recipe(1, 'פשטידת ברוקולי', reindex=True)
+            recipe.title = 'פשטידת תרד'
+            RecipeService.reindex_recipe(recipe)
+            assert SuggestionIndex.suggest('פשטיד') == ['פשטידת ברוקולי']
+            db.session.rollback()
+            assert SuggestionIndex.suggest('פשטיד') == ['פשטידת ברוקולי']
+
+            try:
+                with db.session.begin_nested():
+                    recipe.title = 'פשטידת תרד'
+                    RecipeService.reindex_recipe(recipe)
+                    cake = Recipe(telegram_id=2, title='עוגת גבינה', raw_content='עוגת גבינה')
+                    db.session.add(cake)
+                    RecipeService.reindex_recipe(cake)
+                    raise ValueError('unparsable recipe')
+            except ValueError:
+                pass
+            soup = Recipe(telegram_id=3, title='מרק עוף', raw_content='מרק עוף')
+            db.session.add(soup)
+            RecipeService.reindex_recipe(soup)
+            db.session.commit()
+
+            assert SuggestionIndex.suggest('פשטיד') == ['פשטידת ברוקולי']
+            assert SuggestionIndex.suggest('עוג') == []
+            assert SuggestionIndex.suggest('מרק') == ['מרק עוף']
+
+    def test_popular_recipes_rank_first(self, app, add_recipe):
+        """Test titles used in menus outrank others after a rebuild"""
+        with app.app_context():
+            add_recipe(1, 'סלט ירקות', reindex=True)
+            popular = add_recipe(2, 'סלט טונה', reindex=True)
+            menu = Menu(name='שבת', user_id='user')
+            db.session.add(menu)
+            db.session.flush()
+            meal = MenuMeal(menu_id=menu.id, meal_type='ארוחת ערב', meal_order=0)
+            db.session.add(meal)
+            db.session.flush()
+            db.session.add(MealRecipe(menu_meal_id=meal.id, recipe_id=popular.id))
+            db.session.commit()
+
+            SuggestionIndex.build()
+
+            assert SuggestionIndex.suggest('סלט') == ['סלט טונה', 'סלט ירקות']
@@ -0,0 +1,113 @@
+import asyncio
+
+from sqlalchemy import event
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Menu, Recipe
+from ourRecipesBack.models.place import Place
+from ourRecipesBack.routes.sync import _create_sync_log
+from ourRecipesBack.services.menu_service import MenuService
+from ourRecipesBack.services.sync_service import SyncService
+
+
+def _place_text(name):
+    return f"🏠 המלצה\nשם: {name}\nנוסף על ידי: דנה"
+
+
+class _SelectCounter:
+    def __init__(self, table):
+        self.table = table
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and f'FROM {self.table}' in statement:
+            self.count += 1
+
+
+def _count_selects(table, func):
+    counter = _SelectCounter(table)
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        func()
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+    return counter.count
+
+
+class TestSyncBatching:
+    def test_chunk_loads_existing_recipes_once(self, app, telegram_message):
+        """Test a chunk looks up its existing recipes with a single query"""
+        with app.app_context():
+            sync_log = _create_sync_log()
+            chunk = [('recipe', telegram_message(i, f"מתכון {i}"), None, None) for i in range(1, 6)]
+            SyncService._write_batch(chunk, sync_log)
+            db.session.commit()
+
+            updated = [('recipe', telegram_message(i, f"מתכון מעודכן {i}"), None, None) for i in range(1, 6)]
+            selects = _count_selects('recipes', lambda: SyncService._write_batch(updated, sync_log))
+
+            assert selects == 1
+            assert sync_log.recipes_updated == 5
+            assert Recipe.query.filter_by(telegram_id=3).one().title == "מתכון מעודכן 3"
+
+    def test_places_are_inserted_once(self, app, telegram_message):
+        """Test places are bulk inserted and a resync does not duplicate them"""
+        with app.app_context():
+            sync_log = _create_sync_log()
+            chunk = [('place', telegram_message(1, _place_text("קפה")), None, None),
+                     ('place', telegram_message(2, _place_text("פיצה")), None, None)]
+            SyncService._write_batch(chunk, sync_log)
+            SyncService._write_batch(chunk, sync_log)
+            db.session.commit()
+
+            assert sorted(p.name for p in Place.query) == ["פיצה", "קפה"]
+            assert all(p.is_synced for p in Place.query)
+            assert sync_log.places_processed == 2
+
+    def test_insert_synced_skips_conflicts(self, app):
+        """Test insert_synced ignores rows of messages that already have a place"""
+        with app.app_context():
+            Place.insert_synced([{'name': 'קפה', 'created_by': 'דנה', 'telegram_message_id': 1}])
+            inserted = Place.insert_synced([
+                {'name': 'קפה שני', 'created_by': 'דנה', 'telegram_message_id': 1},
+                {'name': 'פיצה', 'created_by': 'דנה', 'telegram_message_id': 2},
+            ])
+            db.session.commit()
+
+            assert inserted == 1
+            assert Place.query.filter_by(telegram_message_id=1).one().name == 'קפה'
+
+    def test_menu_prefetch_resolves_recipes(self, app, telegram_message):
+        """Test menus find their recipes and existing rows through the prefetch"""
+        with app.app_context():
+            cake = Recipe(telegram_id=10, title="עוגה", raw_content="עוגה")
+            soup = Recipe(telegram_id=11, title="מרק", raw_content="מרק")
+            db.session.add_all([cake, soup])
+            db.session.commit()
+            menu = Menu(user_id='u', name='ישן', telegram_message_id=5)
+            db.session.add(menu)
+            db.session.commit()
+
+            sync_log = _create_sync_log()
+            messages = [
+                telegram_message(5, "🍽️ תפריט\nשם: חדש"),
+                telegram_message(7, f"🍽️ תפריט\nשם: שישי\n1. ערב\n• [ID:{cake.id}] עוגה\n• מרק"),
+                telegram_message(8, "מתכון"),
+            ]
+            prefetched = MenuService.prefetch_for_sync(messages)
+
+            assert sorted(prefetched['parsed']) == [5, 7]
+            assert prefetched['menus'][5].id == menu.id
+            assert set(prefetched['recipes_by_title']) == {"עוגה", "מרק"}
+
+            def sync():
+                for message in messages[:2]:
+                    asyncio.run(MenuService.sync_message(None, message, sync_log, prefetched=prefetched))
+
+            assert _count_selects('recipes', sync) == 0
+            db.session.commit()
+            assert (sync_log.menus_updated, sync_log.menus_added) == (1, 1)
+            assert db.session.get(Menu, menu.id).name == 'חדש'
+            new_menu = Menu.query.filter_by(telegram_message_id=7).one()
+            assert sorted(r.recipe_id for meal in new_menu.meals for r in meal.recipes) == sorted([cake.id, soup.id])
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Recipe
+from ourRecipesBack.models.sync import SyncLog, SyncQueue
+from ourRecipesBack.services.job_queue import JobQueue
+from ourRecipesBack.services.sync_service import SyncService
+
+
+class TestSyncJobs:
+    def test_endpoint_returns_job_id(self, app):
+        """Test POST /api/sync answers 202 with a job that can be polled"""
+        with app.app_context():
+            token = create_access_token(identity='user')
+            headers = {'Authorization': f'Bearer {token}'}
+            client = app.test_client()
+
+            response = client.post('/api/sync/full', base_url='https://localhost', headers=headers)
+            assert response.status_code == 202
+            data = response.get_json()
+            job_id = data['job_id']
+            queued = db.session.get(SyncQueue, data['queue_job_id'])
+            assert (queued.job_type, queued.status, queued.data) == ('sync', 'pending', {'sync_log_id': job_id})
+
+            response = client.get(f'/api/sync/jobs/{job_id}', base_url='https://localhost', headers=headers)
+            data = response.get_json()
+            assert (data['id'], data['type'], data['status']) == (job_id, 'full_resync', 'in_progress')
+
+            response = client.get('/api/sync/jobs/999', base_url='https://localhost', headers=headers)
+            assert response.status_code == 404
+
+    def test_queued_job_runs_sync(self, app, channel_client, telegram_message):
+        """Test a job worker runs the sync and stores its counters as the result"""
+        messages = [telegram_message(i, f"מתכון {i}") for i in range(1, 6)]
+        with app.app_context():
+            channel_client(messages)
+            job, queued = SyncService.start_job('full')
+
+            assert JobQueue.run_next().id == queued.id
+            assert queued.status == 'completed'
+            assert queued.result['stats']['recipes']['added'] == 5
+            assert db.session.get(SyncLog, job.id).status == 'completed'
+
+    def test_failed_sync_is_retried_from_checkpoint(self, app, monkeypatch, channel_client, telegram_message):
+        """Test a failed attempt is retried later and continues below its checkpoint"""
+        monkeypatch.setattr(SyncService, 'CHUNK_SIZE', 5)
+        messages = [telegram_message(i, f"מתכון {i}") for i in range(1, 51)]
+        with app.app_context():
+            job, queued = SyncService.start_job('full')
+            channel_client(messages, fail_after=23)
+            JobQueue.run_next()
+
+            assert queued.status == 'pending'
+            assert queued.run_after > datetime.utcnow()
+            assert 'connection lost' in queued.error
+            job = db.session.get(SyncLog, job.id)
+            assert (job.status, job.error_message) == ('in_progress', 'connection lost')
+            checkpoint = job.checkpoint_message_id
+            assert checkpoint is not None and checkpoint < 50
+
+            queued.run_after = None
+            db.session.commit()
+            client = channel_client(messages)
+            JobQueue.run_next()
+
+            assert client.offsets == [checkpoint]
+            assert queued.status == 'completed'
+            assert queued.attempts == 2
+            job = db.session.get(SyncLog, job.id)
+            assert job.status == 'completed'
+            assert Recipe.query.count() == 50
+            assert job.recipes_added == 50
+            assert job.messages_scanned == 50
+
+    def test_sync_log_fails_with_its_queue_job(self, app, channel_client, telegram_message):
+        """Test the sync log fails on the last attempt and when its job is given up without running"""
+        messages = [telegram_message(i, f"מתכון {i}") for i in range(1, 6)]
+        with app.app_context():
+            channel_client(messages, fail_after=0)
+            job, queued = SyncService.start_job('full')
+            queued.max_attempts = 1
+            db.session.commit()
+            JobQueue.run_next()
+            assert queued.status == 'failed'
+            assert (job.status, job.error_message) == ('failed', 'connection lost')
+
+            job, queued = SyncService.start_job('partial')
+            assert JobQueue.cancel(queued)
+            assert (job.status, job.error_message) == ('failed', 'Cancelled')
+
+            job, queued = SyncService.start_job('partial')
+            queued.attempts = queued.max_attempts
+            db.session.commit()
+            assert JobQueue.run_next().id == queued.id
+            assert queued.status == 'failed'
+            assert job.status == 'failed'
+
+    def test_interrupted_job_resumes_from_checkpoint(self, app, monkeypatch, channel_client, telegram_message):
+        """Test a job whose worker died continues below its checkpoint"""
+        app.config['CHANNEL_URL'] = 'test_channel'
+        monkeypatch.setattr(SyncService, 'CHUNK_SIZE', 5)
+        messages = [telegram_message(i, f"מתכון {i}") for i in range(1, 51)]
+        with app.app_context():
+            job, queued = SyncService.start_job('full')
+            assert JobQueue.claim_next().id == queued.id
+            channel_client(messages, fail_after=23)
+            with pytest.raises(ConnectionError):
+                asyncio.run(SyncService.run(job, full=True))
+            db.session.rollback()
+
+            checkpoint = job.checkpoint_message_id
+            assert checkpoint is not None and checkpoint < 50
+            assert job.high_water_message_id == 50
+            done = Recipe.query.count()
+            assert done == 51 - checkpoint
+
+            # The process died; another worker picks the job up once it is stale
+            assert JobQueue.run_next() is None
+            queued.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+            db.session.commit()
+            client = channel_client(messages)
+            assert JobQueue.run_next().id == queued.id
+
+            assert client.offsets == [checkpoint]
+            job = db.session.get(SyncLog, job.id)
+            assert job.status == 'completed'
+            assert Recipe.query.count() == 50
+            assert job.recipes_added == 50
+            assert job.messages_scanned == 50
@@ -0,0 +1,123 @@
+import asyncio
+
+from ourRecipesBack.models import Recipe
+from ourRecipesBack.models.place import Place
+from ourRecipesBack.models.sync import SyncLog
+from ourRecipesBack.routes import sync as sync_routes
+from ourRecipesBack.services.image_variant_service import ImageVariantService
+from ourRecipesBack.services.menu_service import MenuService
+from ourRecipesBack.services.recipe_service import RecipeService
+from ourRecipesBack.services.sync_service import SyncService
+
+
+def _run_sync(client):
+    sync_log = sync_routes._create_sync_log()
+    asyncio.run(SyncService.run(sync_log, full=True))
+    return sync_log
+
+
+class TestSyncPipeline:
+    def test_reader_stays_bounded_ahead_of_writer(self, app, monkeypatch, channel_client, telegram_message):
+        """Test the reader never runs further ahead than the queue and a chunk"""
+        app.config['CHANNEL_URL'] = 'test_channel'
+        monkeypatch.setattr(SyncService, 'QUEUE_SIZE', 5)
+        monkeypatch.setattr(SyncService, 'CHUNK_SIZE', 3)
+        app.config['SYNC_CONCURRENCY'] = 2
+        client = channel_client([telegram_message(i, f"מתכון {i}") for i in range(1, 101)])
+        lags = []
+        progress = []
+        apply_message = RecipeService.apply_message
+
+        def apply(message, existing_recipe, media_data=None, media_key=None):
+            sync_log = SyncLog.query.order_by(SyncLog.id.desc()).first()
+            lags.append(client.yielded - sync_log.recipes_processed)
+            progress.append(sync_log.messages_scanned)
+            return apply_message(message, existing_recipe, media_data, media_key)
+
+        monkeypatch.setattr(RecipeService, 'apply_message', apply)
+        with app.app_context():
+            sync_log = _run_sync(client)
+
+            assert sync_log.recipes_processed == 100
+            # Message queue, pending chunk, fetches, write queue and the batch being written
+            assert max(lags) <= 5 + 3 + 2 + 5 + 3
+            # Progress was stored while the sync ran
+            assert any(0 < scanned < 100 for scanned in progress)
+            assert sync_log.messages_scanned == 100
+
+    def test_messages_are_classified_and_menus_run_last(self, app, monkeypatch, channel_client, telegram_message):
+        """Test recipes and places are written before menus are synced"""
+        app.config['CHANNEL_URL'] = 'test_channel'
+        recipes_seen_by_menus = []
+
+        async def sync_menu(client_, message, sync_log, prefetched=None):
+            recipes_seen_by_menus.append(Recipe.query.count())
+            sync_log.menus_processed += 1
+
+        monkeypatch.setattr(MenuService, 'sync_message', sync_menu)
+        client = channel_client([
+            telegram_message(1, "עוגת גבינה\nמצרכים:\nגבינה"),
+            telegram_message(2, "🏠 המלצה\nשם: פיצה טובה\nמיקום: חיפה\nנוסף על ידי: דנה"),
+            telegram_message(3, "🍽️ תפריט: ארוחת שישי"),
+            telegram_message(4, "מרק עוף\nמצרכים:\nעוף"),
+            telegram_message(5, None),
+        ])
+        with app.app_context():
+            sync_log = _run_sync(client)
+
+            assert sync_log.recipes_added == 2
+            assert sync_log.places_processed == 1
+            assert Place.query.one().name == "פיצה טובה"
+            assert recipes_seen_by_menus == [2]
+            assert sync_log.messages_scanned == 5
+
+    def test_parse_place(self):
+        """Test place fields are read from the message lines"""
+        data = SyncService.parse_place("שם: קפה\nאתר: לא צוין\nסוג: Cafe")
+        assert data == {"name": "קפה", "type": "cafe"}
+        assert SyncService.parse_place("בלי שם") is None
+
+
+class TestParallelSync:
+    def test_fetches_run_up_to_configured_concurrency(self, app, monkeypatch, channel_client, telegram_message):
+        """Test media fetches overlap up to SYNC_CONCURRENCY and all are written"""
+        app.config['CHANNEL_URL'] = 'test_channel'
+        app.config['SYNC_CONCURRENCY'] = 3
+        monkeypatch.setattr(ImageVariantService, 'schedule', lambda source_hash: None)
+        client = channel_client([telegram_message(i, f"מתכון {i}", photo_id=i) for i in range(1, 31)])
+        with app.app_context():
+            sync_log = _run_sync(client)
+
+            assert client.max_active == 3
+            assert (sync_log.recipes_added, sync_log.recipes_processed) == (30, 30)
+            assert Recipe.query.filter(Recipe.image_hash.isnot(None)).count() == 30
+
+    def test_failed_fetch_is_counted_and_sync_continues(self, app, monkeypatch, channel_client, telegram_message):
+        """Test a failing download marks only its message as failed"""
+        app.config['CHANNEL_URL'] = 'test_channel'
+        monkeypatch.setattr(ImageVariantService, 'schedule', lambda source_hash: None)
+        client = channel_client([telegram_message(i, f"מתכון {i}", photo_id=i) for i in range(1, 6)],
+                                failing_media={3})
+        with app.app_context():
+            sync_log = _run_sync(client)
+
+            assert (sync_log.recipes_added, sync_log.recipes_failed) == (4, 1)
+            assert Recipe.query.filter_by(telegram_id=3).first() is None
+
+    def test_bad_message_is_skipped(self, app, monkeypatch, channel_client, telegram_message):
+        """Test a message that cannot be applied is counted as failed without failing the sync"""
+        app.config['CHANNEL_URL'] = 'test_channel'
+        apply_message = RecipeService.apply_message
+
+        def apply(message, existing_recipe, media_data=None, media_key=None):
+            outcome = apply_message(message, existing_recipe, media_data, media_key)
+            if message.id == 2:
+                raise ValueError('unparsable recipe')
+            return outcome
+        monkeypatch.setattr(RecipeService, 'apply_message', apply)
+        client = channel_client([telegram_message(i, f"מתכון {i}") for i in range(1, 5)])
+        with app.app_context():
+            sync_log = _run_sync(client)
+
+            assert (sync_log.recipes_added, sync_log.recipes_failed) == (3, 1)
+            assert sorted(r.telegram_id for r in Recipe.query) == [1, 3, 4]
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import ChannelInvalidError, MessageIdInvalidError
+from telethon.tl.types import InputPeerChannel
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import TelegramPeer
+from ourRecipesBack.services.peer_cache import PeerCache
+from ourRecipesBack.services.telegram_client_manager import TelegramClientManager
+from ourRecipesBack.services.telegram_service import TelegramService
+
+
+PEER = InputPeerChannel(channel_id=777, access_hash=888)
+
+
+class FakeClient:
+    """Telegram client recording connections and calls"""
+
+    def __init__(self):
+        self.resolves = []
+        self.invalid_peers = set()
+        self.connected = False
+        self.connects = 0
+        self.pings = 0
+        self.ping_fails = False
+        self.calls = []
+        self.threads = set()
+
+    def is_connected(self):
+        return self.connected
+
+    async def connect(self):
+        self.connects += 1
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def is_user_authorized(self):
+        return True
+
+    async def __call__(self, request):
+        self.pings += 1
+        if self.ping_fails:
+            raise ConnectionError("no answer")
+
+    async def get_input_entity(self, peer):
+        self.resolves.append(peer)
+        return InputPeerChannel(channel_id=777, access_hash=888 + len(self.resolves) - 1)
+
+    async def edit_message(self, entity, message_id, text, file=None):
+        self.threads.add(threading.current_thread().name)
+        if entity.access_hash in self.invalid_peers:
+            raise ChannelInvalidError(request=None)
+        if message_id == 404:
+            raise MessageIdInvalidError(request=None)
+        self.calls.append(('edit', entity, message_id, text))
+
+    async def send_message(self, entity, text, file=None):
+        self.calls.append(('send', entity, text, file.name if file else None))
+        return SimpleNamespace(id=len(self.calls), text=text)
+
+
+@pytest.fixture
+def fake_client(app, monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(TelegramClientManager, '_create_client', classmethod(lambda cls, *key: client))
+    app.config.update(SESSION_STRING='session', BOT_ID='12345')
+    PeerCache.clear()
+    yield client
+    TelegramClientManager.shutdown()
+    PeerCache.clear()
+
+
+class TestSharedTelegramClient:
+    def test_operations_share_one_connection(self, app, fake_client):
+        """Test calls from different event loops reuse one connected client on its own thread"""
+        with app.app_context():
+            assert asyncio.run(TelegramService.edit_message(1, "first"))
+            assert asyncio.run(TelegramService.edit_message(2, "second"))
+            message = asyncio.run(TelegramService.send_message("new", b"image"))
+
+            assert fake_client.connects == 1
+            assert fake_client.pings == 0
+            assert fake_client.threads == {'telegram-client'}
+            assert fake_client.calls == [
+                ('edit', PEER, 1, 'first'),
+                ('edit', PEER, 2, 'second'),
+                ('send', PEER, 'new', 'image.jpg'),
+            ]
+            assert message.id == 3
+
+    def test_missing_message_is_not_edited(self, app, fake_client):
+        """Test editing a deleted message reports failure"""
+        with app.app_context():
+            assert asyncio.run(TelegramService.edit_message(404, "text")) is False
+
+    def test_reconnects_dropped_connection(self, app, fake_client):
+        """Test a dropped connection is re-established on the next call"""
+        with app.app_context():
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            fake_client.connected = False
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            assert fake_client.connects == 2
+
+    def test_idle_connection_is_health_checked(self, app, fake_client, monkeypatch):
+        """Test an idle connection is pinged, and reconnected when the ping fails"""
+        monkeypatch.setattr(TelegramClientManager, 'HEALTH_CHECK_SECONDS', 0)
+        with app.app_context():
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            pings = fake_client.pings
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            assert (fake_client.pings, fake_client.connects) == (pings + 1, 1)
+
+            fake_client.ping_fails = True
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            assert (fake_client.pings, fake_client.connects) == (pings + 2, 2)
+            assert len(fake_client.calls) == 3
+
+
+class TestPeerCache:
+    def test_channel_is_resolved_once(self, app, fake_client):
+        """Test the channel peer is resolved on the first operation only"""
+        with app.app_context():
+            for message_id in range(3):
+                asyncio.run(TelegramService.edit_message(message_id, "text"))
+            assert fake_client.resolves == ['test_channel']
+
+    def test_peer_survives_restart(self, app, fake_client):
+        """Test a stored peer is used by a new process without resolving"""
+        with app.app_context():
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            db.session.commit()
+            row = db.session.get(TelegramPeer, 'test_channel')
+            assert (row.peer_type, row.peer_id, row.access_hash) == ('channel', 777, 888)
+
+            PeerCache.clear()
+            asyncio.run(TelegramService.edit_message(2, "text"))
+            assert fake_client.resolves == ['test_channel']
+            assert fake_client.calls[-1] == ('edit', PEER, 2, 'text')
+
+    def test_expired_peer_is_resolved_again(self, app, fake_client):
+        """Test peers older than the TTL are resolved again"""
+        app.config['TELEGRAM_PEER_TTL_SECONDS'] = 0
+        with app.app_context():
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            asyncio.run(TelegramService.edit_message(2, "text"))
+            assert len(fake_client.resolves) == 2
+
+    def test_invalid_peer_is_dropped_and_resolved(self, app, fake_client):
+        """Test a peer Telegram rejects is resolved again and the operation retried"""
+        with app.app_context():
+            asyncio.run(TelegramService.edit_message(1, "text"))
+            db.session.commit()
+            fake_client.invalid_peers.add(888)
+
+            assert asyncio.run(TelegramService.edit_message(2, "text"))
+            db.session.commit()
+            assert len(fake_client.resolves) == 2
+            assert fake_client.calls[-1] == ('edit', InputPeerChannel(777, 889), 2, 'text')
+            assert db.session.get(TelegramPeer, 'test_channel').access_hash == 889
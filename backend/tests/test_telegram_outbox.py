@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from telethon.errors import FloodWaitError, MessageNotModifiedError
+
+from ourRecipesBack.extensions import db
+from ourRecipesBack.models import Menu, OutboxMessage
+from ourRecipesBack.services.telegram_outbox import TelegramOutbox
+from ourRecipesBack.services.telegram_service import TelegramService
+
+
+class FakeTelegram:
+    """Record delivered edits, raising queued errors first"""
+
+    def __init__(self):
+        self.edits = []
+        self.errors = []
+        self.on_edit = None
+
+    async def edit_message_or_raise(self, message_id, text, image_data=None, channel_url=None):
+        if self.on_edit:
+            self.on_edit()
+        if self.errors:
+            raise self.errors.pop(0)
+        self.edits.append((message_id, text, image_data))
+
+
+@pytest.fixture
+def telegram(app, monkeypatch):
+    fake = FakeTelegram()
+    monkeypatch.setattr(TelegramService, 'edit_message_or_raise', fake.edit_message_or_raise)
+    monkeypatch.setattr(TelegramOutbox, '_buckets', {})
+    app.config['TELEGRAM_OUTBOX_DELAY_SECONDS'] = 0
+    return fake
+
+
+def _dispatch():
+    return asyncio.run(TelegramOutbox.dispatch())
+
+
+class TestTelegramOutbox:
+    def test_edits_of_a_message_are_coalesced(self, app, telegram, add_recipe):
+        """Test rapid edits of one message are delivered once, with the last text and the image"""
+        with app.app_context():
+            recipe = add_recipe(10, 'עוגה', 'עוגה\nקמח')
+            TelegramOutbox.edit(10, 'first', b'image', target=recipe)
+            TelegramOutbox.edit(10, 'second', target=recipe)
+            TelegramOutbox.edit(10, 'third', target=recipe)
+            db.session.commit()
+            assert recipe.sync_status == 'pending'
+            assert OutboxMessage.query.count() == 1
+
+            assert _dispatch() == 1
+            assert telegram.edits == [(10, 'third', b'image')]
+            assert recipe.sync_status == 'synced'
+            assert recipe.last_sync is not None
+            assert _dispatch() == 0
+
+    def test_edit_during_delivery_is_sent_again(self, app, telegram, add_recipe):
+        """Test an edit arriving while an older text is sent stays pending"""
+        with app.app_context():
+            recipe = add_recipe(10, 'עוגה', 'עוגה\nקמח')
+            TelegramOutbox.edit(10, 'old', target=recipe)
+            db.session.commit()
+
+            def edit_again():
+                TelegramOutbox.edit(10, 'new', target=recipe)
+                db.session.commit()
+                telegram.on_edit = None
+            telegram.on_edit = edit_again
+
+            _dispatch()
+            assert recipe.sync_status == 'pending'
+            _dispatch()
+            assert [text for _, text, _ in telegram.edits] == ['old', 'new']
+            assert recipe.sync_status == 'synced'
+
+    def test_flood_wait_pauses_the_channel(self, app, telegram):
+        """Test a flood wait postpones the edit without using an attempt, and holds back the channel"""
+        with app.app_context():
+            TelegramOutbox.edit(1, 'a')
+            TelegramOutbox.edit(2, 'b')
+            db.session.commit()
+            telegram.errors.append(FloodWaitError(request=None, capture=30))
+
+            before = datetime.utcnow()
+            assert _dispatch() == 0
+            rows = OutboxMessage.query.order_by(OutboxMessage.message_id).all()
+            assert [row.status for row in rows] == ['pending', 'pending']
+            assert rows[0].attempts == 0
+            assert all(row.run_after >= before + timedelta(seconds=29) for row in rows)
+            assert telegram.edits == []
+
+    def test_failures_are_retried_then_recorded(self, app, telegram, monkeypatch, add_recipe):
+        """Test failed deliveries back off and mark the recipe failed when out of attempts"""
+        monkeypatch.setattr(TelegramOutbox, 'MAX_ATTEMPTS', 2)
+        with app.app_context():
+            recipe = add_recipe(10, 'עוגה', 'עוגה\nקמח')
+            row = TelegramOutbox.edit(10, 'text', target=recipe)
+            db.session.commit()
+            telegram.errors.extend([ConnectionError('down'), ConnectionError('still down')])
+
+            _dispatch()
+            assert (row.status, row.attempts, row.error) == ('pending', 1, 'down')
+            assert row.run_after > datetime.utcnow()
+            row.run_after = None
+            db.session.commit()
+
+            _dispatch()
+            assert (row.status, row.attempts) == ('failed', 2)
+            assert (recipe.sync_status, recipe.sync_error) == ('failed', 'still down')
+
+    def test_unmodified_message_counts_as_delivered(self, app, telegram):
+        """Test Telegram's 'not modified' answer marks the menu synced"""
+        with app.app_context():
+            menu = Menu(user_id='user', name='שבת')
+            menu.telegram_message_id = 20
+            db.session.add(menu)
+            db.session.commit()
+            TelegramOutbox.edit(20, 'menu', target=menu)
+            db.session.commit()
+            telegram.errors.append(MessageNotModifiedError(request=None))
+
+            _dispatch()
+            assert menu.last_sync is not None
+            assert OutboxMessage.query.one().status == 'completed'
+
+    def test_recipe_update_answers_after_commit(self, app, telegram, add_recipe):
+        """Test the update endpoint queues the Telegram edit instead of sending it"""
+        with app.app_context():
+            add_recipe(10, 'עוגה', 'עוגה\nקמח')
+            token = create_access_token(identity='user')
+            response = app.test_client().put(
+                '/api/recipes/update/10',
+                json={'newText': 'עוגה\nקמח וסוכר'},
+                headers={'Authorization': f'Bearer {token}'},
+                base_url='https://localhost'
+            )
+            assert response.status_code == 200
+            assert telegram.edits == []
+            row = OutboxMessage.query.one()
+            assert (row.message_id, row.text, row.status) == (10, 'עוגה\nקמח וסוכר', 'pending')
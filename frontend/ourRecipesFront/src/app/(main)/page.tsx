@@ -38,7 +38,7 @@ export default function Page() {
     setIsLoadingRecipe(true);
     try {
       // Try to find recipe in existing data sources
-      const recipe = Object.values(searchResults).find(r => r.id === recipeId) || 
+      const recipe = searchResults.find(r => r.id === recipeId) || 
                     favoriteRecipes.find(r => r.id === recipeId);
       
       if (recipe) {
@@ -165,9 +165,9 @@ export default function Page() {
     );
   }
 
-  const handleSearch = (newRecipes: Record<string, recipe>) => {
+  const handleSearch = (newRecipes: recipe[]) => {
     setSearchResults(newRecipes);   
-    setResultCount(Object.keys(newRecipes).length);
+    setResultCount(newRecipes.length);
   };
 
   return (
@@ -176,7 +176,7 @@ export default function Page() {
         {/* Content Area */}
         <div className="flex-1 flex flex-col min-h-0">
           {/* Hero Section - Only show when no search results */}
-          {Object.keys(searchResults).length === 0 && (
+          {searchResults.length === 0 && (
             <div className="flex items-center gap-4 sm:gap-6 mb-6 flex-shrink-0">
               {/* Text Content */}
               <div className="flex-1 text-right">
@@ -213,7 +213,7 @@ export default function Page() {
           {/* Scrollable Content */}
           <div className="overflow-y-auto flex-1 min-h-0 -mx-4 px-4 pb-8">
             {/* Recently Viewed & Favorites - Only show when no search results */}
-            <div className={`transition-all duration-500 ease-in-out ${Object.keys(searchResults).length === 0 ? 'opacity-100 scale-100' : 'opacity-0 scale-95 h-0 overflow-hidden'}`}>
+            <div className={`transition-all duration-500 ease-in-out ${searchResults.length === 0 ? 'opacity-100 scale-100' : 'opacity-0 scale-95 h-0 overflow-hidden'}`}>
               <RecentlyViewedRecipes onRecipeClick={handleRecipeClick} />
               
               {/* Favorite Recipes Section */}
@@ -278,10 +278,10 @@ export default function Page() {
             </div>
 
             {/* Search Results */}
-            <div className={`transition-all duration-500 ease-in-out ${Object.keys(searchResults).length > 0 ? 'opacity-100 translate-y-0' : 'opacity-0 translate-y-4 h-0 overflow-hidden'}`}>
-              {Object.keys(searchResults).length > 0 && (
+            <div className={`transition-all duration-500 ease-in-out ${searchResults.length > 0 ? 'opacity-100 translate-y-0' : 'opacity-0 translate-y-4 h-0 overflow-hidden'}`}>
+              {searchResults.length > 0 && (
                 <div className="pt-2">
-                  <Recipes recipes={Object.values(searchResults)} onRecipeClick={handleRecipeClick} />
+                  <Recipes recipes={searchResults} onRecipeClick={handleRecipeClick} />
                 </div>
               )}
             </div>
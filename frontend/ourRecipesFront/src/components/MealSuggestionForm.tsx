@@ -9,6 +9,7 @@ import { Input } from '@/components/ui/Input'
 import { FeatureIndicator } from '@/components/ui/FeatureIndicator';
 import { ProgressIndicator } from '@/components/ui/ProgressIndicator';
 import { useProgress, AI_IMAGE_GENERATION_STEPS, AI_RECIPE_GENERATION_STEPS } from '@/hooks/useProgress';
+import { JobService } from '@/services/jobService';
 
 type MealType = "ארוחת בוקר" | "ארוחת צהריים" | "ארוחת ערב" | "חטיף";
 
@@ -228,7 +229,9 @@ const MealSuggestionForm: React.FC = () => {
         throw new Error("Failed to fetch the photo");
       }
 
-      const result = await response.json();
+      // The image is generated by a background job
+      const { job_id } = await response.json();
+      const result = await JobService.waitForResult<{ image: string }>(job_id);
       imageProgress.completeStep(1);
 
       // Step 3: Optimize image
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback, useMemo } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { recipe } from '../types';
 import { ViewMode, BulkAction } from '../types/management';
 import RecipeToolbar from './RecipeToolbar';
@@ -7,9 +7,30 @@ import RecipeGrid from './management/RecipeGrid';
 import Spinner from '@/components/ui/Spinner';
 import { useAuthContext } from '../context/AuthContext';
 import TypingEffect from './TypingEffect';
-import { useInfiniteScroll } from '@/hooks/useInfiniteScroll';
 import { LoadingSpinner } from '@/components/ui/LoadingSpinner';
 import { RecipeCardSkeleton } from '@/components/ui/Skeleton';
+import { JobService } from '@/services/jobService';
+
+const PAGE_SIZE = 50;
+
+interface RecipesPage {
+  data: recipe[];
+  next_cursor: string | null;
+  counts: { total: number; parsed: number; unparsed: number };
+}
+
+// One page of the management list, the first one without a cursor
+async function fetchPage(cursor: string | null): Promise<RecipesPage> {
+  const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/recipes/manage?${params}`, {
+    credentials: 'include'
+  });
+  
+  if (!response.ok) throw new Error('Failed to fetch recipes');
+  
+  return response.json();
+}
 
 export default function RecipeManagement() {
   const [recipes, setRecipes] = useState<recipe[]>([]);
@@ -24,18 +45,20 @@ export default function RecipeManagement() {
   
   const { authState } = useAuthContext();
   
+  // Recipes are loaded page by page through the cursor endpoint
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [totalCount, setTotalCount] = useState(0);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const observerTarget = useRef<HTMLDivElement>(null);
+
   const fetchRecipes = useCallback(async () => {
     try {
       setLoading(true);
-      const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/recipes/manage`, {
-        credentials: 'include'
-      });
-      
-      if (!response.ok) throw new Error('Failed to fetch recipes');
+      const page = await fetchPage(null);
       
-      const data = await response.json();
-      
-      setRecipes(data);
+      setRecipes(page.data);
+      setNextCursor(page.next_cursor);
+      setTotalCount(page.counts.total);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An error occurred');
     } finally {
@@ -43,10 +66,43 @@ export default function RecipeManagement() {
     }
   }, []);
 
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || isLoadingMore) return;
+    
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      
+      setRecipes(prev => [...prev, ...page.data]);
+      setNextCursor(page.next_cursor);
+      setTotalCount(page.counts.total);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'An error occurred');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  }, [nextCursor, isLoadingMore]);
+
   useEffect(() => {
     fetchRecipes();
   }, [fetchRecipes]);
 
+  // Load the next page once the end of the list scrolls into view
+  useEffect(() => {
+    const currentTarget = observerTarget.current;
+    if (!currentTarget || !nextCursor) return;
+    
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries[0].isIntersecting) loadMore();
+      },
+      { threshold: 0.1, rootMargin: '100px' }
+    );
+    observer.observe(currentTarget);
+    
+    return () => observer.disconnect();
+  }, [loadMore, nextCursor, viewMode, recipes, filterBy]);
+
   const handleBulkAction = async (action: BulkAction, data?: any) => {
     if (!selectedRecipes.length || !authState.canEdit) return;
     
@@ -65,7 +121,9 @@ export default function RecipeManagement() {
       
       if (!response.ok) throw new Error('Bulk action failed');
       
-      const result = await response.json();
+      // The action runs as a background job
+      const { job_id } = await response.json();
+      const result = await JobService.waitForResult<{ processed: number; failed: number; total: number }>(job_id);
       setShowMessage({
         status: true,
         message: `${action === 'parse' ? 'פרסור' : 'פעולה'} הושלמה בהצלחה: ${result.processed} מתכונים עודכנו`
@@ -151,20 +209,9 @@ export default function RecipeManagement() {
     return result;
   }, [recipes, sortBy, filterBy]);
 
-  // Infinite scroll for better performance
-  const {
-    displayedItems,
-    hasMore,
-    isLoading: isLoadingMore,
-    observerTarget,
-    displayedCount,
-    totalItems
-  } = useInfiniteScroll({
-    items: filteredAndSortedRecipes,
-    itemsPerPage: 20,
-    initialPage: 1,
-    threshold: 0.1
-  });
+  // Filtering and sorting apply to the pages loaded so far, more are
+  // loaded as the list is scrolled
+  const hasMore = nextCursor !== null;
 
   const handleSort = async (newSortBy: string) => {
     setSortBy(newSortBy);
@@ -175,7 +222,7 @@ export default function RecipeManagement() {
   };
 
   const commonProps = {
-    recipes: displayedItems,
+    recipes: filteredAndSortedRecipes,
     selectedIds: selectedRecipes,
     onSelect: (id: number) => setSelectedRecipes(prev =>
       prev.includes(id) ? prev.filter(p => p !== id) : [...prev, id]
@@ -199,9 +246,9 @@ export default function RecipeManagement() {
       />
 
       {/* Recipe Count Info */}
-      {!loading && !error && totalItems > 20 && (
+      {!loading && !error && totalCount > PAGE_SIZE && (
         <div className="px-6 py-2 text-sm text-secondary-600 bg-secondary-50 border-b">
-          מציג {displayedCount} מתוך {totalItems} מתכונים
+          מציג {recipes.length} מתוך {totalCount} מתכונים
         </div>
       )}
 
@@ -213,7 +260,7 @@ export default function RecipeManagement() {
         <div className="flex-1 flex items-center justify-center text-red-500">
           {error}
         </div>
-      ) : displayedItems.length === 0 ? (
+      ) : filteredAndSortedRecipes.length === 0 && !hasMore ? (
         <div className="flex-1 flex items-center justify-center">
           <div className="text-center">
             <p className="text-lg text-secondary-500">לא נמצאו מתכונים</p>
@@ -10,7 +10,7 @@ import { SearchService, SearchResult } from '@/services/searchService';
 import { CategoryService } from '@/services/categoryService';
 
 interface SearchProps {
-  onSearch: (newRecipes: Record<string, recipe>) => void
+  onSearch: (newRecipes: recipe[]) => void
   resultCount?: number | ""
   className?: string
 }
@@ -108,7 +108,7 @@ export function Search({ onSearch, resultCount, className }: SearchProps) {
       console.log('Search response:', response); // For debugging
 
       if (!response) {
-        onSearch({});
+        onSearch([]);
         addNotification({
           type: 'error',
           message: 'החיפוש נכשל - לא התקבלה תשובה',
@@ -117,10 +117,10 @@ export function Search({ onSearch, resultCount, className }: SearchProps) {
         return;
       }
 
-      onSearch(response.results || {});
+      onSearch(response.results || []);
     } catch (error) {
       console.error('Search failed:', error);
-      onSearch({});
+      onSearch([]);
       addNotification({
         type: 'error',
         message: error instanceof Error ? error.message : 'החיפוש נכשל',
@@ -128,8 +128,12 @@ export function SyncStatus({ compact = false }: SyncStatusProps) {
     setIsSyncing(true);
     setError(null);
     try {
-      await SyncService.startSync();
+      const { job_id } = await SyncService.startSync();
+      const job = await SyncService.waitForJob(job_id);
       await fetchSyncStatus();
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Sync failed');
+      }
     } catch (error) {
       console.error('Sync failed:', error);
       setError('Sync failed');
@@ -146,8 +150,12 @@ export function SyncStatus({ compact = false }: SyncStatusProps) {
     setError(null);
     setRefreshMessage({ type: 'info', text: 'מבצע סנכרון מלא... התהליך עשוי לקחת מספר דקות' });
     try {
-      await SyncService.startFullResync();
+      const { job_id } = await SyncService.startFullResync();
+      const job = await SyncService.waitForJob(job_id);
       await fetchSyncStatus();
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Full resync failed');
+      }
       setRefreshMessage({ type: 'success', text: 'סנכרון מלא הושלם בהצלחה' });
     } catch (error) {
       console.error('Full resync failed:', error);
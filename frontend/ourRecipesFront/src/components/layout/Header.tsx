@@ -50,7 +50,8 @@ export function Header() {
   const handleSync = async () => {
     setIsSyncing(true)
     try {
-      await SyncService.startSync();
+      const { job_id } = await SyncService.startSync();
+      await SyncService.waitForJob(job_id);
       //TODO: Add a notification here for the user about the sync results
     } catch (error) {
       console.error('Sync error:', error)
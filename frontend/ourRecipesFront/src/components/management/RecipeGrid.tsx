@@ -154,6 +154,8 @@ ${updatedRecipeData.difficulty ? `\nרמת קושי: ${difficultyDisplay[updated
               <div className="relative w-full h-48">
                 <Image
                   src={recipe.image}
+                  // Served by the API behind the login cookie, which the image optimizer does not send
+                  unoptimized
                   alt={recipe.title}
                   fill
                   sizes="(max-width: 768px) 100vw, (max-width: 1200px) 50vw, 33vw"
@@ -6,6 +6,7 @@ import Spinner from "@/components/ui/Spinner";
 import { isRecipeUpdated, parseRecipe } from "@/utils/formatChecker";
 import TypingEffect from "@/components/TypingEffect";
 import RecipeDisplay from "@/components/RecipeDisplay";
+import { JobService } from "@/services/jobService";
 import { RecipeEditForm } from './RecipeEditForm';
 import { Typography } from '@/components/ui/Typography';
 import { difficultyDisplay } from '@/utils/difficulty';
@@ -175,7 +176,9 @@ const RecipeDetails: React.FC<RecipeDetailProps> = ({
       console.log("[INFOGRAPHIC] Response data:", data);
 
       if (response.ok) {
-        setGeneratedInfographic(data.image);
+        // The infographic is generated by a background job
+        const result = await JobService.waitForResult<{ image: string }>(data.job_id);
+        setGeneratedInfographic(result.image);
         setShowMessage({ status: true, message: "האינפוגרפיקה נוצרה בהצלחה!" });
       } else {
         throw new Error(data.error || data.message);
@@ -7,6 +7,7 @@ import { difficultyOptions } from "@/utils/difficulty";
 import type { Difficulty } from "@/types";
 import { ProgressIndicator } from "@/components/ui/ProgressIndicator";
 import { useProgress, AI_IMAGE_GENERATION_STEPS } from "@/hooks/useProgress";
+import { JobService } from "@/services/jobService";
 
 interface RecipeEditFormProps {
   recipeData: recipe | null;
@@ -149,7 +150,9 @@ export function RecipeEditForm({
         throw new Error(error.message || "שגיאה ביצרת התמונה");
       }
 
-      const result = await response.json();
+      // The image is generated by a background job
+      const { job_id } = await response.json();
+      const result = await JobService.waitForResult<{ image: string }>(job_id);
       imageProgress.completeStep(1);
 
       // Step 3: Optimize image
@@ -71,6 +71,8 @@ export function RecipeGridItem({ recipe, onClick, font }: RecipeGridItemProps) {
             <>
               <Image
                 src={recipe.image}
+                // Served by the API behind the login cookie, which the image optimizer does not send
+                unoptimized
                 alt={recipe.title}
                 fill
                 className="object-cover transform transition-transform duration-500 group-hover:scale-110"
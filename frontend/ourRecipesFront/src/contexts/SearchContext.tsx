@@ -4,9 +4,9 @@ import { createContext, useContext, useState, ReactNode } from 'react';
 import { recipe } from '@/types';
 
 interface SearchContextType {
-  searchResults: Record<string, recipe>;
+  searchResults: recipe[];
   resultCount: number | "";
-  setSearchResults: (results: Record<string, recipe>) => void;
+  setSearchResults: (results: recipe[]) => void;
   setResultCount: (count: number | "") => void;
   clearSearch: () => void;
 }
@@ -14,11 +14,11 @@ interface SearchContextType {
 const SearchContext = createContext<SearchContextType | undefined>(undefined);
 
 export function SearchProvider({ children }: { children: ReactNode }) {
-  const [searchResults, setSearchResults] = useState<Record<string, recipe>>({});
+  const [searchResults, setSearchResults] = useState<recipe[]>([]);
   const [resultCount, setResultCount] = useState<number | "">("");
 
   const clearSearch = () => {
-    setSearchResults({});
+    setSearchResults([]);
     setResultCount("");
   };
 
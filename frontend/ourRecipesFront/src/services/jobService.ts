@@ -0,0 +1,48 @@
+import { apiService } from './apiService';
+
+export interface JobStart {
+  status: 'accepted';
+  job_id: number;
+}
+
+export interface Job<T = any> {
+  id: number;
+  type: string;
+  status: 'pending' | 'running' | 'completed' | 'failed' | 'cancelled';
+  attempts: number;
+  max_attempts: number;
+  created_at: string | null;
+  started_at: string | null;
+  finished_at: string | null;
+  cancel_requested: boolean;
+  result: T | null;
+  error: string | null;
+}
+
+export class JobService {
+  private static readonly BASE_PATH = '/jobs';
+
+  // Get background job status, with its result once completed
+  static async getJob<T = any>(jobId: number): Promise<Job<T>> {
+    return apiService.get<Job<T>>(`${this.BASE_PATH}/${jobId}`);
+  }
+
+  // Cancel a waiting or running job
+  static async cancelJob(jobId: number): Promise<Job> {
+    return apiService.post<Job>(`${this.BASE_PATH}/${jobId}/cancel`);
+  }
+
+  // Poll a background job until it finishes, resolving with its result
+  static async waitForResult<T = any>(jobId: number, intervalMs = 2000): Promise<T> {
+    for (;;) {
+      const job = await this.getJob<T>(jobId);
+      if (job.status === 'completed') {
+        return job.result as T;
+      }
+      if (job.status === 'failed' || job.status === 'cancelled') {
+        throw new Error(job.error || `Job ${job.status}`);
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+  }
+}
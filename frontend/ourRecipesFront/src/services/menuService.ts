@@ -1,4 +1,5 @@
 import { apiService } from './apiService';
+import { JobService, type JobStart } from './jobService';
 import type {
   Menu,
   MenuGenerationRequest,
@@ -28,18 +29,18 @@ export class MenuService {
   /**
    * Generate menu PREVIEW using AI (without saving to database)
    * User can review before confirming
-   * Note: This can take 30-90 seconds due to AI processing
+   * Note: This can take 30-90 seconds due to AI processing, so it runs as a
+   * background job that is polled until it finishes
    */
   static async generateMenuPreview(request: MenuGenerationRequest): Promise<ApiResponse<{
     preview: any;
     preferences: MenuGenerationRequest;
   }>> {
-    return apiService.post<ApiResponse<{
+    const { job_id } = await apiService.post<JobStart>(`${this.BASE_PATH}/generate-preview`, request);
+    return JobService.waitForResult<ApiResponse<{
       preview: any;
       preferences: MenuGenerationRequest;
-    }>>(`${this.BASE_PATH}/generate-preview`, request, {
-      timeout: 120000 // 2 minutes timeout for AI menu generation
-    });
+    }>>(job_id);
   }
 
   /**
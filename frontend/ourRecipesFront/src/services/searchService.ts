@@ -13,7 +13,7 @@ export interface SearchResult {
 }
 
 export interface SearchResponse {
-  results: Record<string, Recipe>;
+  results: Recipe[];  // Best matches first
   total: number;
   hasMore: boolean;
 }
@@ -47,12 +47,12 @@ export class SearchService {
       console.log('API Response:', response); // For debugging
       
       // Return the response directly since it's already in the correct format
-      return response || { results: {}, total: 0, hasMore: false };
+      return response || { results: [], total: 0, hasMore: false };
       
     } catch (error) {
       console.error('Search failed:', error);
       return {
-        results: {},
+        results: [],
         total: 0,
         hasMore: false
       };
@@ -15,6 +15,22 @@ export interface SyncSessionStatus {
   current_item?: string;
 }
 
+export interface SyncJobStart {
+  status: 'accepted';
+  job_id: number;
+  queue_job_id: number;
+}
+
+export interface SyncJob {
+  id: number;
+  type: string;
+  status: 'in_progress' | 'completed' | 'failed';
+  started_at: string | null;
+  completed_at: string | null;
+  messages_scanned: number;
+  error: string | null;
+}
+
 export class SyncService {
   private static readonly BASE_PATH = '/sync';
 
@@ -33,16 +49,34 @@ export class SyncService {
     return apiService.post<ApiResponse<void>>(`${this.BASE_PATH}/session/refresh`);
   }
 
-  // Start sync
-  static async startSync(): Promise<ApiResponse<void>> {
-    return apiService.post<ApiResponse<void>>(this.BASE_PATH);
+  // Start sync, runs in the background
+  static async startSync(): Promise<SyncJobStart> {
+    return apiService.post<SyncJobStart>(this.BASE_PATH);
+  }
+
+  // Start full resync, runs in the background
+  static async startFullResync(): Promise<SyncJobStart> {
+    return apiService.post<SyncJobStart>(`${this.BASE_PATH}/full`);
+  }
+
+  // Get sync job progress
+  static async getJob(jobId: number): Promise<SyncJob> {
+    return apiService.get<SyncJob>(`${this.BASE_PATH}/jobs/${jobId}`);
   }
 
-  // Start full resync
-  static async startFullResync(): Promise<ApiResponse<void>> {
-    return apiService.post<ApiResponse<void>>(`${this.BASE_PATH}/full`, undefined, {
-      timeout: 5 * 60 * 1000 // 5 minutes timeout
-    });
+  // Poll a sync job until it finishes, giving up after timeoutMs
+  static async waitForJob(jobId: number, intervalMs = 2000, timeoutMs = 30 * 60 * 1000): Promise<SyncJob> {
+    const deadline = Date.now() + timeoutMs;
+    for (;;) {
+      const job = await this.getJob(jobId);
+      if (job.status !== 'in_progress') {
+        return job;
+      }
+      if (Date.now() >= deadline) {
+        throw new Error('Request timeout');
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
   }
 }
 
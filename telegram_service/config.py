@@ -28,6 +28,10 @@ class Settings(BaseSettings):
     # Next.js integration
     NEXTJS_URL: Optional[str] = None
 
+    # Resolved channel peers
+    PEER_CACHE_TTL_SECONDS: int = 86400
+    PEER_CACHE_PATH: Optional[str] = None  # JSON file keeping peers across restarts
+
     # Server configuration
     PORT: int = 8000
     ENVIRONMENT: str = "production"
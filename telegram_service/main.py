@@ -11,7 +11,7 @@ from io import BytesIO
 import base64
 
 from config import settings, logger
-from telegram_client import TelegramClientManager, get_telegram_client
+from telegram_client import TelegramClientManager, get_telegram_client, run_in_channel
 from models import (
     HealthCheck,
     MessageData,
@@ -165,6 +165,15 @@ async def session_status():
 # ============================================================================
 
 
+def _image_file(image_bytes):
+    """Wrap decoded image bytes as an upload, fresh for every attempt"""
+    if image_bytes is None:
+        return None
+    file = BytesIO(image_bytes)
+    file.name = "image.jpg"
+    return file
+
+
 @app.post("/telegram/send-message", response_model=MessageResponse)
 async def send_message(
     data: MessageData,
@@ -184,18 +193,14 @@ async def send_message(
         )
 
         async with get_telegram_client() as client:
-            # Get channel entity
             channel_url = data.channel_url or settings.CHANNEL_URL
-            channel = await client.get_entity(channel_url)
 
-            # Prepare image file if provided
-            file = None
+            # Prepare image if provided
+            image_bytes = None
             if data.image_data:
                 try:
                     # Decode base64 image
                     image_bytes = base64.b64decode(data.image_data)
-                    file = BytesIO(image_bytes)
-                    file.name = "image.jpg"
                     logger.info("image_prepared", size_bytes=len(image_bytes))
                 except Exception as img_error:
                     logger.error("image_decode_failed", error=str(img_error))
@@ -205,11 +210,14 @@ async def send_message(
                     )
 
             # Send message to Telegram
-            message = await client.send_message(
-                channel,
-                data.content,
-                file=file
-            )
+            async def send(channel):
+                return await client.send_message(
+                    channel,
+                    data.content,
+                    file=_image_file(image_bytes)
+                )
+
+            message = await run_in_channel(client, channel_url, send)
 
             logger.info(
                 "message_sent",
@@ -252,25 +260,13 @@ async def edit_message(
         )
 
         async with get_telegram_client() as client:
-            # Get channel entity
             channel_url = data.channel_url or settings.CHANNEL_URL
-            channel = await client.get_entity(channel_url)
-
-            # Verify message exists
-            message = await client.get_messages(channel, ids=data.message_id)
-            if not message:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Message {data.message_id} not found in channel"
-                )
 
-            # Prepare image file if provided
-            file = None
+            # Prepare image if provided
+            image_bytes = None
             if data.image_data:
                 try:
                     image_bytes = base64.b64decode(data.image_data)
-                    file = BytesIO(image_bytes)
-                    file.name = "image.jpg"
                     logger.info("image_prepared", size_bytes=len(image_bytes))
                 except Exception as img_error:
                     logger.error("image_decode_failed", error=str(img_error))
@@ -279,13 +275,24 @@ async def edit_message(
                         detail=f"Invalid image data: {str(img_error)}"
                     )
 
-            # Edit message
-            await client.edit_message(
-                channel,
-                data.message_id,
-                data.content,
-                file=file
-            )
+            async def edit(channel):
+                # Verify message exists
+                message = await client.get_messages(channel, ids=data.message_id)
+                if not message:
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Message {data.message_id} not found in channel"
+                    )
+
+                # Edit message
+                await client.edit_message(
+                    channel,
+                    data.message_id,
+                    data.content,
+                    file=_image_file(image_bytes)
+                )
+
+            await run_in_channel(client, channel_url, edit)
 
             logger.info(
                 "message_edited",
@@ -327,12 +334,14 @@ async def delete_message(
         logger.info("delete_message_request", message_id=message_id)
 
         async with get_telegram_client() as client:
-            # Get channel entity
             target_channel = channel_url or settings.CHANNEL_URL
-            channel = await client.get_entity(target_channel)
 
             # Delete message
-            await client.delete_messages(channel, [message_id])
+            await run_in_channel(
+                client,
+                target_channel,
+                lambda channel: client.delete_messages(channel, [message_id])
+            )
 
             logger.info(
                 "message_deleted",
@@ -377,35 +386,37 @@ async def sync_messages(
         )
 
         async with get_telegram_client() as client:
-            # Get channel entity
             channel_url = data.channel_url or settings.CHANNEL_URL
-            channel = await client.get_entity(channel_url)
 
             # Fetch messages
-            messages = []
-            async for message in client.iter_messages(
-                channel,
-                limit=data.limit,
-                offset_id=data.offset_id,
-                reverse=data.reverse
-            ):
-                # Skip empty messages
-                if not message.text:
-                    continue
-
-                messages.append(
-                    TelegramMessage(
-                        id=message.id,
-                        text=message.text,
-                        date=message.date.isoformat(),
-                        media_type=(
-                            message.media.__class__.__name__
-                            if message.media
-                            else None
-                        ),
-                        has_image=bool(message.photo or message.document)
+            async def fetch(channel):
+                messages = []
+                async for message in client.iter_messages(
+                    channel,
+                    limit=data.limit,
+                    offset_id=data.offset_id,
+                    reverse=data.reverse
+                ):
+                    # Skip empty messages
+                    if not message.text:
+                        continue
+
+                    messages.append(
+                        TelegramMessage(
+                            id=message.id,
+                            text=message.text,
+                            date=message.date.isoformat(),
+                            media_type=(
+                                message.media.__class__.__name__
+                                if message.media
+                                else None
+                            ),
+                            has_image=bool(message.photo or message.document)
+                        )
                     )
-                )
+                return messages
+
+            messages = await run_in_channel(client, channel_url, fetch)
 
             logger.info(
                 "messages_synced",
@@ -4,13 +4,26 @@ Implements singleton pattern to maintain a single connection.
 """
 
 from telethon import TelegramClient
+from telethon.errors import (
+    ChannelIdInvalidError,
+    ChannelInvalidError,
+    ChannelPrivateError,
+    ChatIdInvalidError,
+    PeerIdInvalidError,
+)
 from telethon.sessions import StringSession
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
 from config import settings, logger
 import asyncio
+import json
+import os
+import time
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
 from datetime import datetime, timezone
 
+T = TypeVar("T")
+
 
 class TelegramClientManager:
     """
@@ -100,6 +113,125 @@ class TelegramClientManager:
             }
 
 
+class PeerCache:
+    """
+    TTL cache of resolved channel input peers, keyed by channel URL.
+
+    Resolving a channel is a network round trip that counts against flood
+    limits, so peers are kept for PEER_CACHE_TTL_SECONDS. StringSession does
+    not persist entities, so when PEER_CACHE_PATH is set the peers are also
+    written to that JSON file and survive restarts.
+    """
+
+    # Errors meaning a cached peer no longer identifies the channel
+    INVALID_PEER_ERRORS = (
+        ChannelIdInvalidError,
+        ChannelInvalidError,
+        ChannelPrivateError,
+        ChatIdInvalidError,
+        PeerIdInvalidError,
+    )
+
+    _PEER_TYPES = {
+        "channel": (InputPeerChannel, "channel_id"),
+        "chat": (InputPeerChat, "chat_id"),
+        "user": (InputPeerUser, "user_id"),
+    }
+
+    _peers: dict = {}  # Channel URL -> (input peer, resolved at epoch seconds)
+    _loaded = False
+
+    @classmethod
+    async def resolve(cls, client: TelegramClient, channel_url: str) -> Tuple[object, bool]:
+        """
+        Get the input peer of a channel, resolving it only when unknown or expired.
+
+        Returns:
+            (input peer, whether it came from the cache)
+        """
+        cls._load()
+        cached = cls._peers.get(channel_url)
+        if cached and time.time() - cached[1] < settings.PEER_CACHE_TTL_SECONDS:
+            return cached[0], True
+
+        peer = await client.get_input_entity(channel_url)
+        cls._peers[channel_url] = (peer, time.time())
+        cls._save()
+        logger.info("channel_peer_resolved", channel=channel_url)
+        return peer, False
+
+    @classmethod
+    def invalidate(cls, channel_url: str):
+        """Forget the peer of a channel, after Telegram rejected it"""
+        if cls._peers.pop(channel_url, None) is not None:
+            logger.info("channel_peer_invalidated", channel=channel_url)
+            cls._save()
+
+    @classmethod
+    def _load(cls):
+        if cls._loaded:
+            return
+        cls._loaded = True
+        if not settings.PEER_CACHE_PATH or not os.path.exists(settings.PEER_CACHE_PATH):
+            return
+        try:
+            with open(settings.PEER_CACHE_PATH, encoding="utf-8") as f:
+                stored = json.load(f)
+            for channel_url, entry in stored.items():
+                peer_class, id_field = cls._PEER_TYPES[entry["type"]]
+                kwargs = {id_field: entry["id"]}
+                if peer_class is not InputPeerChat:
+                    kwargs["access_hash"] = entry["access_hash"]
+                cls._peers[channel_url] = (peer_class(**kwargs), entry["resolved_at"])
+            logger.info("channel_peers_loaded", count=len(cls._peers))
+        except Exception as e:
+            logger.error("channel_peers_load_failed", error=str(e))
+
+    @classmethod
+    def _save(cls):
+        if not settings.PEER_CACHE_PATH:
+            return
+        stored = {}
+        for channel_url, (peer, resolved_at) in cls._peers.items():
+            for peer_type, (peer_class, id_field) in cls._PEER_TYPES.items():
+                if isinstance(peer, peer_class):
+                    stored[channel_url] = {
+                        "type": peer_type,
+                        "id": getattr(peer, id_field),
+                        "access_hash": getattr(peer, "access_hash", None),
+                        "resolved_at": resolved_at,
+                    }
+        try:
+            tmp_path = f"{settings.PEER_CACHE_PATH}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, settings.PEER_CACHE_PATH)
+        except OSError as e:
+            logger.error("channel_peers_save_failed", error=str(e))
+
+
+async def run_in_channel(
+    client: TelegramClient,
+    channel_url: str,
+    operation: Callable[[object], Awaitable[T]]
+) -> T:
+    """
+    Run operation(channel) with the cached input peer of a channel.
+
+    When Telegram rejects a cached peer, it is resolved again and the
+    operation retried once.
+    """
+    channel, cached = await PeerCache.resolve(client, channel_url)
+    try:
+        return await operation(channel)
+    except PeerCache.INVALID_PEER_ERRORS:
+        PeerCache.invalidate(channel_url)
+        if not cached:
+            raise
+        channel, _ = await PeerCache.resolve(client, channel_url)
+        return await operation(channel)
+
+
 @asynccontextmanager
 async def get_telegram_client():
     """